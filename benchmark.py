@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""Collector benchmarks for the Securonis control panel.
+
+Runs the panel getters without a Tk root against the live host and against
+a fixture filesystem root with a synthetic number of processes, mounts and
+interfaces. Every run is appended to a history file, next to the panel's
+other state, so regressions between panel versions stay visible.
+
+    python3 benchmark.py                      # live host + synthetic fixture
+    python3 benchmark.py --processes 10000 --mounts 500
+    python3 benchmark.py --make-fixture /tmp/fixture   # record a fixture root
+    python3 benchmark.py --fixture /tmp/fixture --no-live
+    python3 benchmark.py --ui --processes 10000 --mounts 500 --interfaces 64
+    python3 benchmark.py --ui --replay capture.jsonl --speed 4
+    python3 benchmark.py --soak 5000 --budget 512   # fail if the heap keeps growing
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+from controlpanelgui import (LinuxSystemPanel, DataSource, ReplaySource, ProcessTable, PANEL_VERSION, STATE_DIR,
+                             percentile)
+
+
+# Getters measured by default
+COLLECTORS = [
+    "get_system_info",
+    "get_network_info",
+    "get_disk_info",
+    "get_cpu_details",
+    "get_ram_details",
+    "get_gpu_details",
+    "get_top_processes",
+    "check_firewall",
+    "check_vpn",
+    "check_dns",
+    "check_kernel_hardening",
+    "check_usb_protection",
+    "check_ssh_status",
+    "check_network_encryption",
+    "check_dns_over_tls",
+    "check_updates",
+    "check_antivirus",
+    "check_selinux",
+    "check_apparmor",
+]
+
+# Getters that talk to the internet, only run with --network
+NETWORK_COLLECTORS = ["check_tor", "get_public_ip"]
+
+# Files copied from the live host when recording a fixture
+FIXTURE_FILES = [
+    "/proc/stat",
+    "/proc/meminfo",
+    "/proc/vmstat",
+    "/proc/swaps",
+    "/proc/loadavg",
+    "/proc/uptime",
+    "/proc/cpuinfo",
+    "/proc/filesystems",
+    "/proc/net/route",
+    "/proc/sys/kernel/randomize_va_space",
+    "/proc/sys/fs/protected_hardlinks",
+    "/proc/sys/fs/protected_symlinks",
+    "/etc/os-release",
+    "/etc/resolv.conf",
+    "/etc/systemd/resolved.conf",
+]
+
+FORK_EVENTS = {"subprocess.Popen", "os.fork", "os.forkpty", "os.posix_spawn", "os.system"}
+
+_forks = 0
+
+
+def _count_forks(event, args):
+    global _forks
+    if event in FORK_EVENTS:
+        _forks += 1
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def make_fixture(root, processes=1000, mounts=50, interfaces=8):
+    """Record a fixture root from the live host with synthetic process, mount and interface counts"""
+    for path in FIXTURE_FILES:
+        try:
+            with open(path, "r") as f:
+                _write(root + path, f.read())
+        except OSError:
+            continue
+
+    if not os.path.exists(f"{root}/proc/filesystems"):
+        _write(f"{root}/proc/filesystems", "nodev\tproc\n\text4\n")
+    if not os.path.exists(f"{root}/proc/stat"):
+        _write(f"{root}/proc/stat", f"cpu  0 0 0 0 0 0 0 0 0 0\nbtime {int(time.time()) - 3600}\n")
+
+    # Processes
+    for pid in range(1, processes + 1):
+        name = f"synthetic{pid % 97}"
+        state = "S" if pid % 10 else "R"
+        fields = [str(pid), f"({name})", state, "1", str(pid), str(pid), "0", "-1", "4194560",
+                  "100", "0", "0", "0", str(pid % 500), str(pid % 200), "0", "0", "20", "0", "1", "0",
+                  str(1000 + pid), "10485760", "512"] + ["0"] * 28
+        base = f"{root}/proc/{pid}"
+        _write(f"{base}/stat", " ".join(fields) + "\n")
+        _write(f"{base}/statm", "2560 512 256 10 0 300 0\n")
+        _write(f"{base}/status", f"Name:\t{name}\nState:\t{state}\nPid:\t{pid}\nPPid:\t1\n"
+                                 f"Uid:\t1000\t1000\t1000\t1000\nGid:\t1000\t1000\t1000\t1000\nThreads:\t1\n")
+        _write(f"{base}/comm", name + "\n")
+        _write(f"{base}/cmdline", f"/usr/bin/{name}\0--synthetic\0")
+
+    # Mounts, backed by real directories inside the fixture so statvfs works
+    lines = [f"/dev/sda1 {root}/mnt/root ext4 rw,relatime 0 0"]
+    os.makedirs(f"{root}/mnt/root", exist_ok=True)
+    for i in range(1, mounts):
+        os.makedirs(f"{root}/mnt/vol{i}", exist_ok=True)
+        lines.append(f"/dev/sdb{i} {root}/mnt/vol{i} ext4 rw,relatime 0 0")
+    mounts_text = "\n".join(lines) + "\n"
+    _write(f"{root}/proc/self/mounts", mounts_text)
+    _write(f"{root}/proc/mounts", mounts_text)
+
+    # Interfaces
+    dev = ["Inter-|   Receive                                                |  Transmit",
+           " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed"]
+    for i in range(interfaces):
+        name = "lo" if i == 0 else f"veth{i}"
+        dev.append(f"{name:>6}: {i * 1000} {i * 10} 0 0 0 0 0 0 {i * 2000} {i * 20} 0 0 0 0 0 0")
+        _write(f"{root}/sys/class/net/{name}/speed", "1000\n")
+        _write(f"{root}/sys/class/net/{name}/mtu", "1500\n")
+    _write(f"{root}/proc/net/dev", "\n".join(dev) + "\n")
+
+    # GPUs, an Intel iGPU and an AMD dGPU
+    intel = f"{root}/sys/class/drm/card0"
+    _write(f"{intel}/device/vendor", "0x8086\n")
+    _write(f"{intel}/device/device", "0x9a49\n")
+    _write(f"{intel}/device/uevent", "DRIVER=i915\nPCI_SLOT_NAME=0000:00:02.0\n")
+    _write(f"{intel}/gt_cur_freq_mhz", "400\n")
+    _write(f"{intel}/gt_act_freq_mhz", "350\n")
+    _write(f"{intel}/gt_max_freq_mhz", "1300\n")
+    amd = f"{root}/sys/class/drm/card1"
+    _write(f"{amd}/device/vendor", "0x1002\n")
+    _write(f"{amd}/device/device", "0x73bf\n")
+    _write(f"{amd}/device/uevent", "DRIVER=amdgpu\nPCI_SLOT_NAME=0000:03:00.0\n")
+    _write(f"{amd}/device/pp_dpm_sclk", "0: 500Mhz\n1: 1500Mhz *\n2: 2500Mhz\n")
+    _write(f"{amd}/device/gpu_busy_percent", "37\n")
+    _write(f"{amd}/device/mem_info_vram_used", f"{2 * 1024 ** 3}\n")
+    _write(f"{amd}/device/mem_info_vram_total", f"{16 * 1024 ** 3}\n")
+
+    # Packages, every 50th with a newer build and every 40th with a security update
+    status, main, security = [], [], []
+    for i in range(2000):
+        stanza = f"Package: pkg{i}\nArchitecture: amd64\nVersion: 1.{i}-1"
+        status.append(f"Package: pkg{i}\nStatus: install ok installed\nArchitecture: amd64\nVersion: 1.{i}-1\n")
+        main.append(f"{stanza}{'+b1' if i % 50 == 0 else ''}\n")
+        if i % 40 == 0:
+            security.append(f"{stanza}+deb12u1\n")
+    lists = f"{root}/var/lib/apt/lists"
+    _write(f"{root}/var/lib/dpkg/status", "\n".join(status))
+    _write(f"{lists}/deb.debian.org_debian_dists_bookworm_main_binary-amd64_Packages", "\n".join(main))
+    _write(f"{lists}/deb.debian.org_debian-security_dists_bookworm-security_main_binary-amd64_Packages",
+           "\n".join(security))
+    return root
+
+
+def bench_collector(panel, name, iterations, alloc_iterations, warm=False):
+    """Latency percentiles, forks and allocations for one getter.
+
+    The panel cache is emptied before every call unless warm is set, so the
+    numbers are the cost of actually collecting.
+    """
+    global _forks
+    func = getattr(panel, name)
+    func()  # warm up psutil caches and imports
+
+    timings = []
+    _forks = 0
+    for _ in range(iterations):
+        if not warm:
+            panel.cache.invalidate()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    forks = _forks / iterations
+
+    # Allocation pass runs separately so tracing overhead does not skew latency
+    peaks = []
+    retained = []
+    for _ in range(alloc_iterations):
+        if not warm:
+            panel.cache.invalidate()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - before)
+        retained.append(current - before)
+
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p90_ms": round(percentile(timings, 90), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "max_ms": round(max(timings), 3),
+        "forks_per_call": round(forks, 2),
+        "alloc_peak_kib": round(statistics.median(peaks) / 1024, 1),
+        "retained_kib": round(statistics.median(retained) / 1024, 1),
+    }
+
+
+def run_target(panel, collectors, iterations, alloc_iterations, warm=False):
+    results = {}
+    for name in collectors:
+        try:
+            results[name] = bench_collector(panel, name, iterations, alloc_iterations, warm)
+        except Exception as e:
+            results[name] = {"error": str(e)}
+        print_row(name, results[name])
+    return results
+
+
+def run_fixture(panel, root, collectors, iterations, alloc_iterations, warm=False):
+    """Run collectors against a fixture root"""
+    live_procfs = psutil.PROCFS_PATH
+    live_source = panel.source
+    panel.set_source(DataSource(root))
+    try:
+        return run_target(panel, collectors, iterations, alloc_iterations, warm)
+    finally:
+        panel.set_source(live_source)
+        psutil.PROCFS_PATH = live_procfs
+
+
+def run_ui(source, rounds):
+    """Render every tab against a source, reporting render cost and memory growth"""
+    import tkinter as tk
+    root = tk.Tk()
+    panel = LinuxSystemPanel(root, source=source)
+    root.update()
+    own = psutil.Process()
+    timings = {text: [] for text, _ in panel.menu_items}
+    heap = []
+    rss_start = own.memory_info().rss
+    tracemalloc.start()
+    try:
+        for _ in range(rounds):
+            for text, index in panel.menu_items:
+                start = time.perf_counter()
+                panel.switch_tab(index)
+                root.update()
+                timings[text].append((time.perf_counter() - start) * 1000)
+            heap.append(tracemalloc.get_traced_memory()[0])
+    finally:
+        tracemalloc.stop()
+        panel.on_closing()
+
+    print(f"\n== Tab render cost over {rounds} rounds ==")
+    print(f"{'tab':<28}{'p50 ms':>10}{'p90 ms':>10}{'max ms':>10}")
+    results = {}
+    for text, values in timings.items():
+        results[text] = {"p50_ms": round(percentile(values, 50), 3),
+                         "p90_ms": round(percentile(values, 90), 3),
+                         "max_ms": round(max(values), 3)}
+        print(f"{text:<28}{results[text]['p50_ms']:>10.2f}{results[text]['p90_ms']:>10.2f}{results[text]['max_ms']:>10.2f}")
+    growth = {"heap_growth_kib": round((heap[-1] - heap[0]) / 1024, 1),
+              "rss_growth_kib": round((own.memory_info().rss - rss_start) / 1024, 1)}
+    print(f"Heap growth after first round: {growth['heap_growth_kib']} KiB, RSS growth: {growth['rss_growth_kib']} KiB")
+    results["memory"] = growth
+    return results
+
+
+def soak_tick(panel):
+    """One round of the work the panel repeats while it stays open"""
+    panel.cache.invalidate()
+    panel.sampler.sample()
+    panel.process_index.update(ProcessTable.sample(panel.source))
+    panel.process_index.query("cpu>0.1")
+    panel.get_top_processes()
+    panel.get_ram_details()
+    panel.get_disk_info()
+    span = panel.history.span("cpu.percent")
+    if span:
+        panel.history.columns("cpu.percent", span[1] - 3600, span[1], 800)
+
+
+def run_soak(source, ticks, warmup, budget_kib):
+    """Heap growth of the panel's periodic work after a warm-up.
+
+    Caches, indexes and history buffers fill during the warm-up. What the
+    heap still gains over the measured ticks is what days of uptime would
+    keep gaining, so it is held to a budget.
+    """
+    panel = LinuxSystemPanel.headless(source)
+    try:
+        for _ in range(warmup):
+            soak_tick(panel)
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        start = time.perf_counter()
+        for _ in range(ticks):
+            soak_tick(panel)
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        panel.executor.shutdown(wait=False)
+        panel.slow_executor.shutdown(wait=False)
+
+    growth = after.compare_to(before, "lineno")
+    total = sum(stat.size_diff for stat in growth)
+    print(f"\n== Heap growth over {ticks} ticks after {warmup} warm-up ticks ==")
+    for stat in sorted(growth, key=lambda stat: stat.size_diff, reverse=True)[:10]:
+        if stat.size_diff <= 0:
+            break
+        frame = stat.traceback[0]
+        print(f"{stat.size_diff / 1024:>10.1f} KiB {stat.count_diff:>+8} blocks  {frame.filename}:{frame.lineno}")
+    over = total > budget_kib * 1024
+    print(f"Growth: {total / 1024:.1f} KiB (budget {budget_kib} KiB), peak {peak / 1024:.1f} KiB, "
+          f"{elapsed / ticks * 1000:.2f} ms per tick{'  OVER BUDGET' if over else ''}")
+    return {"ticks": ticks, "warmup": warmup, "heap_growth_kib": round(total / 1024, 1),
+            "peak_kib": round(peak / 1024, 1), "ms_per_tick": round(elapsed / ticks * 1000, 3),
+            "budget_kib": budget_kib, "over_budget": over}
+
+
+def print_header(title):
+    print(f"\n== {title} ==")
+    print(f"{'collector':<28}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'forks':>8}{'peak KiB':>11}{'kept KiB':>10}")
+
+
+def print_row(name, result):
+    if "error" in result:
+        print(f"{name:<28}  error: {result['error']}")
+        return
+    print(f"{name:<28}{result['p50_ms']:>10.2f}{result['p90_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+          f"{result['forks_per_call']:>8.1f}{result['alloc_peak_kib']:>11.1f}{result['retained_kib']:>10.1f}")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, timeout=2).decode().strip()
+    except Exception:
+        return None
+
+
+def load_history(path):
+    records = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+    except (OSError, ValueError):
+        pass
+    return records
+
+
+def compare(previous, current, threshold):
+    """Print p50 changes against an earlier run"""
+    print(f"\n== Compared with v{previous['version']} ({previous.get('revision') or 'unknown'}, {previous['timestamp']}) ==")
+    for target, results in current["targets"].items():
+        old_results = previous["targets"].get(target, {})
+        for name, result in results.items():
+            old = old_results.get(name)
+            if not old or "p50_ms" not in old or "p50_ms" not in result or old["p50_ms"] == 0:
+                continue
+            change = (result["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            flag = "  REGRESSION" if change > threshold else ""
+            print(f"{target + '/' + name:<40}{old['p50_ms']:>10.2f} -> {result['p50_ms']:<10.2f}{change:+7.1f}%{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the control panel collectors")
+    parser.add_argument("--iterations", type=int, default=20, help="timed calls per collector")
+    parser.add_argument("--alloc-iterations", type=int, default=3, help="traced calls per collector")
+    parser.add_argument("--collector", action="append", help="only run the named collector (repeatable)")
+    parser.add_argument("--warm", action="store_true", help="keep the panel cache between calls")
+    parser.add_argument("--network", action="store_true", help="include collectors that use the internet")
+    parser.add_argument("--no-live", action="store_true", help="skip the live host run")
+    parser.add_argument("--fixture", help="existing fixture root to run against")
+    parser.add_argument("--make-fixture", metavar="DIR", help="record a fixture root to DIR and exit")
+    parser.add_argument("--processes", type=int, default=1000, help="synthetic processes in the fixture")
+    parser.add_argument("--mounts", type=int, default=50, help="synthetic mounts in the fixture")
+    parser.add_argument("--interfaces", type=int, default=8, help="synthetic interfaces in the fixture")
+    parser.add_argument("--ui", action="store_true", help="measure tab render cost instead of collectors (needs a display)")
+    parser.add_argument("--rounds", type=int, default=5, help="times every tab is rendered with --ui")
+    parser.add_argument("--replay", help="capture file to replay with --ui instead of a fixture root")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed with --replay")
+    parser.add_argument("--soak", type=int, metavar="TICKS", help="repeat the periodic work TICKS times and check heap growth")
+    parser.add_argument("--warmup", type=int, default=200, help="ticks before heap growth is measured with --soak")
+    parser.add_argument("--budget", type=float, default=256.0, help="heap growth in KiB allowed with --soak")
+    parser.add_argument("--history", default=os.path.join(STATE_DIR, "benchmark_history.jsonl"),
+                        help="file the results are appended to")
+    parser.add_argument("--no-save", action="store_true", help="do not append results to the history file")
+    parser.add_argument("--threshold", type=float, default=20.0, help="p50 slowdown in percent reported as a regression")
+    args = parser.parse_args()
+
+    if args.make_fixture:
+        make_fixture(args.make_fixture, args.processes, args.mounts, args.interfaces)
+        print(f"Fixture written to {args.make_fixture}")
+        return
+
+    if args.ui:
+        record_ui(args)
+        return
+
+    if args.soak:
+        record_soak(args)
+        return
+
+    collectors = args.collector or COLLECTORS + (NETWORK_COLLECTORS if args.network else [])
+    sys.addaudithook(_count_forks)
+    panel = LinuxSystemPanel.headless()
+
+    record = new_record(args)
+
+    if not args.no_live:
+        print_header("Live host")
+        record["targets"]["live"] = run_target(panel, collectors, args.iterations, args.alloc_iterations, args.warm)
+
+    fixture_root = args.fixture
+    temp_root = None
+    if not fixture_root:
+        temp_root = fixture_root = make_fixture(tempfile.mkdtemp(prefix="panel-fixture-"),
+                                                args.processes, args.mounts, args.interfaces)
+    else:
+        record["fixture"] = {"path": os.path.abspath(fixture_root)}
+    try:
+        print_header(f"Fixture root {fixture_root}")
+        record["targets"]["fixture"] = run_fixture(panel, fixture_root, collectors, args.iterations,
+                                                   args.alloc_iterations, args.warm)
+    finally:
+        if temp_root:
+            shutil.rmtree(temp_root, ignore_errors=True)
+        panel.executor.shutdown(wait=False)
+        panel.slow_executor.shutdown(wait=False)
+
+    save_record(args, record)
+
+
+def record_ui(args):
+    record = new_record(args)
+    temp_root = None
+    if args.replay:
+        source = ReplaySource(args.replay, speed=args.speed)
+        record["replay"] = {"path": os.path.abspath(args.replay), "speed": args.speed}
+    else:
+        root = args.fixture
+        if not root:
+            temp_root = root = make_fixture(tempfile.mkdtemp(prefix="panel-fixture-"),
+                                            args.processes, args.mounts, args.interfaces)
+        source = DataSource(root)
+    try:
+        record["targets"]["ui"] = run_ui(source, args.rounds)
+    finally:
+        if temp_root:
+            shutil.rmtree(temp_root, ignore_errors=True)
+    save_record(args, record)
+
+
+def record_soak(args):
+    record = new_record(args)
+    temp_root = None
+    if args.replay:
+        source = ReplaySource(args.replay, speed=args.speed)
+    else:
+        root = args.fixture
+        if not root:
+            temp_root = root = make_fixture(tempfile.mkdtemp(prefix="panel-fixture-"),
+                                            args.processes, args.mounts, args.interfaces)
+        source = DataSource(root)
+    try:
+        record["targets"]["soak"] = run_soak(source, args.soak, args.warmup, args.budget)
+    finally:
+        if temp_root:
+            shutil.rmtree(temp_root, ignore_errors=True)
+    save_record(args, record)
+    if record["targets"]["soak"]["over_budget"]:
+        sys.exit(1)
+
+
+def new_record(args):
+    return {
+        "version": PANEL_VERSION,
+        "revision": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "psutil": psutil.__version__,
+        "fixture": {"processes": args.processes, "mounts": args.mounts, "interfaces": args.interfaces},
+        "warm_cache": getattr(args, "warm", False),
+        "targets": {},
+    }
+
+
+def save_record(args, record):
+    history = load_history(args.history)
+    previous = [r for r in history if (r["version"], r.get("revision")) != (record["version"], record["revision"])]
+    if previous:
+        compare(previous[-1], record, args.threshold)
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nResults appended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 #!/bin/sh
 
 print_usage() {
-    echo "Usage: $0 {sysinfo|hwinfo|privacy|netinfo|diskinfo|procs|services|power|about}"
+    echo "Usage: $0 {sysinfo|hwinfo|privacy|netinfo|diskinfo|procs|services|power|report [DIR]|about}"
 }
 
 sys_info() {
@@ -26,6 +26,7 @@ sys_info() {
     else
         echo "CPU Temp: N/A"
     fi
+    sensors_info
     echo "Load Average: $(awk '{print $1, $2, $3}' /proc/loadavg)"
     if command -v acpi >/dev/null; then
         echo "Battery: $(acpi -b | awk -F', ' '{print $2}')"
@@ -35,6 +36,26 @@ sys_info() {
     echo "---------------"
 }
 
+sensors_info() {
+    for zone in /sys/class/thermal/thermal_zone*; do
+        [ -r "$zone/temp" ] || continue
+        echo "Thermal $(basename "$zone") ($(cat "$zone/type" 2>/dev/null)): $(awk '{printf("%.1f°C", $1/1000)}' "$zone/temp" 2>/dev/null || echo N/A)"
+    done
+    for hwmon in /sys/class/hwmon/hwmon*; do
+        [ -d "$hwmon" ] || continue
+        chip=$(cat "$hwmon/name" 2>/dev/null || basename "$hwmon")
+        for input in "$hwmon"/temp*_input "$hwmon"/fan*_input; do
+            [ -r "$input" ] || continue
+            label_file="${input%_input}_label"
+            label=$(cat "$label_file" 2>/dev/null || basename "${input%_input}")
+            case "$input" in
+                */fan*) echo "Fan $chip/$label: $(cat "$input" 2>/dev/null || echo N/A) RPM" ;;
+                *) echo "Sensor $chip/$label: $(awk '{printf("%.1f°C", $1/1000)}' "$input" 2>/dev/null || echo N/A)" ;;
+            esac
+        done
+    done
+}
+
 hw_info() {
     echo "== Hardware Information =="
     lscpu | grep -E 'Model name|Vendor ID|CPU(s)|Thread|MHz|Cache'
@@ -46,9 +67,40 @@ hw_info() {
     fi
     echo "RAM Details:"
     free -h | awk '/Mem:/ {print "Total: "$2", Used: "$3", Free: "$4}'
+    echo "Sensors:"
+    sensors_info
     echo "---------------"
 }
 
+updates_info() {
+    # What apt list --upgradable reports, from dpkg's status and apt's lists
+    status=/var/lib/dpkg/status
+    [ -r "$status" ] || { echo "Unknown"; return; }
+    set --
+    for list in /var/lib/apt/lists/*_Packages; do
+        [ -r "$list" ] && set -- "$@" "$list"
+    done
+    [ $# -gt 0 ] || { echo "0 packages upgradable (0 security)"; return; }
+    awk -v status="$status" 'BEGIN { RS = ""; FS = "\n" }
+        {
+            pkg = arch = ver = ""; installed = 0
+            for (i = 1; i <= NF; i++) {
+                if ($i ~ /^Package: /) pkg = substr($i, 10)
+                else if ($i ~ /^Architecture: /) arch = substr($i, 15)
+                else if ($i ~ /^Version: /) ver = substr($i, 10)
+                else if ($i ~ /^Status: .* installed$/) installed = 1
+            }
+            if (FILENAME == status) { if (installed) current[pkg ":" arch] = ver; next }
+            if ((pkg ":" arch) in current && ver != current[pkg ":" arch])
+                print pkg, current[pkg ":" arch], ver, (FILENAME ~ /security/ ? "security" : "-")
+        }' "$status" "$@" |
+    while read -r pkg installed candidate origin; do
+        dpkg --compare-versions "$candidate" gt "$installed" && echo "$pkg $origin"
+    done |
+    awk '{ security[$1] = security[$1] || $2 == "security" }
+        END { for (pkg in security) { total++; count += security[pkg] } printf("%d packages upgradable (%d security)\n", total, count) }'
+}
+
 privacy_status() {
     echo "== Privacy Status =="
     echo "Firewall (ufw): $(ufw status 2>/dev/null | head -n1 || echo 'ufw not installed')"
@@ -57,11 +109,11 @@ privacy_status() {
     echo "DNS Servers: $(awk '/^nameserver/ {print $2}' /etc/resolv.conf | paste -sd ',')"
     echo "Network Encryption: $(openssl version 2>/dev/null || echo 'openssl not available')"
     echo "DNS-over-TLS: $(grep -q '^DNSOverTLS=yes' /etc/systemd/resolved.conf 2>/dev/null && echo Enabled || echo Disabled)"
-    echo "Updates: $(apt list --upgradable 2>/dev/null | grep -v Listing | wc -l) packages upgradable"
+    echo "Updates: $(updates_info)"
     echo "Antivirus (clamav): $(systemctl is-active clamav-daemon 2>/dev/null || echo inactive)"
     echo "SELinux: $(getenforce 2>/dev/null || echo N/A)"
     echo "AppArmor: $(aa-status 2>/dev/null | grep -q loaded && echo Active || echo Inactive)"
-    echo "Kernel ASLR: $(sysctl kernel.randomize_va_space | awk '{print $3}')"
+    echo "Kernel ASLR: $(cat /proc/sys/kernel/randomize_va_space 2>/dev/null || echo N/A)"
     echo "USB Protection: $(lsusb >/dev/null && echo Active || echo Inactive)"
     echo "SSH Status: $(systemctl is-active ssh 2>/dev/null || echo inactive)"
     echo "Open Ports: $(ss -tuln | wc -l) listening"
@@ -106,13 +158,52 @@ services() {
 
 power_info() {
     echo "== Power Information =="
-    if command -v acpi >/dev/null; then
-        acpi -b
+    for supply in /sys/class/power_supply/*; do
+        [ -r "$supply/uevent" ] || continue
+        awk -F= -v name="$(basename "$supply")" '
+            { v[$1] = $2 }
+            END {
+                line = name " (" v["POWER_SUPPLY_TYPE"] ")"
+                if ("POWER_SUPPLY_STATUS" in v) line = line ": " v["POWER_SUPPLY_STATUS"]
+                if ("POWER_SUPPLY_ONLINE" in v) line = line ": " (v["POWER_SUPPLY_ONLINE"] == 1 ? "Online" : "Offline")
+                if ("POWER_SUPPLY_CAPACITY" in v) line = line ", " v["POWER_SUPPLY_CAPACITY"] "%"
+                if ("POWER_SUPPLY_POWER_NOW" in v)
+                    line = line sprintf(", %.1fW", v["POWER_SUPPLY_POWER_NOW"] / 1000000)
+                else if ("POWER_SUPPLY_CURRENT_NOW" in v && "POWER_SUPPLY_VOLTAGE_NOW" in v)
+                    line = line sprintf(", %.1fW", v["POWER_SUPPLY_CURRENT_NOW"] * v["POWER_SUPPLY_VOLTAGE_NOW"] / 1e12)
+                if ("POWER_SUPPLY_ENERGY_NOW" in v && v["POWER_SUPPLY_ENERGY_FULL"] > 0)
+                    line = line sprintf(", %.1f/%.1fWh", v["POWER_SUPPLY_ENERGY_NOW"] / 1e6, v["POWER_SUPPLY_ENERGY_FULL"] / 1e6)
+                print line
+            }' "$supply/uevent"
+    done
+    # RAPL counters are cumulative microjoules, sample them one second apart
+    before=""
+    for zone in /sys/class/powercap/intel-rapl:*; do
+        [ -r "$zone/energy_uj" ] && before="$before $zone:$(cat "$zone/energy_uj")"
+    done
+    if [ -n "$before" ]; then
+        sleep 1
+        for entry in $before; do
+            zone=${entry%:*}
+            awk -v name="$(cat "$zone/name")" -v start="${entry##*:}" -v range="$(cat "$zone/max_energy_range_uj")" '
+                { delta = $1 - start; if (delta < 0) delta += range + 1; printf("RAPL %s: %.1fW\n", name, delta / 1000000) }' "$zone/energy_uj"
+        done
+    elif ls /sys/class/powercap/intel-rapl:* >/dev/null 2>&1; then
+        echo "RAPL: energy counters are readable by root only"
+    fi
+    if [ -r /sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq ]; then
+        echo "CPU Frequency: $(awk '{printf("%.0fMHz", $1/1000)}' /sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq)"
+    else
+        echo "CPU Frequency: $(lscpu | awk -F: '/MHz/ {print $2}' | head -n1)"
     fi
-    echo "CPU Frequency: $(lscpu | awk -F: '/MHz/ {print $2}')"
     echo "---------------"
 }
 
+report() {
+    # The GUI script runs every collector concurrently and writes the files
+    python3 "$(dirname "$0")/controlpanelgui.py" --report "${1:-.}"
+}
+
 about() {
     echo "Securonis Linux System Control Panel CLI"
     echo "This tool is specifically designed for Debian Linux systems."
@@ -133,6 +224,7 @@ case "$1" in
     procs) procs ;;
     services) services ;;
     power) power_info ;;
+    report) report "$2" ;;
     about) about ;;
     *) print_usage ;;
 esac
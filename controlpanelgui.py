@@ -1,47 +1,4295 @@
 #!/usr/bin/env python3
 import tkinter as tk
-from tkinter import font, ttk, messagebox
+from tkinter import font, ttk, messagebox, filedialog
 import psutil
 import platform
 import datetime
 import socket
 import subprocess
 import re
+import random
 import time
 import os
 import json
+import math
 import requests
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Dict, List, Optional
 import queue
 import signal
 import sys
+import io
+import bisect
+import collections
+import types
+import warnings
+import argparse
+import array
+import asyncio
+import functools
+import gzip
+import html
+import ctypes
+import ctypes.util
+import select
+import struct
+import fnmatch
+import heapq
+import pwd
+import shlex
+import shutil
+import selectors
+import socketserver
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from PIL import Image, ImageTk
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+PANEL_VERSION = "1.8"
+
+# The panel's own process. psutil keeps the procfs path a Process was created
+# with, so this stays on the real /proc when a DataSource root repoints psutil.
+PANEL_PROCESS = psutil.Process()
+
+CONFIG_DIR = os.path.join(os.environ.get('XDG_CONFIG_HOME', os.path.expanduser('~/.config')), 'securonis-panel')
+STATE_DIR = os.path.join(os.environ.get('XDG_STATE_HOME', os.path.expanduser('~/.local/state')), 'securonis-panel')
+
+
+class DataSource:
+    """Where the panel reads system data from.
+
+    The default source is the live host. Passing a root reads procfs, sysfs
+    and config files below that directory instead, which is how fixture
+    trees with thousands of processes and mounts are driven.
+    """
+
+    # psutil functions the getters use
+    PSUTIL_CALLS = ('cpu_percent', 'cpu_count', 'cpu_freq', 'virtual_memory', 'swap_memory',
+                    'boot_time', 'sensors_temperatures', 'sensors_fans', 'sensors_battery', 'net_io_counters',
+                    'net_if_addrs', 'net_if_stats', 'net_connections', 'disk_partitions', 'disk_usage')
+
+    def __init__(self, root="/"):
+        self.root = root
+        if root != "/":
+            # psutil has no per-call procfs path, so this is process wide
+            psutil.PROCFS_PATH = self.path("/proc")
+
+    def path(self, path):
+        """Map an absolute host path below the root"""
+        if self.root == "/":
+            return path
+        return os.path.join(self.root, path.lstrip("/"))
+
+    def open(self, path, mode='r'):
+        return open(self.path(path), mode)
+
+    def exists(self, path):
+        return os.path.exists(self.path(path))
+
+    def listdir(self, path):
+        return sorted(os.listdir(self.path(path)))
+
+    def subdirs(self, path):
+        """Names of the directories directly below path"""
+        with os.scandir(self.path(path)) as entries:
+            return sorted(entry.name for entry in entries if entry.is_dir(follow_symlinks=False))
+
+    def mtime(self, path):
+        return os.stat(self.path(path)).st_mtime_ns
+
+    def readlink(self, path):
+        return os.readlink(self.path(path))
+
+    def check_output(self, args, **kwargs):
+        return subprocess.check_output(args, **kwargs)
+
+    def process_iter(self, attrs):
+        return psutil.process_iter(attrs)
+
+    def __getattr__(self, name):
+        if name in self.PSUTIL_CALLS:
+            return getattr(psutil, name)
+        raise AttributeError(name)
+
+
+class RecordingSource(DataSource):
+    """Live source that also writes every read to a capture file"""
+
+    def __init__(self, capture_path, root="/"):
+        super().__init__(root)
+        self._capture = open(capture_path, 'w')
+        self._capture_lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def _record(self, kind, key, value=None, error=None):
+        event = {"t": round(time.monotonic() - self._start, 3), "kind": kind, "key": key}
+        if error is not None:
+            event["error"] = f"{type(error).__name__}: {error}"
+        else:
+            event["value"] = _encode_value(value)
+        with self._capture_lock:
+            self._capture.write(json.dumps(event) + "\n")
+            self._capture.flush()
+
+    def _recorded(self, kind, key, func, *args, **kwargs):
+        try:
+            value = func(*args, **kwargs)
+        except Exception as e:
+            self._record(kind, key, error=e)
+            raise
+        self._record(kind, key, value)
+        return value
+
+    def open(self, path, mode='r'):
+        def read():
+            with open(self.path(path), mode) as f:
+                return f.read()
+        return io.StringIO(self._recorded("file", path, read))
+
+    def exists(self, path):
+        return self._recorded("exists", path, super().exists, path)
+
+    def listdir(self, path):
+        return self._recorded("listdir", path, super().listdir, path)
+
+    def subdirs(self, path):
+        return self._recorded("subdirs", path, super().subdirs, path)
+
+    def mtime(self, path):
+        return self._recorded("mtime", path, super().mtime, path)
+
+    def readlink(self, path):
+        return self._recorded("readlink", path, super().readlink, path)
+
+    def check_output(self, args, **kwargs):
+        output = self._recorded("run", " ".join(args),
+                                lambda: subprocess.check_output(args, **kwargs).decode())
+        return output.encode()
+
+    def process_iter(self, attrs):
+        infos = []
+        for proc in psutil.process_iter(attrs):
+            try:
+                infos.append(proc.info)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._record("psutil", _call_key("process_iter", (attrs,), {}), infos)
+        return [types.SimpleNamespace(info=info) for info in infos]
+
+    def __getattr__(self, name):
+        func = super().__getattr__(name)
+        return lambda *args, **kwargs: self._recorded("psutil", _call_key(name, args, kwargs),
+                                                      func, *args, **kwargs)
+
+
+class ReplaySource(DataSource):
+    """Replay a capture written by RecordingSource at a chosen speed.
+
+    Each read returns the latest recorded value at the current replay time.
+    The capture loops when it runs out, so a short recording can drive the
+    panel for as long as a load test needs.
+    """
+
+    def __init__(self, capture_path, speed=1.0, loop=True):
+        super().__init__("/")
+        self.speed = speed
+        self.loop = loop
+        self._events = collections.defaultdict(lambda: ([], []))
+        self.duration = 0.0
+        with open(capture_path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                times, values = self._events[(event["kind"], event["key"])]
+                times.append(event["t"])
+                values.append(event)
+                self.duration = max(self.duration, event["t"])
+        self._start = time.monotonic()
+
+    def _lookup(self, kind, key):
+        if (kind, key) not in self._events:
+            raise OSError(f"{kind} {key} not in capture")
+        times, values = self._events[(kind, key)]
+        elapsed = (time.monotonic() - self._start) * self.speed
+        if self.loop and self.duration > 0:
+            elapsed %= self.duration
+        event = values[max(0, bisect.bisect_right(times, elapsed) - 1)]
+        if "error" in event:
+            raise OSError(event["error"])
+        return _decode_value(event["value"])
+
+    def open(self, path, mode='r'):
+        return io.StringIO(self._lookup("file", path))
+
+    def exists(self, path):
+        return self._lookup("exists", path)
+
+    def listdir(self, path):
+        return self._lookup("listdir", path)
+
+    def subdirs(self, path):
+        return self._lookup("subdirs", path)
+
+    def mtime(self, path):
+        return self._lookup("mtime", path)
+
+    def readlink(self, path):
+        return self._lookup("readlink", path)
+
+    def check_output(self, args, **kwargs):
+        return self._lookup("run", " ".join(args)).encode()
+
+    def process_iter(self, attrs):
+        infos = self._lookup("psutil", _call_key("process_iter", (attrs,), {}))
+        return [types.SimpleNamespace(info=info) for info in infos]
+
+    def __getattr__(self, name):
+        if name not in self.PSUTIL_CALLS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._lookup("psutil", _call_key(name, args, kwargs))
+
+
+def _call_key(name, args, kwargs):
+    return name + json.dumps([list(args), kwargs], sort_keys=True, default=str)
+
+
+_namedtuple_types = {}
+
+
+def _encode_value(value):
+    """Make psutil results JSON serialisable, keeping namedtuple field names"""
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return {"__namedtuple__": type(value).__name__,
+                "fields": {k: _encode_value(v) for k, v in value._asdict().items()}}
+    if isinstance(value, dict):
+        return {str(k): _encode_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "__namedtuple__" in value:
+            fields = value["fields"]
+            key = (value["__namedtuple__"], tuple(fields))
+            if key not in _namedtuple_types:
+                _namedtuple_types[key] = collections.namedtuple(value["__namedtuple__"], fields)
+            return _namedtuple_types[key](**{k: _decode_value(v) for k, v in fields.items()})
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+class TTLCache:
+    """Thread safe cache with per-key TTLs and an LRU size cap.
+
+    Concurrent misses for the same key share a single load. With
+    stale=True an expired value is returned at once while one background
+    refresh runs on the executor. invalidate() bumps the key's generation,
+    so a load that started before it is handed to its callers but not
+    stored. A queued refresh is only joined once a worker runs it, so a
+    miss never waits behind the executor queue.
+    """
+
+    def __init__(self, maxsize=256, executor=None):
+        self.maxsize = maxsize
+        self.executor = executor
+        self._entries = collections.OrderedDict()  # key -> (value, stored at, ttl)
+        self._inflight = {}  # key -> Future shared by every waiting caller
+        self._generations = {}  # key -> times invalidated
+        self._epoch = 0  # times everything was invalidated
+        self._queued = set()  # keys with a stale refresh waiting for a worker
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.shared_loads = 0
+        self.evictions = 0
+
+    def get(self, key, loader, ttl=5, stale=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, entry_ttl = entry
+                if time.monotonic() - stored_at <= entry_ttl:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return value
+                if stale and self.executor is not None:
+                    self.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    if key not in self._inflight and key not in self._queued:
+                        self._queued.add(key)
+                        self.executor.submit(self._refresh, key, loader, ttl)
+                    return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+                generation = self._generation(key)
+                self.misses += 1
+            else:
+                self.shared_loads += 1
+        if owner:
+            self._load(key, loader, ttl, future, generation)
+        return future.result()
+
+    def _generation(self, key):
+        return (self._epoch, self._generations.get(key, 0))
+
+    def _refresh(self, key, loader, ttl):
+        """Stale refresh on a worker, joinable by misses only from here on"""
+        with self._lock:
+            if key not in self._queued:
+                return  # invalidated while queued
+            self._queued.discard(key)
+            if key in self._inflight:
+                return  # a miss is already loading it
+            future = self._inflight[key] = Future()
+            generation = self._generation(key)
+        self._load(key, loader, ttl, future, generation)
+
+    def _load(self, key, loader, ttl, future, generation):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+            future.set_exception(e)
+            return
+        with self._lock:
+            # a value read before an invalidate() would outlive the change it missed
+            if self._generation(key) == generation:
+                self._entries[key] = (value, time.monotonic(), ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(value)
+
+    def peek(self, key, default=None):
+        """Last value for key regardless of age, without loading"""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry is not None else default
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything.
+
+        Loads in flight keep serving the callers already waiting on them,
+        later misses start a fresh load.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._inflight.clear()
+                self._queued.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(key, None)
+                self._inflight.pop(key, None)
+                self._queued.discard(key)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses + self.shared_loads
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "shared_loads": self.shared_loads,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.stale_hits + self.shared_loads) / lookups if lookups else 0.0,
+            }
+
+
+def cached(ttl, stale=False):
+    """Route a getter through the panel cache, keyed on its name and arguments"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__name__,) + args + tuple(sorted(kwargs.items()))
+            return self.cache.get(key, lambda: func(self, *args, **kwargs), ttl, stale)
+        return wrapper
+    return decorator
+
+
+def parse_os_release(text):
+    os_info = {}
+    for line in text.splitlines():
+        if '=' in line:
+            key, value = line.strip().split('=', 1)
+            os_info[key] = value.strip('"')
+    return os_info
+
+
+def parse_resolv_conf(text):
+    nameservers = []
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[0] == 'nameserver':
+            nameservers.append(fields[1])
+    return {"nameservers": nameservers, "text": text}
+
+
+def parse_resolved_conf(text):
+    """Settings of the [Resolve] section, commented lines ignored"""
+    settings = {}
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(('#', ';')):
+            continue
+        if line.startswith('['):
+            section = line.strip('[]')
+        elif section == 'Resolve' and '=' in line:
+            key, value = line.split('=', 1)
+            settings[key.strip()] = value.strip()
+    return settings
+
+
+def parse_route_table(text):
+    """Rows of /proc/net/route with addresses in dotted form"""
+    routes = []
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 8:
+            continue
+        routes.append({
+            "iface": fields[0],
+            "destination": socket.inet_ntoa(struct.pack('<I', int(fields[1], 16))),
+            "gateway": socket.inet_ntoa(struct.pack('<I', int(fields[2], 16))),
+            "flags": int(fields[3], 16),
+            "metric": int(fields[6]),
+            "mask": socket.inet_ntoa(struct.pack('<I', int(fields[7], 16))),
+        })
+    return routes
+
+
+class FileWatcher:
+    """Keeps parsed config files in memory and re-parses them only on change.
+
+    With inotify the parent directories of watched files are watched, so
+    files replaced by rename (NetworkManager rewriting resolv.conf) are
+    noticed too. Route and link changes arrive on an rtnetlink socket,
+    since procfs does not support inotify. Without inotify every get()
+    compares the file's mtime, inode and size instead, and poll() finds
+    changes for the listeners.
+    """
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    RTMGRP_LINK = 0x1
+    RTMGRP_IPV4_ROUTE = 0x40
+    RTM_NEWLINK, RTM_DELLINK, RTM_NEWROUTE, RTM_DELROUTE = 16, 17, 24, 25
+    # Pseudo paths notified for rtnetlink events
+    NETLINK_PATHS = {RTM_NEWLINK: '/sys/class/net', RTM_DELLINK: '/sys/class/net',
+                     RTM_NEWROUTE: '/proc/net/route', RTM_DELROUTE: '/proc/net/route'}
+
+    def __init__(self, source):
+        self.source = source
+        # Recordings and replays have to see every read
+        self.live = type(source) is DataSource
+        self._entries = {}  # (path, parser) -> [signature, value, changes seen, changes read]
+        self._targets = collections.defaultdict(set)  # (watched dir, name) -> paths
+        self._wds = {}  # inotify watch descriptor -> watched dir
+        self._dirs = {}  # watched dir -> watch descriptor
+        self._generations = collections.Counter()  # netlink driven paths -> change count
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._inotify = None
+        self._netlink = None
+        self._libc = None
+
+    @property
+    def event_driven(self):
+        return self._inotify is not None
+
+    def start(self):
+        """Start the inotify/rtnetlink thread, falling back to polling"""
+        if not self.live:
+            return
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = self._libc.inotify_init1(os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            self._inotify = fd
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable, polling config files: {e}")
+            return
+        if self.source.root == "/":
+            try:
+                self._netlink = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+                self._netlink.bind((0, self.RTMGRP_LINK | self.RTMGRP_IPV4_ROUTE))
+            except (OSError, AttributeError) as e:
+                print(f"rtnetlink unavailable, routes are re-read every time: {e}")
+                self._netlink = None
+        with self._lock:
+            paths = {path for path, _ in self._entries}
+        for path in paths:
+            self.watch(path)
+        threading.Thread(target=self._run, name="file-watcher", daemon=True).start()
+
+    def add_listener(self, callback):
+        """callback(path) runs on the watcher thread, or in poll(), after a change"""
+        self._listeners.append(callback)
+
+    def watch(self, path):
+        """Start watching path before its first read"""
+        if not self.live or self._inotify is None or path.startswith('/proc/'):
+            return
+        host_path = self.source.path(path)
+        for target in {host_path, os.path.realpath(host_path)}:
+            directory, name = os.path.split(target)
+            with self._lock:
+                self._targets[(directory, name)].add(path)
+                if directory in self._dirs:
+                    continue
+            wd = self._libc.inotify_add_watch(self._inotify, directory.encode(), self.WATCH_MASK)
+            if wd >= 0:
+                with self._lock:
+                    self._dirs[directory] = wd
+                    self._wds[wd] = directory
+
+    def get(self, path, parser):
+        """Parsed contents of path, re-parsed only if the file changed"""
+        if not self.live:
+            with self.source.open(path) as f:
+                return parser(f.read())
+        key = (path, parser)
+        with self._lock:
+            entry = self._entries.get(key)
+            new = entry is None
+            if new:
+                # dirty until the first read is stored
+                entry = self._entries[key] = [None, None, 1, 0]
+            changes = entry[2]
+        if new:
+            # watched before the first read, so a change during it is not missed
+            self.watch(path)
+        elif changes == entry[3] and self._trusted(path):
+            return entry[1]
+        signature = self._signature(path)
+        if signature is not None and signature == entry[0]:
+            with self._lock:
+                # changes noticed after the stat keep the entry dirty
+                entry[3] = max(entry[3], changes)
+            return entry[1]
+        with self.source.open(path) as f:
+            value = parser(f.read())
+        with self._lock:
+            if changes >= entry[3]:
+                entry[0], entry[1], entry[3] = signature, value, changes
+        return value
+
+    def poll(self):
+        """Notify listeners about changed files when inotify is unavailable"""
+        with self._lock:
+            entries = list(self._entries.items())
+        changed = set()
+        for (path, _), entry in entries:
+            signature = self._signature(path)
+            if signature is not None and entry[0] is not None and signature != entry[0]:
+                changed.add(path)
+        for path in changed:
+            self._mark_dirty(path)
+        for path in changed:
+            self._notify(path)
+
+    def _trusted(self, path):
+        """Whether a clean cached entry can be returned without a stat"""
+        if path in self.NETLINK_PATHS.values():
+            return self._netlink is not None
+        return self._inotify is not None and not path.startswith('/proc/')
+
+    def _signature(self, path):
+        if path in self.NETLINK_PATHS.values() and self._netlink is not None:
+            return ('generation', self._generations[path])
+        if path.startswith('/proc/') and self.source.root == "/":
+            return None  # procfs mtimes never change, always re-read
+        try:
+            st = os.stat(self.source.path(path))
+        except OSError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _run(self):
+        fds = [self._inotify] + ([self._netlink.fileno()] if self._netlink else [])
+        while True:
+            try:
+                readable, _, _ = select.select(fds, [], [])
+                if self._inotify in readable:
+                    self._read_inotify()
+                if self._netlink and self._netlink.fileno() in readable:
+                    self._read_netlink()
+            except Exception as e:
+                print(f"Error in file watcher: {e}")
+                time.sleep(1)
+
+    def _read_inotify(self):
+        data = os.read(self._inotify, 64 * 1024)
+        changed = set()
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _cookie, length = struct.unpack_from('iIII', data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0').decode(errors='replace')
+            offset += 16 + length
+            with self._lock:
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.update(path for path, _ in self._entries)
+                    continue
+                directory = self._wds.get(wd)
+                changed.update(self._targets.get((directory, name), ()))
+        for path in changed:
+            self._mark_dirty(path)
+            # a replaced symlink may now point into another directory
+            self.watch(path)
+            self._notify(path)
+
+    def _read_netlink(self):
+        data = self._netlink.recv(64 * 1024)
+        changed = set()
+        offset = 0
+        while offset + 16 <= len(data):
+            length, msg_type = struct.unpack_from('IH', data, offset)
+            if length < 16:
+                break
+            if msg_type in self.NETLINK_PATHS:
+                changed.add(self.NETLINK_PATHS[msg_type])
+            offset += (length + 3) & ~3
+        for path in changed:
+            with self._lock:
+                self._generations[path] += 1
+            self._mark_dirty(path)
+            self._notify(path)
+
+    def _mark_dirty(self, path):
+        with self._lock:
+            for (entry_path, _), entry in self._entries.items():
+                if entry_path == path:
+                    entry[2] += 1
+
+    def _notify(self, path):
+        for callback in self._listeners:
+            try:
+                callback(path)
+            except Exception as e:
+                print(f"Error notifying change of {path}: {e}")
+
+
+class MetricSampler:
+    """Flat snapshot of numeric metrics, the stream alerts and views read from.
+
+    Cheap metrics are read every tick, disks, temperatures, the battery and
+    the VPN state every slow_every ticks. sample() returns the snapshot
+    together with the names of the metrics that changed since the previous
+    one. The security checks can take seconds (Tor, nft, systemctl), so
+    sample_security() runs them on its own schedule and sample() only
+    copies their last results in. The text state of each security check is
+    kept in states next to its 1/0 metric.
+    """
+
+    SECURITY_CHECKS = ('firewall', 'vpn', 'tor', 'dns', 'kernel_hardening', 'ssh_status',
+                       'dns_over_tls', 'updates', 'antivirus', 'selinux', 'apparmor')
+
+    def __init__(self, panel, slow_every=5):
+        self.panel = panel
+        self.slow_every = slow_every
+        self.snapshot = {}
+        self.states = {}
+        self.timestamp = None
+        self.seq = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._security_lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """callback(snapshot, changed, seq) runs on the sampling thread after every sample"""
+        self._listeners.append(callback)
+
+    def sample(self):
+        with self._lock:
+            previous = self.snapshot
+            source = self.panel.source
+            snapshot = dict(previous)
+            snapshot['cpu.percent'] = source.cpu_percent(interval=None)
+            snapshot['mem.percent'] = source.virtual_memory().percent
+            snapshot['swap.percent'] = source.swap_memory().percent
+
+            for name in [n for n in snapshot if n.startswith('net.')]:
+                del snapshot[name]
+            stats = source.net_if_stats()
+            for iface, io_counters in source.net_io_counters(pernic=True).items():
+                snapshot[f"net.{iface}.rx_bytes"] = io_counters.bytes_recv
+                snapshot[f"net.{iface}.tx_bytes"] = io_counters.bytes_sent
+                snapshot[f"net.{iface}.up"] = 1.0 if iface in stats and stats[iface].isup else 0.0
+
+            if self.seq % self.slow_every == 0:
+                for name in [n for n in snapshot if n.startswith(('disk.', 'battery.'))]:
+                    del snapshot[name]
+                for disk in self.panel.get_disk_usage():
+                    snapshot[f"disk.{disk.mount}.percent"] = disk.percent
+                temp = self.panel.get_cpu_temp_celsius()
+                if temp is None:
+                    snapshot.pop('temp.cpu', None)
+                else:
+                    snapshot['temp.cpu'] = temp
+                snapshot['vpn.up'] = 1.0 if self.panel.check_vpn() == "Active" else 0.0
+                battery = source.sensors_battery()
+                if battery:
+                    snapshot['battery.percent'] = battery.percent
+                    snapshot['battery.plugged'] = 1.0 if battery.power_plugged else 0.0
+
+            for check, state in self.states.items():
+                snapshot[f"security.{check}"] = 1.0 if self.panel.status_color(state) == "#00ff00" else 0.0
+
+            changed = {name for name, value in snapshot.items() if previous.get(name) != value}
+            changed.update(name for name in previous if name not in snapshot)
+            self.snapshot = snapshot
+            self.timestamp = time.time()
+            self.seq += 1
+            for callback in self._listeners:
+                try:
+                    callback(snapshot, changed, self.seq)
+                except Exception as e:
+                    print(f"Error in sample listener: {e}")
+            return snapshot, changed
+
+    def sample_security(self):
+        """Run the security checks outside the sampling lock, skipped while a previous run is going"""
+        if not self._security_lock.acquire(blocking=False):
+            return
+        try:
+            self.states = {check: getattr(self.panel, f"check_{check}")() for check in self.SECURITY_CHECKS}
+        finally:
+            self._security_lock.release()
+
+
+# Used when ~/.config/securonis-panel/alerts.json does not exist
+DEFAULT_ALERT_RULES = [
+    {"name": "High CPU usage", "metric": "cpu.percent", "op": ">", "threshold": 90, "for": 60, "clear": 80},
+    {"name": "High memory usage", "metric": "mem.percent", "op": ">", "threshold": 95, "for": 30, "clear": 90},
+    {"name": "Disk almost full", "metric": "disk.*.percent", "op": ">", "threshold": 95, "clear": 93},
+    {"name": "CPU temperature", "metric": "temp.cpu", "op": ">", "threshold": 85,
+     "aggregate": "avg", "window": 30, "clear": 80},
+    {"name": "VPN dropped", "metric": "vpn.up", "op": "<", "threshold": 1, "arm": "clear"},
+]
+
+
+class AlertRule:
+    """One declarative rule.
+
+    metric may be a glob (disk.*.percent) and is bound per matching metric.
+    aggregate/window evaluate a time weighted avg, min or max over the last
+    window seconds instead of the latest value. for requires the condition
+    to hold that long. clear is the hysteresis threshold the value has to
+    cross back over before the alert resets. arm="clear" only arms the rule
+    once the metric was seen in the clear state, so a VPN that was never up
+    does not count as dropped. cooldown rate-limits repeat notifications.
+    """
+
+    OPS = {
+        '>': lambda a, b: a > b,
+        '>=': lambda a, b: a >= b,
+        '<': lambda a, b: a < b,
+        '<=': lambda a, b: a <= b,
+        '==': lambda a, b: a == b,
+    }
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.metric = spec['metric']
+        self.op = spec.get('op', '>')
+        if self.op not in self.OPS:
+            raise ValueError(f"Unknown operator {self.op} in rule {self.name}")
+        self.threshold = float(spec['threshold'])
+        self.clear = float(spec.get('clear', self.threshold))
+        self.duration = float(spec.get('for', 0))
+        self.aggregate = spec.get('aggregate', 'last')
+        self.window = float(spec.get('window', 0))
+        self.armed_by_clear = spec.get('arm') == 'clear'
+        self.cooldown = float(spec.get('cooldown', 300))
+        self.is_pattern = any(c in self.metric for c in '*?[')
+
+    def triggered(self, value):
+        return self.OPS[self.op](value, self.threshold)
+
+    def cleared(self, value):
+        """Past the clear threshold on the other side of the condition"""
+        if self.op in ('>', '>='):
+            return value < self.clear if self.clear != self.threshold else not self.triggered(value)
+        if self.op in ('<', '<='):
+            return value > self.clear if self.clear != self.threshold else not self.triggered(value)
+        return not self.triggered(value)
+
+
+class AlertEngine:
+    """Evaluates alert rules against sampler snapshots.
+
+    Rules are indexed by metric, so a tick only evaluates the rules of
+    metrics that changed plus the few that are waiting out a for duration
+    or a window. Each (rule, metric) pair fires once per episode.
+    """
+
+    def __init__(self, rules, notify=None, log_path=None):
+        self.rules = [AlertRule(spec) for spec in rules]
+        self.notify = notify
+        self.log_path = log_path
+        self._exact = collections.defaultdict(list)
+        self._patterns = [rule for rule in self.rules if rule.is_pattern]
+        for rule in self.rules:
+            if not rule.is_pattern:
+                self._exact[rule.metric].append(rule)
+        self._bound = {}  # metric -> rules, patterns resolved on first sight
+        self._windows = {}  # metric -> deque of (time, value) change points
+        self._window_len = {}
+        self._state = {}  # (rule name, metric) -> dict
+        self._watching = set()  # (rule, metric) pairs that need evaluating without a change
+        self.active = {}  # (rule name, metric) -> (value, since)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load_rules(cls, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return DEFAULT_ALERT_RULES
+        except (OSError, ValueError) as e:
+            print(f"Error loading alert rules from {path}: {e}")
+            return DEFAULT_ALERT_RULES
+
+    def rules_for(self, metric):
+        rules = self._bound.get(metric)
+        if rules is None:
+            rules = self._exact.get(metric, []) + [r for r in self._patterns if fnmatch.fnmatchcase(metric, r.metric)]
+            self._bound[metric] = rules
+            window = max((r.window for r in rules if r.aggregate != 'last'), default=0)
+            if window:
+                self._window_len[metric] = window
+                self._windows[metric] = collections.deque()
+        return rules
+
+    def evaluate(self, snapshot, changed, now=None):
+        """Evaluate the rules touched by this tick, returns newly fired alerts"""
+        now = time.time() if now is None else now
+        fired = []
+        with self._lock:
+            todo = set(self._watching)
+            for metric in changed:
+                if metric not in snapshot:
+                    self._forget(metric)
+                    continue
+                window = self._windows.get(metric) if self.rules_for(metric) else None
+                if window is not None:
+                    window.append((now, snapshot[metric]))
+                todo.update((rule, metric) for rule in self.rules_for(metric))
+            for rule, metric in todo:
+                if metric in snapshot:
+                    alert = self._evaluate_rule(rule, metric, snapshot[metric], now)
+                    if alert:
+                        fired.append(alert)
+        for alert in fired:
+            self._emit(alert)
+        return fired
+
+    def _aggregate(self, rule, metric, value, now):
+        if rule.aggregate == 'last':
+            return value
+        window = self._windows[metric]
+        start = now - rule.window
+        # keep the last point before the window, it defines the value at its start
+        while len(window) > 1 and window[1][0] <= now - self._window_len[metric]:
+            window.popleft()
+        total = weight = 0.0
+        values = []
+        for i, (t, v) in enumerate(window):
+            end = window[i + 1][0] if i + 1 < len(window) else now
+            span = min(end, now) - max(t, start)
+            if span > 0 or i == len(window) - 1:
+                values.append(v)
+                total += v * max(span, 0)
+                weight += max(span, 0)
+        if not values:
+            return value
+        if rule.aggregate == 'max':
+            return max(values)
+        if rule.aggregate == 'min':
+            return min(values)
+        return total / weight if weight else values[-1]
+
+    def _evaluate_rule(self, rule, metric, value, now):
+        key = (rule.name, metric)
+        state = self._state.setdefault(key, {"since": None, "firing": False, "armed": not rule.armed_by_clear,
+                                             "last_notified": None})
+        value = self._aggregate(rule, metric, value, now)
+        if state["firing"]:
+            if rule.cleared(value):
+                state.update(firing=False, since=None)
+                self.active.pop(key, None)
+                self._watching.discard((rule, metric))
+                self._log(f"CLEARED {rule.name} {metric}={value:g}")
+            return None
+        if not rule.triggered(value):
+            state["since"] = None
+            state["armed"] = state["armed"] or rule.cleared(value)
+            if rule.aggregate == 'last':
+                self._watching.discard((rule, metric))
+            else:
+                self._watching.add((rule, metric))  # the window keeps moving
+            return None
+        if not state["armed"]:
+            return None
+        if state["since"] is None:
+            state["since"] = now
+        if now - state["since"] < rule.duration:
+            self._watching.add((rule, metric))
+            return None
+        state["firing"] = True
+        self._watching.add((rule, metric))
+        self.active[key] = (value, state["since"])
+        if state["last_notified"] is not None and now - state["last_notified"] < rule.cooldown:
+            return None
+        state["last_notified"] = now
+        return {"rule": rule.name, "metric": metric, "value": value, "since": state["since"], "time": now}
+
+    def _forget(self, metric):
+        self._windows.pop(metric, None)
+        self._bound.pop(metric, None)
+        for key in [k for k in self._state if k[1] == metric]:
+            del self._state[key]
+            self.active.pop(key, None)
+        self._watching = {(r, m) for r, m in self._watching if m != metric}
+
+    def _emit(self, alert):
+        self._log(f"FIRING {alert['rule']} {alert['metric']}={alert['value']:g}")
+        if self.notify:
+            try:
+                self.notify(alert)
+            except Exception as e:
+                print(f"Error sending alert notification: {e}")
+
+    def _log(self, message):
+        if not self.log_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with open(self.log_path, 'a') as f:
+                f.write(f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')} {message}\n")
+        except OSError as e:
+            print(f"Error writing alert log: {e}")
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsExporter:
+    """OpenMetrics endpoint serving the sampler's latest snapshot.
+
+    Scrapes never collect anything, they encode sampler.snapshot. The line of
+    every series is cached with the value it was encoded from and the whole
+    body with the sample sequence number, so repeated scrapes of an
+    unchanged snapshot cost a dict lookup.
+    """
+
+    CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+    # (prefix, suffix, family, type, unit, help, label), the label takes the part between prefix and suffix
+    FAMILIES = [
+        ('cpu.percent', '', 'securonis_cpu_usage_percent', 'gauge', 'percent', 'CPU usage', None),
+        ('mem.percent', '', 'securonis_memory_usage_percent', 'gauge', 'percent', 'Memory usage', None),
+        ('swap.percent', '', 'securonis_swap_usage_percent', 'gauge', 'percent', 'Swap usage', None),
+        ('disk.', '.percent', 'securonis_disk_usage_percent', 'gauge', 'percent', 'Filesystem usage', 'mountpoint'),
+        ('net.', '.rx_bytes', 'securonis_network_receive_bytes', 'counter', 'bytes', 'Bytes received', 'interface'),
+        ('net.', '.tx_bytes', 'securonis_network_transmit_bytes', 'counter', 'bytes', 'Bytes sent', 'interface'),
+        ('net.', '.up', 'securonis_network_up', 'gauge', '', 'Interface is up', 'interface'),
+        ('temp.cpu', '', 'securonis_cpu_temperature_celsius', 'gauge', 'celsius', 'CPU temperature', None),
+        ('battery.percent', '', 'securonis_battery_percent', 'gauge', 'percent', 'Battery charge', None),
+        ('battery.plugged', '', 'securonis_battery_plugged', 'gauge', '', 'Power supply plugged in', None),
+        ('vpn.up', '', 'securonis_vpn_up', 'gauge', '', 'A VPN interface is up', None),
+        ('security.', '', 'securonis_security_check_ok', 'gauge', '', 'Security check passed', 'check'),
+    ]
+
+    def __init__(self, sampler, address='127.0.0.1', port=9101):
+        self.sampler = sampler
+        self.address = address
+        self.port = port
+        self.server = None
+        self._lines = {}  # metric -> (value, encoded line)
+        self._series = {}  # metric -> (family index, label value)
+        self._body = (None, b'')
+        self._lock = threading.Lock()
+
+    def start(self):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = exporter.render()
+                self.send_response(200)
+                self.send_header('Content-Type', exporter.CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((self.address, self.port), Handler)
+        except OSError as e:
+            print(f"Error starting metrics exporter on {self.address}:{self.port}: {e}")
+            return False
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='metrics-exporter', daemon=True).start()
+        return True
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def _classify(self, metric):
+        series = self._series.get(metric)
+        if series is None:
+            series = (None, None)
+            for index, (prefix, suffix, _, _, _, _, label) in enumerate(self.FAMILIES):
+                if label is None:
+                    if metric == prefix:
+                        series = (index, None)
+                        break
+                elif metric.startswith(prefix) and metric.endswith(suffix) and len(metric) > len(prefix) + len(suffix):
+                    series = (index, metric[len(prefix):len(metric) - len(suffix)])
+                    break
+            self._series[metric] = series
+        return series
+
+    def _line(self, metric, value, family, kind, label, label_value):
+        cached = self._lines.get(metric)
+        if cached is not None and cached[0] == value:
+            return cached[1]
+        name = f"{family}_total" if kind == 'counter' else family
+        labels = f'{{{label}="{_escape_label(label_value)}"}}' if label else ''
+        line = f"{name}{labels} {float(value)!r}\n"
+        self._lines[metric] = (value, line)
+        return line
+
+    def render(self):
+        """Encode the current snapshot, reusing the body while the snapshot is unchanged"""
+        with self._lock:
+            seq = self.sampler.seq
+            if self._body[0] == seq:
+                return self._body[1]
+            snapshot = self.sampler.snapshot
+            states = self.sampler.states
+            grouped = collections.defaultdict(list)
+            for metric, value in snapshot.items():
+                index, label_value = self._classify(metric)
+                if index is not None:
+                    grouped[index].append((metric, value, label_value))
+            for metric in [m for m in self._lines if m not in snapshot]:
+                del self._lines[metric]
+
+            out = []
+            for index in sorted(grouped):
+                _, _, family, kind, unit, help_text, label = self.FAMILIES[index]
+                out.append(f"# TYPE {family} {kind}\n")
+                if unit:
+                    out.append(f"# UNIT {family} {unit}\n")
+                out.append(f"# HELP {family} {help_text}.\n")
+                for metric, value, label_value in sorted(grouped[index]):
+                    out.append(self._line(metric, value, family, kind, label, label_value))
+            if states:
+                out.append("# TYPE securonis_security_check info\n")
+                out.append("# HELP securonis_security_check State reported by each security check.\n")
+                for check, state in sorted(states.items()):
+                    out.append(f'securonis_security_check_info{{check="{check}",state="{_escape_label(state)}"}} 1\n')
+            if self.sampler.timestamp is not None:
+                out.append("# TYPE securonis_last_sample_timestamp_seconds gauge\n")
+                out.append("# UNIT securonis_last_sample_timestamp_seconds seconds\n")
+                out.append(f"securonis_last_sample_timestamp_seconds {self.sampler.timestamp!r}\n")
+            out.append("# EOF\n")
+            body = ''.join(out).encode()
+            self._body = (seq, body)
+            return body
+
+
+class SnapshotStreamer:
+    """Collector side of fleet mode.
+
+    Every client gets a hello and the full snapshot on connect, then one
+    NDJSON delta per sample with only the metrics that changed. Deltas are
+    encoded once and shared by all clients. A client that falls more than
+    MAX_BACKLOG messages behind is dropped and resyncs on reconnect.
+    """
+
+    MAX_BACKLOG = 64
+    PING_SECONDS = 10
+
+    def __init__(self, sampler, address='127.0.0.1', port=9102):
+        self.sampler = sampler
+        self.address = address
+        self.port = port
+        self.server = None
+        self._clients = set()
+        self._lock = threading.Lock()
+        sampler.add_listener(self._on_sample)
+
+    @staticmethod
+    def encode(message):
+        return (json.dumps(message, separators=(',', ':')) + "\n").encode()
+
+    def _on_sample(self, snapshot, changed, seq):
+        delta = {"type": "delta", "seq": seq,
+                 "set": {name: snapshot[name] for name in changed if name in snapshot},
+                 "del": [name for name in changed if name not in snapshot]}
+        line = self.encode(delta)
+        with self._lock:
+            for client in list(self._clients):
+                try:
+                    client.put_nowait(line)
+                except queue.Full:
+                    self._clients.discard(client)
+                    with client.mutex:
+                        client.queue.clear()
+                    client.put_nowait(None)
+
+    def start(self):
+        streamer = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                client = queue.Queue(maxsize=streamer.MAX_BACKLOG)
+                with streamer._lock:
+                    hello = streamer.encode({"type": "hello", "host": socket.gethostname(), "version": PANEL_VERSION})
+                    full = streamer.encode({"type": "full", "seq": streamer.sampler.seq,
+                                            "metrics": streamer.sampler.snapshot})
+                    streamer._clients.add(client)
+                try:
+                    self.request.sendall(hello + full)
+                    ping = streamer.encode({"type": "ping"})
+                    while True:
+                        try:
+                            line = client.get(timeout=streamer.PING_SECONDS)
+                        except queue.Empty:
+                            line = ping
+                        if line is None:
+                            break
+                        self.request.sendall(line)
+                except OSError:
+                    pass
+                finally:
+                    with streamer._lock:
+                        streamer._clients.discard(client)
+
+        class Server(socketserver.ThreadingTCPServer):
+            # a restarted collector takes its port back while old connections sit in TIME_WAIT
+            allow_reuse_address = True
+
+        try:
+            self.server = Server((self.address, self.port), Handler)
+        except OSError as e:
+            print(f"Error starting collector on {self.address}:{self.port}: {e}")
+            return False
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='collector', daemon=True).start()
+        return True
+
+    def stop(self):
+        """Stop listening and drop the connected clients so they reconnect"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        with self._lock:
+            for client in self._clients:
+                with client.mutex:
+                    client.queue.clear()
+                client.put_nowait(None)
+            self._clients.clear()
+
+
+class PowerMonitor:
+    """Samples RAPL energy counters and power supplies and keeps a history.
+
+    RAPL counters are cumulative microjoules that wrap at max_energy_range_uj,
+    so power is the wrapped delta over the sample interval. Battery rates
+    come from each supply's uevent file in one read. Package power (or the
+    battery discharge rate when RAPL is unreadable) is split between
+    processes by their share of the CPU time used in the interval.
+    """
+
+    RAPL_DIR = '/sys/class/powercap'
+    SUPPLY_DIR = '/sys/class/power_supply'
+
+    def __init__(self, source, history=720):
+        self.source = source
+        self.domains = None
+        self.rapl_error = None
+        self.latest = {"rapl": {}, "supplies": {}}
+        self.history = collections.deque(maxlen=history)  # (time, {series: watts})
+        self.energy = collections.Counter()  # process name -> joules
+        self.cpu_seconds = collections.Counter()  # process name -> cpu seconds
+        self._last_energy = {}
+        self._last_cpu = {}
+        self._last_time = None
+        self._lock = threading.Lock()
+
+    def _read(self, path):
+        with self.source.open(path, 'r') as f:
+            return f.read().strip()
+
+    def discover(self):
+        """RAPL zones as (key, path, max range), subzones keyed package-0/core"""
+        domains = []
+        try:
+            zones = [z for z in self.source.listdir(self.RAPL_DIR) if z.startswith('intel-rapl:')]
+        except OSError:
+            zones = []
+        names = {}
+        for zone in zones:
+            path = f"{self.RAPL_DIR}/{zone}"
+            try:
+                name = self._read(f"{path}/name")
+                max_range = int(self._read(f"{path}/max_energy_range_uj"))
+            except (OSError, ValueError):
+                continue
+            names[zone] = name
+            parent = zone.rsplit(':', 1)[0]
+            key = f"{names[parent]}/{name}" if zone.count(':') > 1 and parent in names else name
+            domains.append((key, path, max_range))
+        return domains
+
+    def read_supplies(self):
+        supplies = {}
+        try:
+            devices = self.source.listdir(self.SUPPLY_DIR)
+        except OSError:
+            return supplies
+        for device in devices:
+            try:
+                fields = dict(line.split('=', 1) for line in self._read(f"{self.SUPPLY_DIR}/{device}/uevent").splitlines()
+                              if '=' in line)
+            except OSError:
+                continue
+            get = lambda key: fields.get(f"POWER_SUPPLY_{key}")
+            info = {"type": get("TYPE") or "Unknown", "status": get("STATUS"), "online": get("ONLINE")}
+            try:
+                if get("POWER_NOW") is not None:
+                    info["watts"] = int(get("POWER_NOW")) / 1e6
+                elif get("CURRENT_NOW") is not None and get("VOLTAGE_NOW") is not None:
+                    info["watts"] = int(get("CURRENT_NOW")) * int(get("VOLTAGE_NOW")) / 1e12
+                if get("CAPACITY") is not None:
+                    info["percent"] = float(get("CAPACITY"))
+                if get("ENERGY_NOW") is not None:
+                    info["energy_wh"] = int(get("ENERGY_NOW")) / 1e6
+                    info["energy_full_wh"] = int(get("ENERGY_FULL") or 0) / 1e6
+                elif get("CHARGE_NOW") is not None and get("VOLTAGE_NOW") is not None:
+                    volts = int(get("VOLTAGE_NOW")) / 1e6
+                    info["energy_wh"] = int(get("CHARGE_NOW")) / 1e6 * volts
+                    info["energy_full_wh"] = int(get("CHARGE_FULL") or 0) / 1e6 * volts
+            except ValueError:
+                pass
+            supplies[device] = info
+        return supplies
+
+    def sample(self):
+        with self._lock:
+            now = time.monotonic()
+            dt = now - self._last_time if self._last_time is not None else None
+            if self.domains is None:
+                self.domains = self.discover()
+
+            rapl = {}
+            for key, path, max_range in self.domains:
+                try:
+                    energy = int(self._read(f"{path}/energy_uj"))
+                except PermissionError:
+                    self.rapl_error = "Permission denied (energy_uj is readable by root only)"
+                    continue
+                except (OSError, ValueError):
+                    continue
+                last = self._last_energy.get(key)
+                self._last_energy[key] = energy
+                if last is None or not dt:
+                    continue
+                delta = energy - last
+                if delta < 0:
+                    delta += max_range + 1
+                rapl[key] = delta / 1e6 / dt
+
+            supplies = self.read_supplies()
+            series = {}
+            for key, watts in rapl.items():
+                domain = key.split('/')[-1].split('-')[0]
+                series[domain] = series.get(domain, 0.0) + watts
+            for device, info in supplies.items():
+                if info["type"] == "Battery" and "watts" in info:
+                    series[device] = info["watts"]
+
+            self._attribute(series, supplies, dt)
+            self.latest = {"rapl": rapl, "supplies": supplies}
+            self._last_time = now
+            if series:
+                self.history.append((time.time(), series))
+            return self.latest
+
+    def _attribute(self, series, supplies, dt):
+        """Split package power (or battery discharge) by each process' CPU time share"""
+        cpu = {}
+        names = {}
+        for proc in self.source.process_iter(['pid', 'name', 'cpu_times']):
+            info = proc.info
+            if info.get('cpu_times') is None:
+                continue
+            times = info['cpu_times']
+            cpu[info['pid']] = times.user + times.system
+            names[info['pid']] = info['name'] or str(info['pid'])
+        last_cpu, self._last_cpu = self._last_cpu, cpu
+        if not dt:
+            return
+        watts = series.get('package')
+        if watts is None:
+            watts = sum(info.get("watts", 0.0) for info in supplies.values()
+                        if info["type"] == "Battery" and info.get("status") == "Discharging") or None
+        deltas = {pid: used - last_cpu[pid] for pid, used in cpu.items() if pid in last_cpu and used > last_cpu[pid]}
+        total = sum(deltas.values())
+        for pid, used in deltas.items():
+            self.cpu_seconds[names[pid]] += used
+            if watts and total:
+                self.energy[names[pid]] += watts * dt * used / total
+
+    def top_consumers(self, limit=10):
+        """(name, joules, cpu seconds) of the processes that used the most energy"""
+        with self._lock:
+            return [(name, joules, self.cpu_seconds[name]) for name, joules in self.energy.most_common(limit)]
+
+    def watts(self, series):
+        """Latest value of a history series, None if it was never sampled"""
+        for _, values in reversed(self.history):
+            if series in values:
+                return values[series]
+        return None
+
+
+class SysfsReader:
+    """Reads small sysfs attributes for the periodic monitors.
+
+    On the live host each attribute stays open and is re-read with a pread
+    at offset 0, which makes sysfs regenerate the value without a reopen.
+    Recording, replay and other sources go through source.open so captures
+    cover the monitors too.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.live = type(source) is DataSource
+        self._fds = {}
+
+    def read(self, path):
+        with self.source.open(path, 'r') as f:
+            return f.read().strip()
+
+    def listdir(self, path):
+        try:
+            return self.source.listdir(path)
+        except OSError:
+            return []
+
+    def pread(self, path):
+        """Current value of an attribute, None if it cannot be read"""
+        try:
+            if not self.live:
+                return self.read(path)
+            fd = self._fds.get(path)
+            if fd is None:
+                fd = self._fds[path] = os.open(self.source.path(path), os.O_RDONLY)
+            return os.pread(fd, 4096, 0).decode().strip()
+        except OSError:
+            return None
+
+    def close(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+
+class SensorMonitor:
+    """Every temperature, fan and voltage input with a ring buffer per sensor.
+
+    hwmon inputs and thermal zones are enumerated once and sampled through
+    a SysfsReader. psutil chips that no hwmon input covers are sampled
+    through psutil. CPU frequency and the thermal throttle counters are
+    sampled alongside so a temperature spike can be lined up with the
+    clock drop it causes.
+    """
+
+    HWMON_DIR = '/sys/class/hwmon'
+    THERMAL_DIR = '/sys/class/thermal'
+    CPU_DIR = '/sys/devices/system/cpu'
+    INPUTS = re.compile(r'(temp|fan|in)(\d+)_input$')
+    SCALES = {'temp': 1000.0, 'fan': 1.0, 'in': 1000.0}
+    KINDS = {'temp': 'temperature', 'fan': 'fan', 'in': 'voltage'}
+    UNITS = {'temperature': '°C', 'fan': 'RPM', 'voltage': 'V'}
+    CPU_CHIPS = ('coretemp', 'k10temp', 'zenpower', 'cpu_thermal', 'acpitz')
+
+    def __init__(self, source, history=300):
+        self.source = source
+        self.sysfs = SysfsReader(source)
+        self.sensors = None  # key -> {"kind", "path", "scale", "high", "critical"}
+        self.psutil_chips = set()
+        self.freq_paths = []
+        self.throttle_paths = []
+        self.history = collections.defaultdict(lambda: collections.deque(maxlen=history))
+        self.freq = collections.deque(maxlen=history)  # (time, average MHz)
+        self.throttle_events = collections.deque(maxlen=history)
+        self.latest = {}
+        self._throttle_count = None
+        self._lock = threading.Lock()
+
+    def _limit(self, path, scale):
+        try:
+            return int(self.sysfs.read(path)) / scale
+        except (OSError, ValueError):
+            return None
+
+    def discover(self):
+        sensors = {}
+        chips = set()
+        for hwmon in self.sysfs.listdir(self.HWMON_DIR):
+            base = f"{self.HWMON_DIR}/{hwmon}"
+            try:
+                chip = self.sysfs.read(f"{base}/name")
+            except OSError:
+                chip = hwmon
+            chips.add(chip)
+            for entry in self.sysfs.listdir(base):
+                match = self.INPUTS.match(entry)
+                if not match:
+                    continue
+                prefix, index = match.groups()
+                try:
+                    label = self.sysfs.read(f"{base}/{prefix}{index}_label")
+                except OSError:
+                    label = f"{prefix}{index}"
+                key = f"{chip}/{label}"
+                if key in sensors:
+                    key = f"{chip}.{hwmon}/{label}"
+                scale = self.SCALES[prefix]
+                sensors[key] = {"kind": self.KINDS[prefix], "path": f"{base}/{entry}", "scale": scale,
+                                "high": self._limit(f"{base}/{prefix}{index}_max", scale),
+                                "critical": self._limit(f"{base}/{prefix}{index}_crit", scale)}
+        for zone in self.sysfs.listdir(self.THERMAL_DIR):
+            if not zone.startswith('thermal_zone'):
+                continue
+            try:
+                zone_type = self.sysfs.read(f"{self.THERMAL_DIR}/{zone}/type")
+            except OSError:
+                continue
+            if zone_type in chips:
+                continue
+            sensors[f"thermal/{zone_type}.{zone[12:]}"] = {"kind": "temperature", "path": f"{self.THERMAL_DIR}/{zone}/temp",
+                                                           "scale": 1000.0, "high": None, "critical": None}
+        self.sensors = sensors
+
+        # psutil chips no hwmon input covers
+        for call in (self.source.sensors_temperatures, self.source.sensors_fans):
+            try:
+                self.psutil_chips.update(chip for chip in call() if chip not in chips)
+            except (AttributeError, OSError):
+                pass
+
+        cpus = [cpu for cpu in self.sysfs.listdir(self.CPU_DIR) if re.match(r'cpu\d+$', cpu)]
+        self.freq_paths = [f"{self.CPU_DIR}/{cpu}/cpufreq/scaling_cur_freq" for cpu in cpus]
+        self.throttle_paths = [f"{self.CPU_DIR}/{cpu}/thermal_throttle/package_throttle_count" for cpu in cpus[:1]]
+        self.throttle_paths += [f"{self.CPU_DIR}/{cpu}/thermal_throttle/core_throttle_count" for cpu in cpus]
+
+    def _sample_psutil(self, values, limits):
+        for call, kind in ((self.source.sensors_temperatures, "temperature"), (self.source.sensors_fans, "fan")):
+            try:
+                chips = call()
+            except (AttributeError, OSError):
+                continue
+            for chip in self.psutil_chips & set(chips):
+                for index, entry in enumerate(chips[chip]):
+                    key = f"{chip}/{entry.label or index}"
+                    values[key] = entry.current
+                    limits[key] = {"kind": kind, "high": getattr(entry, 'high', None),
+                                   "critical": getattr(entry, 'critical', None)}
+
+    def sample(self):
+        with self._lock:
+            if self.sensors is None:
+                self.discover()
+            now = time.time()
+            values = {}
+            for key, sensor in self.sensors.items():
+                raw = self.sysfs.pread(sensor["path"])
+                try:
+                    values[key] = int(raw) / sensor["scale"]
+                except (TypeError, ValueError):
+                    continue
+            extra = {}
+            if self.psutil_chips:
+                self._sample_psutil(values, extra)
+                self.sensors.update({key: dict(info, path=None, scale=1.0) for key, info in extra.items()
+                                     if key not in self.sensors})
+            for key, value in values.items():
+                self.history[key].append((now, value))
+
+            freqs = []
+            for path in self.freq_paths:
+                try:
+                    freqs.append(int(self.sysfs.pread(path)) / 1000)
+                except (TypeError, ValueError):
+                    continue
+            if freqs:
+                self.freq.append((now, sum(freqs) / len(freqs)))
+
+            count = 0
+            for path in self.throttle_paths:
+                try:
+                    count += int(self.sysfs.pread(path))
+                except (TypeError, ValueError):
+                    continue
+            if self._throttle_count is not None and count > self._throttle_count:
+                self.throttle_events.append(now)
+            self._throttle_count = count
+
+            self.latest = values
+            return values
+
+    def cpu_sensor(self):
+        """Key of the sensor that best represents the CPU package"""
+        candidates = [key for key, sensor in (self.sensors or {}).items()
+                      if sensor["kind"] == "temperature" and key.split('/')[0].split('.')[0] in self.CPU_CHIPS]
+        for key in candidates:
+            if key.split('/', 1)[1].startswith(('Package', 'Tctl', 'Tdie')):
+                return key
+        return max(candidates, key=lambda key: self.latest.get(key, 0), default=None)
+
+    def summary(self):
+        """(key, kind, current, min, max, high, critical) for every sensor"""
+        with self._lock:
+            rows = []
+            for key, sensor in sorted((self.sensors or {}).items()):
+                values = [value for _, value in self.history.get(key, ())]
+                if not values:
+                    continue
+                rows.append((key, sensor["kind"], values[-1], min(values), max(values),
+                             sensor.get("high"), sensor.get("critical")))
+            return rows
+
+    def close(self):
+        self.sysfs.close()
+
+
+class GpuMonitor:
+    """GPUs from DRM sysfs, no debugfs, root or vendor tools needed.
+
+    Cards are enumerated once from /sys/class/drm/card*. Each sample reads
+    the i915 gt_*_freq_mhz or amdgpu pp_dpm_sclk clocks, gpu_busy_percent,
+    the VRAM counters and the card's hwmon temperature through a
+    SysfsReader. nvidia-smi is an optional extra, run by sample_vendor()
+    on a worker with a timeout.
+    """
+
+    DRM_DIR = '/sys/class/drm'
+    VENDORS = {'0x8086': "Intel", '0x1002': "AMD", '0x10de': "NVIDIA"}
+    NVIDIA_QUERY = 'name,utilization.gpu,clocks.gr,clocks.max.gr,memory.used,memory.total'
+
+    def __init__(self, source):
+        self.source = source
+        self.sysfs = SysfsReader(source)
+        self.cards = None  # card -> static info
+        self.latest = {}  # card -> sampled values
+        self.vendor = {}  # GPU index -> nvidia-smi values
+        self._lock = threading.Lock()
+
+    def discover(self):
+        cards = {}
+        for card in self.sysfs.listdir(self.DRM_DIR):
+            if not re.match(r'card\d+$', card):
+                continue
+            device = f"{self.DRM_DIR}/{card}/device"
+            try:
+                uevent = dict(line.split('=', 1) for line in self.sysfs.read(f"{device}/uevent").splitlines() if '=' in line)
+            except OSError:
+                uevent = {}
+            vendor = self.sysfs.pread(f"{device}/vendor")
+            hwmon = [name for name in self.sysfs.listdir(f"{device}/hwmon") if name.startswith('hwmon')]
+            cards[card] = {
+                "vendor": self.VENDORS.get(vendor, vendor or "Unknown"),
+                "vendor_id": vendor,
+                "device_id": self.sysfs.pread(f"{device}/device"),
+                "driver": uevent.get("DRIVER", "Unknown"),
+                "slot": uevent.get("PCI_SLOT_NAME"),
+                "hwmon": f"{device}/hwmon/{hwmon[0]}" if hwmon else None,
+            }
+        self.cards = cards
+
+    def _int(self, path):
+        try:
+            return int(self.sysfs.pread(path))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def parse_dpm(text):
+        """(current, max) MHz from an amdgpu pp_dpm_* table, current is marked with *"""
+        current = top = None
+        for line in (text or "").splitlines():
+            match = re.match(r'\s*\d+:\s*(\d+)\s*Mhz(\s*\*)?', line, re.IGNORECASE)
+            if match:
+                mhz = int(match.group(1))
+                top = max(top or 0, mhz)
+                if match.group(2):
+                    current = mhz
+        return current, top
+
+    def sample(self):
+        with self._lock:
+            if self.cards is None:
+                self.discover()
+            latest = {}
+            for card, info in self.cards.items():
+                base = f"{self.DRM_DIR}/{card}"
+                device = f"{base}/device"
+                values = {}
+                # gt_act_freq_mhz is 0 while the GPU sleeps, which is the honest reading
+                current = self._int(f"{base}/gt_act_freq_mhz")
+                if current is None:
+                    current = self._int(f"{base}/gt_cur_freq_mhz")
+                if current is not None:
+                    values["freq_mhz"] = current
+                    values["max_freq_mhz"] = self._int(f"{base}/gt_max_freq_mhz")
+                else:
+                    current, top = self.parse_dpm(self.sysfs.pread(f"{device}/pp_dpm_sclk"))
+                    if current is not None:
+                        values["freq_mhz"], values["max_freq_mhz"] = current, top
+                for key, name in (("busy_percent", "gpu_busy_percent"), ("vram_used", "mem_info_vram_used"),
+                                  ("vram_total", "mem_info_vram_total")):
+                    value = self._int(f"{device}/{name}")
+                    if value is not None:
+                        values[key] = value
+                if info["hwmon"]:
+                    temp = self._int(f"{info['hwmon']}/temp1_input")
+                    if temp is not None:
+                        values["temp_c"] = temp / 1000.0
+                latest[card] = values
+            self.latest = latest
+            return latest
+
+    def has_nvidia(self):
+        return any(info["vendor"] == "NVIDIA" for info in (self.cards or {}).values())
+
+    def sample_vendor(self, timeout=5):
+        """nvidia-smi readings, meant for a worker thread"""
+        if not shutil.which('nvidia-smi'):
+            return {}
+        try:
+            output = self.source.check_output(['nvidia-smi', f'--query-gpu={self.NVIDIA_QUERY}',
+                                               '--format=csv,noheader,nounits'],
+                                              stderr=subprocess.DEVNULL, timeout=timeout).decode()
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Error running nvidia-smi: {e}")
+            return {}
+        vendor = {}
+        for index, line in enumerate(output.strip().splitlines()):
+            fields = [field.strip() for field in line.split(',')]
+            if len(fields) == 6:
+                vendor[index] = dict(zip(('name', 'busy_percent', 'freq_mhz', 'max_freq_mhz', 'vram_used_mib',
+                                          'vram_total_mib'), fields))
+        self.vendor = vendor
+        return vendor
+
+    def close(self):
+        self.sysfs.close()
+
+
+class CgroupMonitor:
+    """Per-cgroup CPU, memory, pressure and IO rates from the cgroup v2 tree.
+
+    The hierarchy is kept between ticks. Every known directory is stat'ed
+    each tick but only the ones whose mtime changed (a child cgroup was
+    created or removed) are listed again, so a tick costs one stat plus the
+    stat files per cgroup however many containers come and go. Hybrid hosts
+    are read from their unified mount.
+    """
+
+    ROOTS = ('/sys/fs/cgroup', '/sys/fs/cgroup/unified')
+    CONTAINER_PARENTS = ('machine.slice', 'docker', 'containerd', 'kubepods', 'kubepods.slice', 'libpod_parent', 'lxc')
+
+    def __init__(self, source):
+        self.source = source
+        self.sysfs = SysfsReader(source)
+        self.root = None
+        self.dirs = {}  # relative path -> (mtime, child names)
+        self.stats = {}  # relative path -> computed stats
+        self._last = {}  # relative path -> (time, cpu usec, io read bytes, io write bytes)
+        self.listed = 0  # directories listed by the last scan
+        self._lock = threading.Lock()
+
+    def find_root(self):
+        for root in self.ROOTS:
+            if self.source.exists(f"{root}/cgroup.controllers"):
+                return root
+        return None
+
+    def scan(self):
+        """Walk the tree, listing only directories whose mtime changed"""
+        dirs = {}
+        listed = 0
+        stack = ['']
+        while stack:
+            rel = stack.pop()
+            path = f"{self.root}/{rel}" if rel else self.root
+            try:
+                mtime = self.source.mtime(path)
+            except OSError:
+                continue
+            cached = self.dirs.get(rel)
+            if cached is not None and cached[0] == mtime:
+                children = cached[1]
+            else:
+                try:
+                    children = self.source.subdirs(path)
+                except OSError:
+                    continue
+                listed += 1
+            dirs[rel] = (mtime, children)
+            stack.extend(f"{rel}/{child}" if rel else child for child in children)
+        self.dirs = dirs
+        self.listed = listed
+
+    @classmethod
+    def kind(cls, rel):
+        parts = rel.split('/')
+        if parts[0] == 'system.slice':
+            return "container" if any(p.startswith(('docker-', 'libpod-', 'crio-')) for p in parts) else "service"
+        if parts[0] == 'user.slice':
+            return "session"
+        if parts[0] in cls.CONTAINER_PARENTS:
+            return "container"
+        return "other"
+
+    @staticmethod
+    def parse_keyed(text):
+        values = {}
+        for line in (text or "").splitlines():
+            key, _, value = line.partition(' ')
+            try:
+                values[key] = int(value)
+            except ValueError:
+                continue
+        return values
+
+    @staticmethod
+    def parse_pressure(text):
+        """avg10 of the 'some' line of a PSI file"""
+        for line in (text or "").splitlines():
+            if line.startswith('some'):
+                for field in line.split()[1:]:
+                    key, _, value = field.partition('=')
+                    if key == 'avg10':
+                        return float(value)
+        return None
+
+    @staticmethod
+    def parse_io(text):
+        read = write = 0
+        for line in (text or "").splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition('=')
+                if key == 'rbytes':
+                    read += int(value)
+                elif key == 'wbytes':
+                    write += int(value)
+        return read, write
+
+    def _read(self, path):
+        # cgroup files vanish with their cgroup, so they are not kept open
+        try:
+            return self.sysfs.read(path)
+        except OSError:
+            return None
+
+    def sample(self):
+        with self._lock:
+            if self.root is None:
+                self.root = self.find_root()
+                if self.root is None:
+                    return {}
+            self.scan()
+            now = time.monotonic()
+            stats = {}
+            last_seen = {}
+            for rel in self.dirs:
+                if not rel:
+                    continue
+                path = f"{self.root}/{rel}"
+                cpu = self.parse_keyed(self._read(f"{path}/cpu.stat"))
+                memory = self._read(f"{path}/memory.current")
+                io_read, io_write = self.parse_io(self._read(f"{path}/io.stat"))
+                usage = cpu.get('usage_usec')
+                entry = {
+                    "name": rel.rsplit('/', 1)[-1],
+                    "kind": self.kind(rel),
+                    "cpu_percent": None,
+                    "memory": int(memory) if memory and memory.isdigit() else None,
+                    "memory_pressure": self.parse_pressure(self._read(f"{path}/memory.pressure")),
+                    "io_read_rate": None,
+                    "io_write_rate": None,
+                    "throttled": cpu.get('nr_throttled'),
+                }
+                previous = self._last.get(rel)
+                if previous is not None and now > previous[0]:
+                    dt = now - previous[0]
+                    if usage is not None and previous[1] is not None:
+                        entry["cpu_percent"] = max(0, usage - previous[1]) / 1e6 / dt * 100
+                    entry["io_read_rate"] = max(0, io_read - previous[2]) / dt
+                    entry["io_write_rate"] = max(0, io_write - previous[3]) / dt
+                last_seen[rel] = (now, usage, io_read, io_write)
+                stats[rel] = entry
+            self._last = last_seen
+            self.stats = stats
+            return stats
+
+
+class ProcessInspector:
+    """Detail fields of a single process, read from /proc on demand.
+
+    Nothing here runs in the global process scan. load() reads the fields it
+    is asked for and checks the cancel callback between them, so a load for
+    a process that is no longer selected stops early. IO rates come from the
+    previous load of the same PID.
+    """
+
+    STATIC_FIELDS = ('cmdline', 'environment', 'cgroup')
+    DYNAMIC_FIELDS = ('threads', 'fds', 'memory', 'io')
+    LIST_FIELDS = ('open_files', 'sockets')
+    TCP_STATES = {'01': "ESTABLISHED", '02': "SYN_SENT", '03': "SYN_RECV", '04': "FIN_WAIT1", '05': "FIN_WAIT2",
+                  '06': "TIME_WAIT", '07': "CLOSE", '08': "CLOSE_WAIT", '09': "LAST_ACK", '0A': "LISTEN",
+                  '0B': "CLOSING"}
+
+    def __init__(self, source):
+        self.source = source
+        self._last_io = {}  # pid -> (time, read bytes, write bytes)
+
+    def _read(self, pid, name, mode='r'):
+        with self.source.open(f"/proc/{pid}/{name}", mode) as f:
+            return f.read()
+
+    def load(self, pid, fields, cancelled=lambda: False):
+        """Read the requested fields, an error string replaces a field that cannot be read"""
+        details = {}
+        for field in fields:
+            if cancelled():
+                return None
+            try:
+                details[field] = getattr(self, f"read_{field}")(pid)
+            except PermissionError:
+                details[field] = "Access denied"
+            except (OSError, ValueError) as e:
+                details[field] = f"N/A ({e.__class__.__name__})"
+        return details
+
+    def read_cmdline(self, pid):
+        return " ".join(arg for arg in self._read(pid, 'cmdline').split('\0') if arg) or "[kernel thread]"
+
+    def read_environment(self, pid):
+        environ = self._read(pid, 'environ')
+        count = len([var for var in environ.split('\0') if var])
+        return f"{count} variables, {len(environ.encode())} bytes"
+
+    def read_cgroup(self, pid):
+        lines = self._read(pid, 'cgroup').splitlines()
+        for line in lines:
+            if line.startswith('0::'):
+                return line[3:] or "/"
+        return lines[0].split(':', 2)[2] if lines else "N/A"
+
+    def read_threads(self, pid):
+        for line in self._read(pid, 'status').splitlines():
+            if line.startswith('Threads:'):
+                return line.split()[1]
+        return "N/A"
+
+    def _fd_targets(self, pid):
+        targets = []
+        for fd in self.source.listdir(f"/proc/{pid}/fd"):
+            try:
+                targets.append(self.source.readlink(f"/proc/{pid}/fd/{fd}"))
+            except OSError:
+                continue
+        return targets
+
+    def read_fds(self, pid):
+        targets = self._fd_targets(pid)
+        sockets = sum(1 for target in targets if target.startswith('socket:'))
+        pipes = sum(1 for target in targets if target.startswith('pipe:'))
+        return f"{len(targets)} open ({sockets} sockets, {pipes} pipes)"
+
+    def read_open_files(self, pid):
+        return [target for target in self._fd_targets(pid) if target.startswith('/')]
+
+    def read_memory(self, pid):
+        values = {}
+        for line in self._read(pid, 'smaps_rollup').splitlines():
+            key, _, rest = line.partition(':')
+            parts = rest.split()
+            if parts and parts[0].isdigit():
+                values[key] = int(parts[0]) * 1024
+        uss = values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+        fmt = LinuxSystemPanel.format_bytes
+        return f"PSS {fmt(values.get('Pss', 0))}, USS {fmt(uss)}, Swap {fmt(values.get('Swap', 0))}"
+
+    def read_io(self, pid):
+        values = {}
+        for line in self._read(pid, 'io').splitlines():
+            key, _, value = line.partition(':')
+            values[key] = int(value)
+        now = time.monotonic()
+        current = (now, values['read_bytes'], values['write_bytes'])
+        previous, self._last_io[pid] = self._last_io.get(pid), current
+        fmt = LinuxSystemPanel.format_bytes
+        if previous is None or now <= previous[0]:
+            return f"Read {fmt(values['read_bytes'])}, Written {fmt(values['write_bytes'])} (total)"
+        dt = now - previous[0]
+        return (f"Read {fmt((current[1] - previous[1]) / dt)}/s, Write {fmt((current[2] - previous[2]) / dt)}/s "
+                f"(total {fmt(values['read_bytes'])} / {fmt(values['write_bytes'])})")
+
+    def _socket_table(self):
+        """socket inode -> description, from the /proc/net tables"""
+        table = {}
+        for proto in ('tcp', 'tcp6', 'udp', 'udp6'):
+            try:
+                with self.source.open(f"/proc/net/{proto}", 'r') as f:
+                    lines = f.read().splitlines()[1:]
+            except OSError:
+                continue
+            for line in lines:
+                fields = line.split()
+                if len(fields) < 10:
+                    continue
+                state = self.TCP_STATES.get(fields[3], fields[3]) if proto.startswith('tcp') else ""
+                table[fields[9]] = f"{proto} {self._address(fields[1])} -> {self._address(fields[2])} {state}".strip()
+        try:
+            with self.source.open("/proc/net/unix", 'r') as f:
+                for line in f.read().splitlines()[1:]:
+                    fields = line.split()
+                    if len(fields) >= 7:
+                        table[fields[6]] = f"unix {fields[7] if len(fields) > 7 else '(anonymous)'}"
+        except OSError:
+            pass
+        return table
+
+    @staticmethod
+    def _address(text):
+        address, _, port = text.partition(':')
+        raw = bytes.fromhex(address)
+        if len(raw) == 4:
+            host = socket.inet_ntop(socket.AF_INET, raw[::-1])
+        else:
+            # /proc/net/tcp6 stores four host order 32-bit words
+            host = socket.inet_ntop(socket.AF_INET6, b''.join(raw[i:i + 4][::-1] for i in range(0, 16, 4)))
+        return f"{host}:{int(port, 16)}"
+
+    def read_sockets(self, pid):
+        inodes = [target[8:-1] for target in self._fd_targets(pid) if target.startswith('socket:[')]
+        if not inodes:
+            return []
+        table = self._socket_table()
+        return [table.get(inode, f"socket inode {inode}") for inode in inodes]
+
+    def forget(self, pid):
+        self._last_io.pop(pid, None)
+
+
+class MemoryRecord:
+    """Memory and swap in bytes and percent, formatted only when shown"""
+
+    __slots__ = ('total', 'available', 'used', 'percent', 'swap_total', 'swap_used', 'swap_percent', 'speed_mhz')
+
+    def __init__(self, total, available, used, percent, swap_total, swap_used, swap_percent, speed_mhz=None):
+        self.total = total
+        self.available = available
+        self.used = used
+        self.percent = percent
+        self.swap_total = swap_total
+        self.swap_used = swap_used
+        self.swap_percent = swap_percent
+        self.speed_mhz = speed_mhz  # None when sysfs does not say
+
+
+class DiskRecord:
+    """Usage of one mounted filesystem in bytes and percent"""
+
+    __slots__ = ('mount', 'fstype', 'total', 'used', 'free', 'percent')
+
+    def __init__(self, mount, fstype, total, used, free, percent):
+        self.mount = mount
+        self.fstype = fstype
+        self.total = total
+        self.used = used
+        self.free = free
+        self.percent = percent
+
+
+class ProcessTable:
+    """One process-list sample as parallel arrays.
+
+    A few thousand processes cost three arrays and two lists of shared,
+    interned strings instead of a dict apiece every tick. row() builds a
+    dict for the few processes that are actually shown.
+    """
+
+    __slots__ = ('pids', 'cpu', 'mem', 'names', 'statuses')
+    FIELDS = ['pid', 'name', 'cpu_percent', 'memory_percent', 'status']
+
+    def __init__(self):
+        self.pids = array.array('i')
+        self.cpu = array.array('d')
+        self.mem = array.array('d')
+        self.names = []
+        self.statuses = []
+
+    @classmethod
+    def sample(cls, source):
+        table = cls()
+        for proc in source.process_iter(cls.FIELDS):
+            try:
+                info = proc.info
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            table.append(info['pid'], info.get('name') or "", info.get('cpu_percent') or 0.0,
+                         info.get('memory_percent') or 0.0, info.get('status') or "")
+        return table
+
+    def append(self, pid, name, cpu, mem, status):
+        self.pids.append(pid)
+        self.cpu.append(cpu)
+        self.mem.append(mem)
+        self.names.append(sys.intern(name))
+        self.statuses.append(sys.intern(status))
+
+    def __len__(self):
+        return len(self.pids)
+
+    def __iter__(self):
+        """(pid, name, cpu, mem, status) per process"""
+        return zip(self.pids, self.names, self.cpu, self.mem, self.statuses)
+
+    def row(self, i):
+        return {'pid': self.pids[i], 'name': self.names[i], 'cpu_percent': self.cpu[i],
+                'memory_percent': self.mem[i], 'status': self.statuses[i]}
+
+    def top(self, limit, minimum=0.1):
+        """Rows of the busiest processes above minimum CPU%"""
+        cpu = self.cpu
+        busiest = heapq.nlargest(limit, (i for i in range(len(cpu)) if cpu[i] > minimum), key=cpu.__getitem__)
+        return [self.row(i) for i in busiest]
+
+
+class ProcessIndex:
+    """Searchable index of the process snapshot.
+
+    update() takes each process-list sample. Static fields (name, user,
+    cmdline, cgroup) are read from /proc once, when a PID first appears, and
+    dropped when it exits. CPU, memory and status are updated in place.
+    Queries never touch /proc. Text is indexed by distinct field value,
+    which collapses thousands of processes into a few hundred names, users
+    and cgroups, so a text term scans the value list, not every process.
+    Status is indexed the same way, and CPU, memory and PID are kept
+    sorted so a comparison is a bisect. Set operations combine the terms.
+
+    Query terms are ANDed:
+        ssh             substring of name, user, cmdline or cgroup
+        /ssh.*d$/       regex over the same fields
+        user:root       substring of one field (name, user, cmd, cgroup, status, pid)
+        cmd:/-m http/   regex on one field
+        cpu>5 mem>=1    numeric comparison on cpu, mem or pid
+    """
+
+    TEXT_FIELDS = ('name', 'user', 'cmd', 'cgroup')
+    NUMERIC_FIELDS = {'cpu': 1, 'mem': 2, 'pid': 0}
+    TERM = re.compile(r'^(cpu|mem|pid)(>=|<=|>|<|=)([0-9.]+)$')
+
+    def __init__(self, source):
+        self.source = source
+        self.static = {}  # pid -> (name, user, cmdline, cgroup)
+        self.dynamic = {}  # pid -> [pid, cpu, mem, status]
+        self.values = {}  # (field index, lowercased value) -> set of pids
+        self.statuses = collections.defaultdict(set)  # status -> set of pids
+        self._users = {}
+        self._vocab = None  # (keys, blob, line offsets) over self.values
+        self._pid_vocab = None  # the same over the PIDs
+        self._sorted = {}  # numeric field -> (sorted values, pids in that order)
+        self._last = (None, None, None)  # query, terms, results
+        self._lock = threading.Lock()
+
+    def _user(self, uid):
+        if uid not in self._users:
+            try:
+                self._users[uid] = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                self._users[uid] = str(uid)
+        return self._users[uid]
+
+    def _read_static(self, pid, name):
+        def read(entry):
+            try:
+                with self.source.open(f"/proc/{pid}/{entry}", 'r') as f:
+                    return f.read()
+            except (OSError, UnicodeDecodeError):
+                return ""
+        user = ""
+        for line in read('status').splitlines():
+            if line.startswith('Uid:'):
+                user = self._user(int(line.split()[1]))
+                break
+        cmdline = " ".join(arg for arg in read('cmdline').split('\0') if arg)
+        cgroup = ""
+        for line in read('cgroup').splitlines():
+            if line.startswith('0::'):
+                cgroup = line[3:]
+        return (name or "", user, cmdline.replace('\n', ' '), cgroup)
+
+    def update(self, table):
+        """Apply a ProcessTable sample"""
+        seen = set()
+        new = []
+        updates = []
+        for pid, name, cpu, mem, status in table:
+            seen.add(pid)
+            row = self.dynamic.get(pid)
+            values = [pid, cpu, mem, status]
+            if row is None or self.static[pid][0] != name:
+                # a new process, or a recycled PID
+                new.append((pid, name, values))
+            elif row[3] != values[3]:
+                updates.append((row, values))
+            else:
+                row[1:3] = values[1:3]
+        statics = [(pid, self._read_static(pid, name), values) for pid, name, values in new]
+        with self._lock:
+            for row, values in updates:
+                self.statuses[row[3]].discard(row[0])
+                self.statuses[values[3]].add(row[0])
+                row[1:] = values[1:]
+            for pid, static, values in statics:
+                if pid in self.static:
+                    self._unindex(pid)
+                self.static[pid] = static
+                self.dynamic[pid] = values
+                self.statuses[values[3]].add(pid)
+                for field, value in enumerate(static):
+                    self.values.setdefault((field, value.lower()), set()).add(pid)
+            gone = [pid for pid in self.dynamic if pid not in seen]
+            for pid in gone:
+                self._unindex(pid)
+                del self.dynamic[pid]
+                del self.static[pid]
+            if new or gone:
+                self._vocab = self._pid_vocab = None
+            # CPU and memory move every sample, sort them here instead of on a keystroke
+            rows = list(self.dynamic.values())
+            for field, index in self.NUMERIC_FIELDS.items():
+                rows.sort(key=lambda row: row[index])
+                self._sorted[field] = ([row[index] for row in rows], [row[0] for row in rows])
+            self._last = (None, None, None)
+        return len(new), len(gone)
+
+    def _unindex(self, pid):
+        self.statuses[self.dynamic[pid][3]].discard(pid)
+        for field, value in enumerate(self.static[pid]):
+            key = (field, value.lower())
+            pids = self.values.get(key)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self.values[key]
+
+    @staticmethod
+    def _build_vocab(keys, texts):
+        offsets = []
+        position = 0
+        for text in texts:
+            offsets.append(position)
+            position += len(text) + 1
+        return (keys, "".join(f"{text}\n" for text in texts), offsets)
+
+    @classmethod
+    def parse(cls, query):
+        """Query text to a list of (kind, field, value) terms"""
+        try:
+            tokens = shlex.split(query)
+        except ValueError:
+            tokens = query.split()
+        terms = []
+        for token in tokens:
+            match = cls.TERM.match(token.lower())
+            if match:
+                try:
+                    terms.append(('number', match.group(1), (match.group(2), float(match.group(3)))))
+                    continue
+                except ValueError:
+                    pass
+            field, sep, value = token.partition(':')
+            field = field.lower()
+            if not sep or field not in cls.TEXT_FIELDS + ('status', 'pid'):
+                field, value = None, token
+            if len(value) > 2 and value.startswith('/') and value.endswith('/'):
+                try:
+                    terms.append(('regex', field, re.compile(value[1:-1], re.IGNORECASE)))
+                    continue
+                except re.error:
+                    value = value[1:-1]
+            terms.append(('text', field, value.lower()))
+        return terms
+
+    def _match_text(self, kind, field, value):
+        """PIDs whose field (any text field when None) contains value or matches the regex"""
+        if field == 'pid':
+            if self._pid_vocab is None:
+                pids = list(self.dynamic)
+                self._pid_vocab = self._build_vocab([(0, pid) for pid in pids], [str(pid) for pid in pids])
+            keys, blob, offsets = self._pid_vocab
+            wanted = None
+        else:
+            if self._vocab is None:
+                keys = list(self.values)
+                self._vocab = self._build_vocab(keys, [text for _, text in keys])
+            keys, blob, offsets = self._vocab
+            wanted = None if field is None else self.TEXT_FIELDS.index(field)
+        matched = []
+        if kind == 'regex':
+            matched = [key for key in keys if (wanted is None or key[0] == wanted) and value.search(str(key[1]))]
+        else:
+            position = blob.find(value)
+            while position != -1:
+                line = bisect.bisect_right(offsets, position) - 1
+                if wanted is None or keys[line][0] == wanted:
+                    matched.append(keys[line])
+                # continue on the next value, one hit per value is enough
+                next_line = offsets[line + 1] if line + 1 < len(offsets) else len(blob)
+                position = blob.find(value, next_line)
+        if field == 'pid':
+            return {pid for _, pid in matched}
+        return set().union(*(self.values[key] for key in matched))
+
+    def _match_status(self, kind, value):
+        matched = [status for status in self.statuses
+                   if (value.search(status) if kind == 'regex' else value in status.lower())]
+        return set().union(*(self.statuses[status] for status in matched))
+
+    def _match_number(self, field, op, number):
+        values, pids = self._sorted.get(field, ([], []))
+        if op == '>':
+            return set(pids[bisect.bisect_right(values, number):])
+        if op == '>=':
+            return set(pids[bisect.bisect_left(values, number):])
+        if op == '<':
+            return set(pids[:bisect.bisect_left(values, number)])
+        if op == '<=':
+            return set(pids[:bisect.bisect_right(values, number)])
+        return set(pids[bisect.bisect_left(values, number):bisect.bisect_right(values, number)])
+
+    def query(self, query):
+        """PIDs matching the query"""
+        with self._lock:
+            terms = self.parse(query)
+            last_query, last_terms, last_results = self._last
+            # typing more of the last text term can only narrow the results
+            refine = (last_results is not None and query.startswith(last_query) and terms and last_terms
+                      and len(terms) == len(last_terms) and terms[:-1] == last_terms[:-1]
+                      and terms[-1][0] == last_terms[-1][0] == 'text' and terms[-1][1] == last_terms[-1][1])
+            candidates = last_results if refine else None
+            for kind, field, value in terms:
+                if not value:
+                    continue
+                if kind == 'number':
+                    found = self._match_number(field, *value)
+                elif field == 'status':
+                    found = self._match_status(kind, value)
+                else:
+                    found = self._match_text(kind, field, value)
+                candidates = found if candidates is None else candidates & found
+            if candidates is None:
+                candidates = set(self.dynamic)
+            self._last = (query, terms, candidates)
+            return candidates
+
+    def top(self, pids, limit, key='cpu'):
+        """The limit rows of pids with the highest cpu or mem, as dicts"""
+        index = self.NUMERIC_FIELDS[key]
+        with self._lock:
+            rows = heapq.nlargest(limit, (self.dynamic[pid] for pid in pids if pid in self.dynamic),
+                                  key=lambda row: row[index])
+            return [{'pid': pid, 'name': self.static[pid][0], 'user': self.static[pid][1], 'cpu_percent': cpu,
+                     'memory_percent': mem, 'status': status} for pid, cpu, mem, status in rows]
+
+
+class DiskUsageScanner:
+    """Directory sizes below a mount, scanned on a thread pool and cached on disk.
+
+    Workers each scandir one directory and hand back its own file bytes and
+    subdirectory names, which are queued for the next free worker. Totals are
+    added to every ancestor as directories come in, so the tree can be shown
+    while the scan is still running. Other filesystems mounted below are not
+    entered, and a file with several hardlinks is counted once.
+
+    The finished tree is saved with each directory's mtime. The next scan
+    stats every directory but only lists the ones whose mtime moved. A file
+    growing in place does not change its directory's mtime, so a full scan
+    ignores the cache.
+    """
+
+    MAX_CHILDREN = 200
+
+    def __init__(self, source, cache_dir=STATE_DIR, workers=8):
+        self.source = source
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.mount = None
+        self.nodes = {}  # relative path -> (mtime, own bytes, own files, subdirs, hardlinked (inode, bytes))
+        self.totals = {}  # relative path -> [bytes, files] of everything scanned below it
+        self.scanning = False
+        self.listed = 0  # directories listed by the current scan
+        self.reused = 0  # directories taken from the cache
+        self.started = None
+        self.elapsed = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def cache_path(self, mount):
+        return os.path.join(self.cache_dir, f"du{mount.replace('/', '_')}.json.gz")
+
+    def load_cache(self, mount, dev):
+        try:
+            with gzip.open(self.cache_path(mount), 'rt') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('mount') != mount or data.get('dev') != dev:
+            return {}
+        return data.get('nodes', {})
+
+    def save_cache(self, mount, dev, nodes):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.cache_path(mount)
+            with gzip.open(f"{path}.tmp", 'wt') as f:
+                json.dump({'mount': mount, 'dev': dev, 'nodes': nodes}, f, separators=(',', ':'))
+            os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Error saving disk usage cache: {e}")
+
+    def _list(self, mount, rel, dev, cached):
+        """One directory's node, from the cache when its mtime is unchanged"""
+        path = self.source.path(f"{mount.rstrip('/')}/{rel}" if rel else mount)
+        try:
+            info = os.stat(path, follow_symlinks=False)
+        except OSError:
+            return rel, None, False
+        if cached is not None and cached[0] == info.st_mtime_ns:
+            return rel, cached, True
+        own = info.st_blocks * 512
+        files = 0
+        subdirs = []
+        links = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if st.st_dev == dev:
+                            subdirs.append(entry.name)
+                        continue
+                    files += 1
+                    if st.st_nlink > 1:
+                        links.append((st.st_ino, st.st_blocks * 512))
+                    else:
+                        own += st.st_blocks * 512
+        except OSError:
+            pass
+        return rel, (info.st_mtime_ns, own, files, subdirs, links), False
+
+    def start(self, mount, full=False):
+        """Scan mount on a background thread, unless a scan is running"""
+        with self._lock:
+            if self.scanning:
+                return False
+            self.scanning = True
+        self._cancel.clear()
+        threading.Thread(target=self.scan, args=(mount, full), name='disk-usage', daemon=True).start()
+        return True
+
+    def cancel(self):
+        self._cancel.set()
+
+    def scan(self, mount, full=False):
+        with self._lock:
+            self.scanning = True
+            self.mount = mount
+            self.nodes = {}
+            self.totals = {}
+            self.listed = self.reused = 0
+            self.started = time.monotonic()
+            self.elapsed = None
+        try:
+            dev = os.stat(self.source.path(mount)).st_dev
+        except OSError as e:
+            print(f"Error scanning {mount}: {e}")
+            with self._lock:
+                self.scanning = False
+            return
+        cache = {} if full else self.load_cache(mount, dev)
+        results = queue.Queue()
+        seen_links = set()
+
+        def task(rel):
+            try:
+                results.put(self._list(mount, rel, dev, cache.get(rel)))
+            except Exception as e:
+                print(f"Error scanning {rel}: {e}")
+                results.put((rel, None, False))
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        outstanding = 1
+        pool.submit(task, '')
+        while outstanding:
+            rel, node, reused = results.get()
+            outstanding -= 1
+            if self._cancel.is_set():
+                break
+            if node is None:
+                continue
+            self._add(rel, node, reused, seen_links)
+            for name in node[3]:
+                pool.submit(task, f"{rel}/{name}" if rel else name)
+                outstanding += 1
+        cancelled = self._cancel.is_set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self.scanning = False
+            self.elapsed = time.monotonic() - self.started
+            nodes = dict(self.nodes)
+        if not cancelled:
+            self.save_cache(mount, dev, nodes)
+
+    def _add(self, rel, node, reused, seen_links):
+        _, own, files, _, links = node
+        for inode, usage in links:
+            if inode not in seen_links:
+                seen_links.add(inode)
+                own += usage
+        with self._lock:
+            self.nodes[rel] = node
+            if reused:
+                self.reused += 1
+            else:
+                self.listed += 1
+            # the parent always arrived first, so every ancestor has a total
+            part = rel
+            while True:
+                total = self.totals.setdefault(part, [0, 0])
+                total[0] += own
+                total[1] += files
+                if not part:
+                    break
+                part = part.rsplit('/', 1)[0] if '/' in part else ''
+
+    def children(self, rel):
+        """(name, relative path, bytes, files, has subdirs) of rel's largest subdirectories"""
+        with self._lock:
+            node = self.nodes.get(rel)
+            if node is None:
+                return []
+            rows = []
+            for name in node[3]:
+                child = f"{rel}/{name}" if rel else name
+                total = self.totals.get(child, (0, 0))
+                subdirs = self.nodes[child][3] if child in self.nodes else ()
+                rows.append((name, child, total[0], total[1], bool(subdirs)))
+        return heapq.nlargest(self.MAX_CHILDREN, rows, key=lambda row: row[2])
+
+    def total(self, rel):
+        with self._lock:
+            return tuple(self.totals.get(rel, (0, 0)))
+
+    def progress(self):
+        with self._lock:
+            total = self.totals.get('', (0, 0))
+            elapsed = self.elapsed if self.elapsed is not None else (
+                time.monotonic() - self.started if self.started else 0)
+            return {'mount': self.mount, 'scanning': self.scanning, 'listed': self.listed, 'reused': self.reused,
+                    'bytes': total[0], 'files': total[1], 'elapsed': elapsed}
+
+
+def _version_order(c):
+    """Sort weight of a non-digit character in a Debian version"""
+    if c == '~':
+        return -1
+    if c.isalpha():
+        return ord(c)
+    return ord(c) + 256
+
+
+def _compare_fragment(a, b):
+    """Compare upstream versions or revisions the way dpkg does"""
+    i = j = 0
+    while i < len(a) or j < len(b):
+        # non-digit run, where '~' sorts before everything, even the end
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _version_order(a[i]) if i < len(a) and not a[i].isdigit() else 0
+            bc = _version_order(b[j]) if j < len(b) and not b[j].isdigit() else 0
+            if ac != bc:
+                return -1 if ac < bc else 1
+            i += 1
+            j += 1
+        start = i
+        while i < len(a) and a[i].isdigit():
+            i += 1
+        an = int(a[start:i] or 0)
+        start = j
+        while j < len(b) and b[j].isdigit():
+            j += 1
+        bn = int(b[start:j] or 0)
+        if an != bn:
+            return -1 if an < bn else 1
+    return 0
+
+
+def _split_version(version):
+    """(epoch, upstream, revision), epoch -1 when it is not a number and the version invalid"""
+    epoch, _, rest = version.partition(':') if ':' in version else ('0', '', version)
+    upstream, _, revision = rest.rpartition('-') if '-' in rest else (rest, '', '0')
+    return int(epoch or 0) if epoch.isdigit() or not epoch else -1, upstream, revision
+
+
+@functools.lru_cache(maxsize=4096)
+def compare_versions(a, b):
+    """-1, 0 or 1 for Debian versions a and b, as dpkg --compare-versions orders them"""
+    if a == b:
+        return 0
+    a_epoch, a_upstream, a_revision = _split_version(a)
+    b_epoch, b_upstream, b_revision = _split_version(b)
+    if a_epoch != b_epoch:
+        return -1 if a_epoch < b_epoch else 1
+    return _compare_fragment(a_upstream, b_upstream) or _compare_fragment(a_revision, b_revision)
+
+
+class PackageUpdates:
+    """Upgradable packages from the dpkg status file and apt's package lists.
+
+    Nothing is run; this is what `apt list --upgradable` reports, read
+    straight from the files apt update leaves behind. Only the fields the
+    comparison needs are pulled out of each stanza, with one regex pass over
+    every file, and lists entries for packages that are not installed are
+    dropped. Everything is rebuilt only when the status file or a list
+    changes, so a check is one stat per file. A list counts as a security
+    source when its archive, going by apt's file name, is a -security
+    pocket or a security mirror. Pinning is not applied: the candidate is
+    the highest version in any list.
+    """
+
+    STATUS = '/var/lib/dpkg/status'
+    LISTS = '/var/lib/apt/lists'
+    FIELD = re.compile(r'^(Package|Status|Architecture|Version): (.*)$', re.M)
+
+    def __init__(self, source):
+        self.source = source
+        self.installed = {}  # (name, arch) -> installed version
+        self.candidates = {}  # (name, arch) -> (highest version, highest security version)
+        self.upgradable = []
+        self.signature = None
+        self.build_time = None
+        self._lock = threading.Lock()
+
+    def list_files(self):
+        try:
+            return [name for name in self.source.listdir(self.LISTS) if name.endswith('_Packages')]
+        except OSError:
+            return []
+
+    @staticmethod
+    def is_security(list_name):
+        archive = list_name.split('_dists_')[0]
+        suite = list_name.split('_dists_')[-1].split('_')[0]
+        return suite.endswith('-security') or 'security' in archive
+
+    def current_signature(self):
+        files = [self.STATUS] + [f"{self.LISTS}/{name}" for name in self.list_files()]
+        signature = []
+        for path in files:
+            try:
+                signature.append((path, self.source.mtime(path)))
+            except OSError:
+                continue
+        return tuple(signature)
+
+    def _stanzas(self, path):
+        """(package, status, arch, version) of every stanza"""
+        with self.source.open(path) as f:
+            text = f.read()
+        package = status = arch = version = None
+        for key, value in self.FIELD.findall(text):
+            if key == 'Package':
+                if package is not None:
+                    yield package, status, arch, version
+                package, status, arch, version = value, None, None, None
+            elif key == 'Status':
+                status = value
+            elif key == 'Architecture':
+                arch = value
+            else:
+                version = value
+        if package is not None:
+            yield package, status, arch, version
+
+    def rebuild(self):
+        installed = {}
+        for package, status, arch, version in self._stanzas(self.STATUS):
+            if status and status.endswith(' installed') and version and _split_version(version)[0] >= 0:
+                installed[(package, arch)] = version
+        candidates = {}
+        for name in self.list_files():
+            security = self.is_security(name)
+            try:
+                stanzas = list(self._stanzas(f"{self.LISTS}/{name}"))
+            except OSError as e:
+                print(f"Error reading {name}: {e}")
+                continue
+            for package, _, arch, version in stanzas:
+                key = (package, arch)
+                if key not in installed or not version or _split_version(version)[0] < 0:
+                    continue
+                best, best_security = candidates.get(key, (None, None))
+                if best is None or compare_versions(version, best) > 0:
+                    best = version
+                if security and (best_security is None or compare_versions(version, best_security) > 0):
+                    best_security = version
+                candidates[key] = (best, best_security)
+        upgradable = []
+        for key, (best, best_security) in candidates.items():
+            current = installed[key]
+            if compare_versions(best, current) > 0:
+                upgradable.append({
+                    "name": key[0],
+                    "arch": key[1],
+                    "installed": current,
+                    "candidate": best,
+                    "security": best_security is not None and compare_versions(best_security, current) > 0,
+                })
+        upgradable.sort(key=lambda entry: (not entry["security"], entry["name"]))
+        self.installed = installed
+        self.candidates = candidates
+        self.upgradable = upgradable
+
+    def check(self):
+        """The upgradable packages, security updates first, or None without a dpkg status file"""
+        with self._lock:
+            signature = self.current_signature()
+            if not signature or signature[0][0] != self.STATUS:
+                return None
+            if signature != self.signature:
+                started = time.perf_counter()
+                self.rebuild()
+                self.build_time = time.perf_counter() - started
+                self.signature = signature
+            return self.upgradable
+
+
+class FirewallMonitor:
+    """The netfilter ruleset in structured form, with per-rule packet rates.
+
+    nftables is read with `nft -j list ruleset`, and iptables (legacy or
+    nft backed) from `iptables-save -c` when nft is missing. The parsed
+    chains and rule texts are kept until the ruleset generation changes.
+    On the live host the generation is one netlink round trip
+    (NFT_MSG_GETGEN), so the status getters do not fork while nothing was
+    reloaded. Counters only come with a full listing, so sample() lists
+    the ruleset and turns the counter deltas into packets per second; only
+    the firewall view runs it.
+    """
+
+    NETLINK_NETFILTER = 12
+    NFNL_SUBSYS_NFTABLES = 10
+    NFT_MSG_GETGEN = 16
+    NFTA_GEN_ID = 1
+    NLMSG_ERROR = 2
+    VERDICTS = ('accept', 'drop', 'reject', 'return', 'jump', 'goto', 'queue', 'masquerade', 'snat', 'dnat', 'redirect')
+    FILTER_HOOKS = ('input', 'forward')
+    BUILTIN_HOOKS = {'INPUT': 'input', 'FORWARD': 'forward', 'OUTPUT': 'output',
+                     'PREROUTING': 'prerouting', 'POSTROUTING': 'postrouting'}
+
+    def __init__(self, source):
+        self.source = source
+        self.live = type(source) is DataSource
+        self.backend = None
+        self.generation = None
+        self.chains = []  # dicts: family, table, name, hook, policy
+        self.rules = []  # dicts: key, family, table, chain, text, verdict, packets, bytes, rate
+        self.loaded = None
+        self._last = {}  # rule key -> (time, packets)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def nft_generation(self):
+        """The nf_tables ruleset generation, or None when it cannot be asked for"""
+        if not self.live:
+            return None
+        try:
+            with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, self.NETLINK_NETFILTER) as sock:
+                sock.settimeout(1)
+                self._seq += 1
+                msg_type = (self.NFNL_SUBSYS_NFTABLES << 8) | self.NFT_MSG_GETGEN
+                # nlmsghdr then nfgenmsg (family, version, resource id)
+                sock.send(struct.pack("=IHHII", 20, msg_type, 1, self._seq, 0) + struct.pack("=BBH", 0, 0, 0))
+                data = sock.recv(4096)
+        except (OSError, AttributeError):
+            return None
+        if len(data) < 20 or struct.unpack_from("=H", data, 4)[0] == self.NLMSG_ERROR:
+            return None
+        offset = 20
+        while offset + 4 <= len(data):
+            length, kind = struct.unpack_from("=HH", data, offset)
+            if length < 4:
+                break
+            if kind & 0x3fff == self.NFTA_GEN_ID and length >= 8:
+                return struct.unpack_from(">I", data, offset + 4)[0]
+            offset += (length + 3) & ~3
+        return None
+
+    @classmethod
+    def _nft_value(cls, value):
+        if isinstance(value, dict):
+            if 'payload' in value:
+                payload = value['payload']
+                return f"{payload.get('protocol', payload.get('base', ''))} {payload.get('field', '')}".strip()
+            if 'meta' in value:
+                key = value['meta']['key']
+                return key if key in ('iifname', 'oifname', 'iif', 'oif', 'mark', 'l4proto', 'nfproto') else f"meta {key}"
+            if 'ct' in value:
+                return f"ct {value['ct']['key']}"
+            if 'prefix' in value:
+                return f"{value['prefix']['addr']}/{value['prefix']['len']}"
+            if 'range' in value:
+                return "-".join(str(cls._nft_value(v)) for v in value['range'])
+            if 'set' in value:
+                return "{ " + ", ".join(str(cls._nft_value(v)) for v in value['set']) + " }"
+            key, inner = next(iter(value.items()))
+            return f"{key} {cls._nft_value(inner)}" if not isinstance(inner, dict) else key
+        if isinstance(value, list):
+            return "{ " + ", ".join(str(cls._nft_value(v)) for v in value) + " }"
+        return str(value)
+
+    @classmethod
+    def nft_rule(cls, rule):
+        """(text, verdict, packets, bytes) of one `nft -j` rule"""
+        parts = []
+        verdict = None
+        packets = octets = 0
+        for statement in rule.get('expr', []):
+            name, value = next(iter(statement.items()))
+            if name == 'counter' and isinstance(value, dict):
+                packets, octets = value.get('packets', 0), value.get('bytes', 0)
+            elif name == 'match':
+                op = value.get('op', '==')
+                op = "" if op in ('==', 'in') else f" {op}"
+                parts.append(f"{cls._nft_value(value['left'])}{op} {cls._nft_value(value['right'])}")
+            elif name in ('jump', 'goto'):
+                verdict = name
+                parts.append(f"{name} {value['target']}")
+            elif name in cls.VERDICTS:
+                verdict = name
+                parts.append(name)
+            else:
+                parts.append(name)
+        if rule.get('comment'):
+            parts.append(f'comment "{rule["comment"]}"')
+        return " ".join(parts), verdict, packets, octets
+
+    def load_nft(self, output):
+        chains = []
+        rules = []
+        for item in json.loads(output).get('nftables', []):
+            if 'chain' in item:
+                chain = item['chain']
+                chains.append({"family": chain['family'], "table": chain['table'], "name": chain['name'],
+                               "hook": chain.get('hook'), "policy": chain.get('policy')})
+            elif 'rule' in item:
+                rule = item['rule']
+                text, verdict, packets, octets = self.nft_rule(rule)
+                rules.append({"key": (rule['family'], rule['table'], rule['chain'], rule['handle']),
+                              "family": rule['family'], "table": rule['table'], "chain": rule['chain'],
+                              "text": text, "verdict": verdict, "packets": packets, "bytes": octets, "rate": None})
+        return chains, rules
+
+    def load_iptables_save(self, output, family):
+        chains = []
+        rules = []
+        table = None
+        positions = collections.Counter()
+        for line in output.splitlines():
+            if line.startswith('*'):
+                table = line[1:].strip()
+            elif line.startswith(':'):
+                name, policy = line[1:].split()[:2]
+                chains.append({"family": family, "table": table, "name": name,
+                               "hook": self.BUILTIN_HOOKS.get(name) if policy != '-' else None,
+                               "policy": policy.lower() if policy != '-' else None})
+            elif line.startswith('[') and ' -A ' in line:
+                counters, _, rest = line.partition(' ')
+                packets, _, octets = counters.strip('[]').partition(':')
+                args = rest.split()
+                chain = args[1]
+                positions[(table, chain)] += 1
+                text = " ".join(args[2:])
+                target = args[args.index('-j') + 1].lower() if '-j' in args[:-1] else None
+                rules.append({"key": (family, table, chain, positions[(table, chain)], text),
+                              "family": family, "table": table, "chain": chain, "text": text,
+                              "verdict": target, "packets": int(packets or 0), "bytes": int(octets or 0),
+                              "rate": None})
+        return chains, rules
+
+    def list_ruleset(self):
+        """(backend, chains, rules) from nft or iptables-save, or None without either"""
+        try:
+            output = self.source.check_output(['nft', '-j', 'list', 'ruleset'], stderr=subprocess.PIPE, timeout=5)
+            return ('nftables',) + self.load_nft(output)
+        except (OSError, subprocess.SubprocessError, ValueError):
+            pass
+        chains = []
+        rules = []
+        for command, family in (('iptables-save', 'ip'), ('ip6tables-save', 'ip6')):
+            try:
+                output = self.source.check_output([command, '-c'], stderr=subprocess.PIPE, timeout=5).decode()
+            except (OSError, subprocess.SubprocessError):
+                continue
+            more_chains, more_rules = self.load_iptables_save(output, family)
+            chains += more_chains
+            rules += more_rules
+        return ('iptables', chains, rules) if chains else None
+
+    def _store(self, listing, generation):
+        now = time.monotonic()
+        self.generation = generation
+        self.loaded = now
+        if listing is None:
+            self.backend, self.chains, self.rules = None, [], []
+            return
+        self.backend, self.chains, rules = listing
+        last = {}
+        for rule in rules:
+            previous = self._last.get(rule["key"])
+            if previous is not None and now > previous[0]:
+                rule["rate"] = max(0, rule["packets"] - previous[1]) / (now - previous[0])
+            last[rule["key"]] = (now, rule["packets"])
+        self._last = last
+        self.rules = rules
+
+    def ruleset(self):
+        """The cached ruleset, listed again only when its generation moved"""
+        with self._lock:
+            # iptables-legacy changes do not move the nf_tables generation
+            generation = self.nft_generation() if self.backend != 'iptables' else None
+            if self.loaded is None or generation is None or generation != self.generation:
+                self._store(self.list_ruleset(), generation)
+            return self.backend, self.chains, self.rules
+
+    def sample(self):
+        """List the ruleset for its counters and update the per-rule rates"""
+        with self._lock:
+            self._store(self.list_ruleset(), self.nft_generation())
+            return self.rules
+
+    def default_accept(self):
+        """Input and forward base chains that let through whatever no rule drops"""
+        with self._lock:
+            chains, rules = self.chains, self.rules
+        open_chains = []
+        for chain in chains:
+            if chain["hook"] not in self.FILTER_HOOKS or chain["policy"] != 'accept':
+                continue
+            if chain["table"] not in ('filter', None) and self.backend == 'iptables':
+                continue
+            # a last rule that drops everything closes the chain whatever the policy says
+            own = [rule for rule in rules if (rule["family"], rule["table"], rule["chain"])
+                   == (chain["family"], chain["table"], chain["name"])]
+            last = own[-1]["text"] if own else ""
+            if last in ('drop', 'reject', '-j DROP', '-j REJECT') or last.startswith(('reject with', '-j REJECT ')):
+                continue
+            open_chains.append(chain)
+        return open_chains
+
+    def hottest(self, limit=10):
+        with self._lock:
+            rules = [rule for rule in self.rules if rule["rate"] is not None]
+        return heapq.nlargest(limit, rules, key=lambda rule: (rule["rate"], rule["packets"]))
+
+
+class DnsProbe:
+    """Health and latency of the configured resolvers, probed over UDP.
+
+    Every round sends one A query to each nameserver in resolv.conf, to
+    the systemd-resolved stub and to the upstreams resolved forwards to.
+    All queries go out together on one asyncio loop, with no thread per
+    query. Latencies are kept per server so percentiles cover the last
+    rounds, not one sample. The interface each query leaves through is the
+    one the kernel picked for the connected socket. A query to a
+    non-loopback server that leaves through a non-VPN interface while a
+    VPN is up is reported as a leak.
+    """
+
+    STUB = '127.0.0.53'
+    RESOLVED_UPSTREAMS = '/run/systemd/resolve/resolv.conf'
+    VPN_PREFIXES = ('tun', 'tap', 'wg', 'ppp')
+    RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+    def __init__(self, source, files, name='debian.org', port=53, timeout=2.0, history=60):
+        self.source = source
+        self.files = files
+        self.name = name
+        self.port = port
+        self.timeout = timeout
+        self.history = collections.defaultdict(lambda: collections.deque(maxlen=history))  # address -> latencies, None for failures
+        self.results = {}  # address -> last probe result
+        self.probed = None
+        self._lock = threading.Lock()
+
+    def servers(self):
+        """(address, role) of every resolver worth probing"""
+        servers = []
+        for path, role in (('/etc/resolv.conf', 'configured'), (self.RESOLVED_UPSTREAMS, 'upstream')):
+            try:
+                nameservers = self.files.get(path, parse_resolv_conf)["nameservers"]
+            except OSError:
+                continue
+            servers += [(address, role) for address in nameservers]
+        if self.source.exists(self.RESOLVED_UPSTREAMS):
+            servers.append((self.STUB, 'stub'))
+        unique = {}
+        for address, role in servers:
+            unique.setdefault(address, 'stub' if address == self.STUB else role)
+        return list(unique.items())
+
+    def build_query(self, query_id):
+        labels = b"".join(bytes([len(label)]) + label.encode() for label in self.name.strip('.').split('.'))
+        # recursion desired, one question, type A, class IN
+        return struct.pack(">HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + labels + b"\0" + struct.pack(">HH", 1, 1)
+
+    async def _query(self, address, role):
+        loop = asyncio.get_running_loop()
+        answer = loop.create_future()
+        query_id = random.getrandbits(16)
+
+        class Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                if len(data) >= 12 and not answer.done():
+                    reply_id, flags = struct.unpack_from(">HH", data)
+                    if reply_id == query_id and flags & 0x8000:
+                        answer.set_result(flags & 0xf)
+
+            def error_received(self, exc):
+                if not answer.done():
+                    answer.set_exception(exc)
+
+        result = {"address": address, "role": role, "latency": None, "rcode": None, "error": None, "interface": None}
+        try:
+            transport, _ = await loop.create_datagram_endpoint(Protocol, remote_addr=(address, self.port))
+        except OSError as e:
+            result["error"] = e.strerror or str(e)
+            return result
+        try:
+            result["source"] = transport.get_extra_info('sockname')[0]
+            started = time.perf_counter()
+            transport.sendto(self.build_query(query_id))
+            rcode = await asyncio.wait_for(answer, self.timeout)
+            result["rcode"] = self.RCODES.get(rcode, str(rcode))
+            if rcode in (0, 3):
+                result["latency"] = (time.perf_counter() - started) * 1000
+            else:
+                result["error"] = result["rcode"]
+        except asyncio.TimeoutError:
+            result["error"] = "timeout"
+        except OSError as e:
+            result["error"] = e.strerror or str(e)
+        finally:
+            transport.close()
+        return result
+
+    async def _probe_all(self, servers):
+        return await asyncio.gather(*(self._query(address, role) for address, role in servers))
+
+    def probe(self):
+        """Query every resolver once, concurrently, and record the results"""
+        servers = self.servers()
+        results = asyncio.run(self._probe_all(servers)) if servers else []
+        try:
+            addresses = {addr.address.split('%')[0]: name for name, addrs in self.source.net_if_addrs().items()
+                         for addr in addrs}
+            vpn_up = any(name.startswith(self.VPN_PREFIXES) and stats.isup
+                         for name, stats in self.source.net_if_stats().items())
+        except Exception:
+            addresses, vpn_up = {}, False
+        with self._lock:
+            for result in results:
+                result["interface"] = addresses.get(result.pop("source", None))
+                loopback = result["address"].startswith('127.') or result["address"] == '::1'
+                result["leak"] = (vpn_up and not loopback and result["interface"] is not None
+                                  and not result["interface"].startswith(self.VPN_PREFIXES))
+                self.history[result["address"]].append(result["latency"])
+                result.update(self._stats(result["address"]))
+                self.results[result["address"]] = result
+            for address in set(self.results) - {result["address"] for result in results}:
+                del self.results[address]
+            self.probed = time.time()
+            return list(self.results.values())
+
+    def _stats(self, address):
+        samples = self.history[address]
+        latencies = [latency for latency in samples if latency is not None]
+        return {"p50": percentile(latencies, 50) if latencies else None,
+                "p95": percentile(latencies, 95) if latencies else None,
+                "failure_rate": (len(samples) - len(latencies)) / len(samples) if samples else None}
+
+    def summary(self):
+        with self._lock:
+            return list(self.results.values())
+
+
+class HardeningAudit:
+    """Kernel hardening checked against a baseline of sysctls, boot flags and modules.
+
+    The baseline sysctls are read through a SysfsReader, so on the live
+    host each /proc/sys file stays open and a re-audit is one pread per
+    setting. Files the kernel does not have are remembered and not tried
+    again. The findings are only rebuilt when a value read differs from
+    the last audit. report() renders them as stable sorted lines, meant to
+    be saved and diffed between hosts or days.
+    """
+
+    # (sysctl, comparison, wanted, weight)
+    SYSCTLS = [
+        ('kernel.randomize_va_space', '==', 2, 3),
+        ('kernel.kptr_restrict', '>=', 1, 3),
+        ('kernel.dmesg_restrict', '==', 1, 2),
+        ('kernel.unprivileged_bpf_disabled', '>=', 1, 3),
+        ('kernel.yama.ptrace_scope', '>=', 1, 2),
+        ('kernel.perf_event_paranoid', '>=', 2, 2),
+        ('kernel.kexec_load_disabled', '==', 1, 1),
+        ('kernel.sysrq', '==', 0, 1),
+        ('kernel.unprivileged_userns_clone', '==', 0, 1),
+        ('dev.tty.ldisc_autoload', '==', 0, 1),
+        ('vm.unprivileged_userfaultfd', '==', 0, 1),
+        ('fs.protected_hardlinks', '==', 1, 2),
+        ('fs.protected_symlinks', '==', 1, 2),
+        ('fs.protected_fifos', '>=', 1, 1),
+        ('fs.protected_regular', '>=', 1, 1),
+        ('fs.suid_dumpable', '==', 0, 2),
+        ('net.core.bpf_jit_harden', '==', 2, 1),
+        ('net.ipv4.tcp_syncookies', '==', 1, 1),
+        ('net.ipv4.conf.all.rp_filter', '>=', 1, 1),
+        ('net.ipv4.conf.all.accept_redirects', '==', 0, 1),
+        ('net.ipv4.conf.all.send_redirects', '==', 0, 1),
+        ('net.ipv4.conf.all.accept_source_route', '==', 0, 1),
+        ('net.ipv6.conf.all.accept_redirects', '==', 0, 1),
+    ]
+    # (boot parameter, accepted values or None for a bare flag, weight)
+    CMDLINE = [
+        ('init_on_alloc', ('1',), 1),
+        ('init_on_free', ('1',), 1),
+        ('slab_nomerge', None, 1),
+        ('page_alloc.shuffle', ('1',), 1),
+        ('randomize_kstack_offset', ('on', '1'), 1),
+        ('vsyscall', ('none',), 1),
+        ('debugfs', ('off',), 1),
+        ('lockdown', ('integrity', 'confidentiality'), 1),
+    ]
+    # Rarely needed protocols and filesystems with a history of exploitable bugs
+    MODULES = ('dccp', 'sctp', 'rds', 'tipc', 'n_hdlc', 'cramfs', 'freevxfs', 'jffs2', 'hfs', 'hfsplus',
+               'udf', 'firewire_core', 'bluetooth', 'usb_storage')
+    MODULE_WEIGHT = 1
+    OPS = {'==': lambda a, b: a == b, '>=': lambda a, b: a >= b}
+
+    def __init__(self, source):
+        self.source = source
+        self.sysfs = SysfsReader(source)
+        self.missing = set()
+        self.signature = None
+        self.findings = []
+        self.score = None
+        self.changed = []  # ids whose result differs from the audit before
+        self._lock = threading.Lock()
+
+    def read_values(self):
+        values = {}
+        for key, _, _, _ in self.SYSCTLS:
+            path = "/proc/sys/" + key.replace('.', '/')
+            if path in self.missing:
+                continue
+            value = self.sysfs.pread(path)
+            if value is None:
+                self.missing.add(path)
+            else:
+                values[key] = value
+        values['/proc/cmdline'] = self.sysfs.pread('/proc/cmdline') or ""
+        try:
+            with self.source.open('/proc/modules') as f:
+                values['/proc/modules'] = " ".join(line.split(' ', 1)[0] for line in f)
+        except OSError:
+            values['/proc/modules'] = None
+        return values
+
+    def build(self, values):
+        findings = []
+        for key, op, wanted, weight in self.SYSCTLS:
+            actual = values.get(key)
+            try:
+                passed = None if actual is None else self.OPS[op](int(actual), wanted)
+            except ValueError:
+                passed = False
+            findings.append({"id": key, "kind": "sysctl", "wanted": f"{op} {wanted}",
+                             "actual": actual if actual is not None else "absent", "passed": passed, "weight": weight})
+        flags = {}
+        for word in values['/proc/cmdline'].split():
+            name, _, value = word.partition('=')
+            flags[name] = value
+        for name, accepted, weight in self.CMDLINE:
+            actual = flags.get(name)
+            passed = actual is not None and (accepted is None or actual in accepted)
+            findings.append({"id": name, "kind": "cmdline", "wanted": " or ".join(accepted) if accepted else "set",
+                             "actual": ("set" if actual == "" else actual) if actual is not None else "unset",
+                             "passed": passed, "weight": weight})
+        loaded = set((values['/proc/modules'] or "").split())
+        for module in self.MODULES:
+            findings.append({"id": module, "kind": "module", "wanted": "not loaded",
+                             "actual": "loaded" if module in loaded else "not loaded",
+                             "passed": None if values['/proc/modules'] is None else module not in loaded,
+                             "weight": self.MODULE_WEIGHT})
+        return findings
+
+    def audit(self):
+        """The findings, rebuilt only when a value changed"""
+        with self._lock:
+            values = self.read_values()
+            signature = tuple(sorted(values.items(), key=lambda item: item[0]))
+            if signature != self.signature:
+                findings = self.build(values)
+                previous = {finding["id"]: finding["passed"] for finding in self.findings}
+                self.changed = [finding["id"] for finding in findings
+                                if finding["id"] in previous and previous[finding["id"]] != finding["passed"]]
+                counted = [finding for finding in findings if finding["passed"] is not None]
+                total = sum(finding["weight"] for finding in counted)
+                self.score = (sum(finding["weight"] for finding in counted if finding["passed"]) / total * 100
+                              if total else None)
+                self.findings = findings
+                self.signature = signature
+            return self.findings
+
+    def report(self):
+        """Stable plain text of the last audit, one finding per line"""
+        lines = [f"# kernel hardening score {self.score:.0f}/100" if self.score is not None
+                 else "# kernel hardening score N/A"]
+        for finding in sorted(self.findings, key=lambda finding: (finding["kind"], finding["id"])):
+            status = {True: "PASS", False: "FAIL", None: "SKIP"}[finding["passed"]]
+            lines.append(f"{status} {finding['kind']} {finding['id']} = {finding['actual']} "
+                         f"(want {finding['wanted']})")
+        return "\n".join(lines) + "\n"
+
+
+# Network info rows that move on their own and would drown real changes
+VOLATILE_NETWORK_FIELDS = ("Download", "Upload", "Packets", "Errors", "Drops", "Public IP")
+
+
+def _socket_key(conn):
+    family, kind = str(conn.family), str(conn.type)
+    proto = ("tcp" if kind.endswith('SOCK_STREAM') or conn.type == socket.SOCK_STREAM else "udp")
+    if family.endswith('AF_INET6') or conn.family == socket.AF_INET6:
+        proto += "6"
+    ip, port = conn.laddr[0], conn.laddr[1]
+    return f"{proto} [{ip}]:{port}" if ':' in ip else f"{proto} {ip}:{port}"
+
+
+def capture_snapshot(panel):
+    """The panel's view of the system as keyed sections of plain values.
+
+    Every section maps a stable key to a value, so two snapshots, taken
+    live or loaded from support reports, can be compared key by key.
+    """
+    snapshot = {"taken": datetime.datetime.now().isoformat(timespec='seconds')}
+    names = {}
+    processes = collections.Counter()
+    for proc in panel.source.process_iter(['pid', 'name', 'username']):
+        info = proc.info
+        name = names[info['pid']] = info.get('name') or "?"
+        # kernel workers rename themselves after whatever queue they serve
+        if name.startswith('kworker/'):
+            name = 'kworker'
+        processes[f"{name} ({info.get('username') or '?'})"] += 1
+    snapshot["processes"] = dict(processes)
+    listening = {}
+    try:
+        for conn in panel.source.net_connections(kind='inet'):
+            if conn.laddr and (conn.status == psutil.CONN_LISTEN or (not conn.raddr and 'DGRAM' in str(conn.type))):
+                listening[_socket_key(conn)] = names.get(conn.pid, "?") if conn.pid else "?"
+    except (psutil.AccessDenied, OSError) as e:
+        print(f"Error reading sockets: {e}")
+    snapshot["listening"] = listening
+    snapshot["services"] = {service["name"]: service["status"] for service in panel.get_system_services()}
+    snapshot["network"] = {key: str(value) for key, value in panel.get_network_info().items()
+                           if key not in VOLATILE_NETWORK_FIELDS}
+    try:
+        nameservers = panel.files.get('/etc/resolv.conf', parse_resolv_conf)["nameservers"]
+    except OSError:
+        nameservers = []
+    snapshot["dns"] = {address: "nameserver" for address in nameservers}
+    snapshot["security"] = {name: str(getattr(panel, f"check_{name}")()) for name in MetricSampler.SECURITY_CHECKS
+                            if name not in ('tor',)}
+    snapshot["sysctl"] = {f"{finding['kind']} {finding['id']}": finding["actual"]
+                          for finding in panel.hardening.audit()}
+    backend, chains, rules = panel.firewall.ruleset()
+    firewall = {f"chain {chain['family']} {chain['table']} {chain['name']}": f"policy {chain['policy']}"
+                for chain in chains if chain["hook"]}
+    for rule in rules:
+        key = f"rule {rule['family']} {rule['table']} {rule['chain']}: {rule['text']}"
+        firewall[key] = rule["verdict"] or ""
+    snapshot["firewall"] = firewall
+    return snapshot
+
+
+def diff_snapshots(old, new):
+    """{section: {added, removed, changed}} between two snapshots, empty sections left out"""
+    changes = {}
+    for section in new.keys() | old.keys():
+        before, after = old.get(section), new.get(section)
+        if not isinstance(before, dict) and not isinstance(after, dict):
+            continue
+        before, after = before or {}, after or {}
+        added = {key: after[key] for key in after.keys() - before.keys()}
+        removed = {key: before[key] for key in before.keys() - after.keys()}
+        changed = {key: (before[key], after[key]) for key in after.keys() & before.keys() if before[key] != after[key]}
+        if added or removed or changed:
+            changes[section] = {"added": added, "removed": removed, "changed": changed}
+    return changes
+
+
+def format_snapshot_diff(changes):
+    """Grouped text of a diff, sorted so it reads the same every time"""
+    lines = []
+    for section in sorted(changes):
+        lines.append(f"[{section}]")
+        group = changes[section]
+        lines += [f"+ {key}: {value}" for key, value in sorted(group["added"].items())]
+        lines += [f"- {key}: {value}" for key, value in sorted(group["removed"].items())]
+        lines += [f"~ {key}: {old} -> {new}" for key, (old, new) in sorted(group["changed"].items())]
+    return "\n".join(lines) + "\n" if lines else "No changes\n"
+
+
+def load_snapshot(path):
+    """The snapshot inside a support report, or a bare snapshot file"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt') as f:
+        data = json.load(f)
+    if "collectors" in data:
+        result = data["collectors"].get("snapshot") or {}
+        if result.get("status") != "ok":
+            raise ValueError(f"{path} has no snapshot")
+        return result["value"]
+    return data
+
+
+class SupportReport:
+    """Every collector run once, concurrently, written as gzipped JSON and static HTML.
+
+    Collectors run on daemon threads, at most `workers` at a time. A
+    collector that has not answered within `timeout` seconds is recorded
+    as timed out and its slot goes to the next one; the thread is left
+    behind and its late answer dropped. The report is therefore done
+    after about the slowest collector, capped by the timeout, and a hung
+    probe cannot hold it up or keep the process alive.
+    """
+
+    COLLECTORS = [
+        "get_system_info", "get_cpu_details", "get_ram_details", "get_gpu_details", "get_network_info",
+        "get_disk_info", "get_system_services", "get_top_processes",
+        "check_firewall", "get_firewall_rules", "check_vpn", "check_dns", "check_kernel_hardening",
+        "check_usb_protection", "check_ssh_status", "check_network_encryption", "check_dns_over_tls",
+        "check_updates", "check_antivirus", "check_selinux", "check_apparmor",
+    ]
+
+    def __init__(self, panel, workers=6, timeout=10.0):
+        self.panel = panel
+        self.workers = workers
+        self.timeout = timeout
+
+    def collectors(self):
+        panel = self.panel
+        collectors = [(name, getattr(panel, name)) for name in self.COLLECTORS]
+        collectors += [
+            ("hardening_audit", panel.hardening.audit),
+            ("package_updates", panel.updates.check),
+            # headless panels have not sampled these yet
+            ("dns_resolvers", lambda: panel.dns.summary() if panel.dns.probed else panel.dns.probe()),
+            ("sensors", lambda: panel.sensors.summary() or (panel.sensors.sample(), panel.sensors.summary())[1]),
+            ("snapshot", lambda: capture_snapshot(panel)),
+        ]
+        if getattr(panel, 'alerts', None) is not None:
+            collectors.append(("active_alerts", lambda: [
+                {"rule": rule, "metric": metric, "value": value, "since": since}
+                for (rule, metric), (value, since) in list(panel.alerts.active.items())]))
+        return collectors
+
+    def collect(self):
+        """{name: {status, seconds, value}} of every collector"""
+        results = {}
+        answers = queue.Queue()
+        pending = collections.deque(self.collectors())
+        order = [name for name, _ in pending]
+        running = {}  # name -> (deadline, started)
+
+        def run(name, func, started):
+            try:
+                answers.put((name, "ok", func(), time.monotonic() - started))
+            except Exception as e:
+                answers.put((name, "error", f"{type(e).__name__}: {e}", time.monotonic() - started))
+
+        while pending or running:
+            while pending and len(running) < self.workers:
+                name, func = pending.popleft()
+                started = time.monotonic()
+                running[name] = (started + self.timeout, started)
+                threading.Thread(target=run, args=(name, func, started), name=f"report-{name}", daemon=True).start()
+            now = time.monotonic()
+            try:
+                name, status, value, seconds = answers.get(timeout=max(0, min(d for d, _ in running.values()) - now))
+            except queue.Empty:
+                now = time.monotonic()
+                for name, (deadline, started) in list(running.items()):
+                    if deadline <= now:
+                        del running[name]
+                        results[name] = {"status": "timeout", "seconds": now - started, "value": None}
+                continue
+            if name in running:
+                del running[name]
+                results[name] = {"status": status, "seconds": seconds, "value": value}
+        return {name: results[name] for name in order}
+
+    def build(self):
+        started = time.monotonic()
+        results = self.collect()
+        return {
+            "panel_version": PANEL_VERSION,
+            "hostname": socket.gethostname(),
+            "generated": datetime.datetime.now().isoformat(timespec='seconds'),
+            "seconds": time.monotonic() - started,
+            "collectors": results,
+        }
+
+    @classmethod
+    def _html_value(cls, value):
+        if isinstance(value, dict):
+            rows = "".join(f"<tr><th>{html.escape(str(key))}</th><td>{cls._html_value(item)}</td></tr>"
+                           for key, item in value.items())
+            return f"<table>{rows}</table>"
+        if isinstance(value, (list, tuple)):
+            if value and all(isinstance(item, dict) for item in value):
+                keys = list(dict.fromkeys(key for item in value for key in item))
+                head = "".join(f"<th>{html.escape(str(key))}</th>" for key in keys)
+                body = "".join("<tr>" + "".join(f"<td>{html.escape(str(item.get(key, '')))}</td>" for key in keys)
+                               + "</tr>" for item in value)
+                return f"<table><tr>{head}</tr>{body}</table>"
+            return "<br>".join(html.escape(str(item)) for item in value)
+        return f"<pre>{html.escape(str(value))}</pre>" if isinstance(value, str) and "\n" in value \
+            else html.escape(str(value))
+
+    @classmethod
+    def render_html(cls, report):
+        sections = []
+        for name, result in report["collectors"].items():
+            status = result["status"]
+            sections.append(f"<h2>{html.escape(name)} <small class=\"{status}\">{status}, "
+                            f"{result['seconds'] * 1000:.0f} ms</small></h2>{cls._html_value(result['value'])}")
+        title = f"Securonis panel report: {report['hostname']} {report['generated']}"
+        return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+                f"<title>{html.escape(title)}</title><style>"
+                "body{background:#000;color:#0f0;font-family:monospace;margin:2em}"
+                "table{border-collapse:collapse;margin:.5em 0}th,td{border:1px solid #064;padding:2px 8px;"
+                "text-align:left;vertical-align:top}.error,.timeout{color:#f00}.ok{color:#0a0}"
+                f"</style></head><body><h1>{html.escape(title)}</h1>"
+                f"<p>Panel {html.escape(report['panel_version'])}, collected in {report['seconds']:.2f} s</p>"
+                + "\n".join(sections) + "</body></html>\n")
+
+    def write(self, directory):
+        """Build the report and write it, returning the JSON and HTML paths"""
+        report = self.build()
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(directory, f"securonis-report-{report['hostname']}-{stamp}")
+        with gzip.open(f"{base}.json.gz", 'wt') as f:
+            json.dump(report, f, indent=1, default=str)
+        with open(f"{base}.html", 'w') as f:
+            f.write(self.render_html(report))
+        return f"{base}.json.gz", f"{base}.html"
+
+
+class MetricHistory:
+    """Hours to days of a few sampled metrics, summarised for charts.
+
+    Samples go into flat arrays per metric. Charts ask for one (min, max)
+    per pixel column through columns(). Those come from a pyramid of tiles:
+    level 0 buckets are BASE_SECONDS wide and every level above doubles
+    the width. A tile holds TILE buckets and is built from the two tiles
+    below it, or from the samples at level 0. Finished tiles are cached,
+    so drawing a window of any length touches about one screen width of
+    buckets. Min/max is used rather than LTTB because it combines exactly
+    across tiles and never hides a spike. NumPy does the reductions when it
+    is installed.
+    """
+
+    BASE_SECONDS = 2.0
+    TILE = 256
+
+    def __init__(self, metrics=('cpu.percent', 'mem.percent', 'disk./.percent'), max_points=86400, max_tiles=2048):
+        self.metrics = metrics
+        self.max_points = max_points
+        self.max_tiles = max_tiles
+        self.series = {metric: (array.array('d'), array.array('f')) for metric in metrics}  # times, values
+        self._tiles = collections.OrderedDict()  # (metric, level, index) -> (mins, maxs), finished tiles only
+        self._lock = threading.Lock()
+
+    def on_sample(self, snapshot, changed, seq):
+        now = time.time()
+        for metric in self.metrics:
+            if metric in snapshot:
+                self.append(metric, now, snapshot[metric])
+
+    def append(self, metric, timestamp, value):
+        with self._lock:
+            times, values = self.series[metric]
+            if times and timestamp <= times[-1]:
+                return
+            times.append(timestamp)
+            values.append(value)
+            if len(times) > self.max_points:
+                # drop the oldest quarter at once rather than one sample per append
+                cut = self.max_points // 4
+                del times[:cut]
+                del values[:cut]
+
+    def span(self, metric):
+        """(first, last) sample time, or None while empty"""
+        with self._lock:
+            times = self.series[metric][0]
+            return (times[0], times[-1]) if times else None
+
+    def width(self, level):
+        return self.BASE_SECONDS * (1 << level)
+
+    def _base_tile(self, metric, index):
+        """Level 0 tile straight from the samples"""
+        times, values = self.series[metric]
+        width = self.BASE_SECONDS
+        start = index * self.TILE * width
+        lo = bisect.bisect_left(times, start)
+        hi = bisect.bisect_left(times, start + self.TILE * width, lo)
+        if numpy is not None:
+            mins = numpy.full(self.TILE, numpy.nan)
+            maxs = numpy.full(self.TILE, numpy.nan)
+            if hi > lo:
+                t = numpy.frombuffer(times, dtype=numpy.float64)[lo:hi]
+                v = numpy.frombuffer(values, dtype=numpy.float32)[lo:hi].astype(numpy.float64)
+                buckets = ((t - start) // width).astype(numpy.int64)
+                starts = numpy.flatnonzero(numpy.r_[True, buckets[1:] != buckets[:-1]])
+                mins[buckets[starts]] = numpy.minimum.reduceat(v, starts)
+                maxs[buckets[starts]] = numpy.maximum.reduceat(v, starts)
+            return mins, maxs
+        mins = [math.nan] * self.TILE
+        maxs = [math.nan] * self.TILE
+        for i in range(lo, hi):
+            bucket = int((times[i] - start) // width)
+            value = values[i]
+            if math.isnan(mins[bucket]) or value < mins[bucket]:
+                mins[bucket] = value
+            if math.isnan(maxs[bucket]) or value > maxs[bucket]:
+                maxs[bucket] = value
+        return mins, maxs
+
+    def _merge(self, low, high):
+        """Halve two neighbouring tiles into one of the next level"""
+        if numpy is not None:
+            mins = numpy.concatenate((low[0], high[0]))
+            maxs = numpy.concatenate((low[1], high[1]))
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                return numpy.fmin(mins[0::2], mins[1::2]), numpy.fmax(maxs[0::2], maxs[1::2])
+        mins = list(low[0]) + list(high[0])
+        maxs = list(low[1]) + list(high[1])
+        pair = lambda a, b, pick: b if math.isnan(a) else a if math.isnan(b) else pick(a, b)
+        return ([pair(mins[i], mins[i + 1], min) for i in range(0, len(mins), 2)],
+                [pair(maxs[i], maxs[i + 1], max) for i in range(0, len(maxs), 2)])
+
+    def tile(self, metric, level, index):
+        key = (metric, level, index)
+        cached = self._tiles.get(key)
+        if cached is not None:
+            self._tiles.move_to_end(key)
+            return cached
+        if level == 0:
+            result = self._base_tile(metric, index)
+        else:
+            result = self._merge(self.tile(metric, level - 1, 2 * index), self.tile(metric, level - 1, 2 * index + 1))
+        times = self.series[metric][0]
+        # a tile that ends before the newest sample cannot change any more
+        if times and (index + 1) * self.TILE * self.width(level) <= times[-1]:
+            self._tiles[key] = result
+            if len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return result
+
+    def columns(self, metric, start, end, width):
+        """(min, max) per pixel column for the window [start, end), NaN where there is no data"""
+        width = max(1, int(width))
+        per_pixel = (end - start) / width
+        level = max(0, int(math.floor(math.log2(max(per_pixel / self.BASE_SECONDS, 1)))))
+        bucket = self.width(level)
+        first = int(start // bucket)
+        last = int(math.ceil(end / bucket))
+        with self._lock:
+            parts = [self.tile(metric, level, index)
+                     for index in range(first // self.TILE, (last - 1) // self.TILE + 1)]
+        offset = first - (first // self.TILE) * self.TILE
+        count = last - first
+        if numpy is not None:
+            mins = numpy.concatenate([part[0] for part in parts])[offset:offset + count]
+            maxs = numpy.concatenate([part[1] for part in parts])[offset:offset + count]
+            # every column gets at least one bucket, so reduceat sees no empty runs
+            cols = ((numpy.arange(first, last) * bucket - start) / per_pixel).astype(numpy.int64).clip(0, width - 1)
+            starts = numpy.flatnonzero(numpy.r_[True, cols[1:] != cols[:-1]])
+            out_min = numpy.full(width, numpy.nan)
+            out_max = numpy.full(width, numpy.nan)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                out_min[cols[starts]] = numpy.fmin.reduceat(mins, starts)
+                out_max[cols[starts]] = numpy.fmax.reduceat(maxs, starts)
+            return list(zip(out_min.tolist(), out_max.tolist()))
+        mins = [value for part in parts for value in part[0]][offset:offset + count]
+        maxs = [value for part in parts for value in part[1]][offset:offset + count]
+        out = [[math.nan, math.nan] for _ in range(width)]
+        for i in range(count):
+            col = min(width - 1, max(0, int(((first + i) * bucket - start) / per_pixel)))
+            low, high = mins[i], maxs[i]
+            if not math.isnan(low) and (math.isnan(out[col][0]) or low < out[col][0]):
+                out[col][0] = low
+            if not math.isnan(high) and (math.isnan(out[col][1]) or high > out[col][1]):
+                out[col][1] = high
+        return [tuple(column) for column in out]
+
+
+class HistoryChart:
+    """Canvas chart of one MetricHistory metric with drag to pan and wheel to zoom.
+
+    The window follows the newest sample until it is dragged back in time.
+    Drawing costs one column per pixel however much history there is.
+    """
+
+    MIN_SPAN = 60
+    MAX_SPAN = 7 * 24 * 3600
+
+    def __init__(self, parent, history, metric, height=100, span=600, maximum=100.0):
+        self.history = history
+        self.metric = metric
+        self.height = height
+        self.span = span
+        self.maximum = maximum
+        self.end = None  # None follows the newest sample
+        self._drag = None
+        self.canvas = tk.Canvas(parent, height=height, bg="#121212", highlightthickness=0, cursor="fleur")
+        self.canvas.bind("<ButtonPress-1>", self._on_press)
+        self.canvas.bind("<B1-Motion>", self._on_drag)
+        self.canvas.bind("<Double-Button-1>", lambda e: self.follow())
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(0.8, e.x))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(1.25, e.x))
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(0.8 if e.delta > 0 else 1.25, e.x))
+        self.canvas.bind("<Configure>", lambda e: self.draw())
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def window(self):
+        end = self.end
+        if end is None:
+            span = self.history.span(self.metric)
+            end = span[1] if span else time.time()
+        return end - self.span, end
+
+    def follow(self):
+        self.end = None
+        self.draw()
+
+    def zoom(self, factor, x):
+        width = max(1, self.canvas.winfo_width())
+        start, end = self.window()
+        anchor = start + (end - start) * x / width
+        self.span = min(self.MAX_SPAN, max(self.MIN_SPAN, self.span * factor))
+        if self.end is not None:
+            self.end = anchor + (end - anchor) * self.span / (end - start)
+        self.draw()
+
+    def _on_press(self, event):
+        self._drag = (event.x, self.window()[1])
+
+    def _on_drag(self, event):
+        if self._drag is None:
+            return
+        x, end = self._drag
+        width = max(1, self.canvas.winfo_width())
+        self.end = end - (event.x - x) * self.span / width
+        span = self.history.span(self.metric)
+        if span and self.end >= span[1]:
+            self.end = None
+        self.draw()
+
+    @staticmethod
+    def format_span(seconds):
+        if seconds >= 86400:
+            return f"{seconds / 86400:.1f}d"
+        if seconds >= 3600:
+            return f"{seconds / 3600:.1f}h"
+        return f"{seconds / 60:.0f}m"
+
+    def draw(self):
+        canvas = self.canvas
+        if not canvas.winfo_exists():
+            return
+        width = canvas.winfo_width()
+        if width <= 1:
+            return
+        start, end = self.window()
+        columns = self.history.columns(self.metric, start, end, width)
+        canvas.delete("all")
+        scale = (self.height - 2) / self.maximum
+        line = []
+        for x, (low, high) in enumerate(columns):
+            if math.isnan(low):
+                continue
+            top = self.height - 1 - high * scale
+            bottom = self.height - 1 - low * scale
+            # the min to max range of the column, then a line through the middles
+            if bottom - top >= 1:
+                canvas.create_line(x, top, x, bottom + 1, fill="#006400")
+            line.extend((x, (top + bottom) / 2))
+        if len(line) >= 4:
+            canvas.create_line(*line, fill="#00ff00")
+        label = f"last {self.format_span(self.span)}" if self.end is None else \
+            f"{self.format_span(self.span)} to {datetime.datetime.fromtimestamp(end).strftime('%m-%d %H:%M')}"
+        canvas.create_text(width - 5, 5, text=label, anchor="ne", fill="#00ff00")
+
+
+class FleetHost:
+    __slots__ = ('endpoint', 'name', 'metrics', 'seq', 'status', 'last_seen')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.name = endpoint
+        self.metrics = {}
+        self.seq = 0
+        self.status = "Connecting"
+        self.last_seen = None
+
+
+class FleetClient:
+    """Keeps one persistent connection per collector on a single selector thread.
+
+    Incoming deltas are applied to FleetHost.metrics and the endpoint is added
+    to a dirty set, which the GUI drains with take_dirty() so a refresh only
+    touches hosts that actually changed. Lost connections are retried with
+    exponential backoff, a silent peer is considered lost after TIMEOUT.
+    """
+
+    TIMEOUT = 30
+    MAX_BACKOFF = 30
+
+    def __init__(self, endpoints):
+        self.hosts = {endpoint: FleetHost(endpoint) for endpoint in endpoints}
+        self._selector = selectors.DefaultSelector()
+        self._conns = {}  # endpoint -> (socket, buffer)
+        self._retry = {endpoint: (0.0, 1.0) for endpoint in endpoints}  # endpoint -> (next attempt, backoff)
+        self._dirty = set(endpoints)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    @staticmethod
+    def parse_endpoint(endpoint):
+        host, _, port = endpoint.rpartition(':')
+        return host.strip('[]') or '127.0.0.1', int(port)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='fleet-client', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+
+    def take_dirty(self):
+        """Endpoints whose host changed since the last call"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def _set_status(self, endpoint, status):
+        with self._lock:
+            self.hosts[endpoint].status = status
+            self._dirty.add(endpoint)
+
+    def _connect(self, endpoint):
+        try:
+            address = self.parse_endpoint(endpoint)
+            info = socket.getaddrinfo(*address, type=socket.SOCK_STREAM)[0]
+            sock = socket.socket(info[0], info[1], info[2])
+            sock.setblocking(False)
+            sock.connect_ex(info[4])
+        except (OSError, ValueError) as e:
+            self._fail(endpoint, f"Error: {e}")
+            return
+        self._conns[endpoint] = (sock, bytearray())
+        self._selector.register(sock, selectors.EVENT_READ | selectors.EVENT_WRITE, (endpoint, 'connect'))
+        self._retry[endpoint] = (None, self._retry[endpoint][1])
+
+    def _fail(self, endpoint, status):
+        conn = self._conns.pop(endpoint, None)
+        if conn is not None:
+            try:
+                self._selector.unregister(conn[0])
+            except (KeyError, ValueError):
+                pass
+            conn[0].close()
+        backoff = self._retry[endpoint][1]
+        self._retry[endpoint] = (time.monotonic() + backoff, min(self.MAX_BACKOFF, backoff * 2))
+        self._set_status(endpoint, status)
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            for endpoint, (next_attempt, _) in list(self._retry.items()):
+                if next_attempt is not None and next_attempt <= now:
+                    self._connect(endpoint)
+            for key, events in self._selector.select(timeout=1.0):
+                endpoint, state = key.data
+                sock = key.fileobj
+                if state == 'connect':
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if error:
+                        self._fail(endpoint, f"Error: {os.strerror(error)}")
+                        continue
+                    self._selector.modify(sock, selectors.EVENT_READ, (endpoint, 'read'))
+                    with self._lock:
+                        self.hosts[endpoint].last_seen = now
+                    self._set_status(endpoint, "Connected")
+                    continue
+                self._read(endpoint, sock)
+            now = time.monotonic()
+            for endpoint in list(self._conns):
+                last_seen = self.hosts[endpoint].last_seen
+                if last_seen is not None and now - last_seen > self.TIMEOUT:
+                    self._fail(endpoint, "Timed out")
+        for endpoint in list(self._conns):
+            self._fail(endpoint, "Stopped")
+        self._selector.close()
+
+    def _read(self, endpoint, sock):
+        try:
+            data = sock.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self._fail(endpoint, f"Error: {e}")
+            return
+        if not data:
+            self._fail(endpoint, "Disconnected")
+            return
+        buffer = self._conns[endpoint][1]
+        buffer.extend(data)
+        *lines, rest = buffer.split(b"\n")
+        del buffer[:len(buffer) - len(rest)]
+        host = self.hosts[endpoint]
+        with self._lock:
+            host.last_seen = time.monotonic()
+            for line in lines:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                kind = message.get("type")
+                if kind == "hello":
+                    host.name = message.get("host", endpoint)
+                elif kind == "full":
+                    host.metrics = message["metrics"]
+                    host.seq = message["seq"]
+                elif kind == "delta" and message["seq"] > host.seq:
+                    host.metrics.update(message["set"])
+                    for name in message["del"]:
+                        host.metrics.pop(name, None)
+                    host.seq = message["seq"]
+                else:
+                    continue
+                self._dirty.add(endpoint)
+        self._retry[endpoint] = (None, 1.0)
+
+
+def desktop_notify(alert):
+    """Show an alert with notify-send when it is installed"""
+    if shutil.which('notify-send'):
+        subprocess.Popen(['notify-send', '-u', 'critical', 'Securonis Panel',
+                          f"{alert['rule']}: {alert['metric']} = {alert['value']:g}"],
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _callable_name(func):
+    """Readable name for a callback, e.g. show_processes.update_processes"""
+    func = getattr(func, '__func__', func)
+    name = getattr(func, '__qualname__', None) or repr(func)
+    return name.replace('.<locals>', '').replace('LinuxSystemPanel.', '')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile, 0.0 for no values"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class PanelInstrumentation:
+    """Timing of Tk callbacks, getters and worker tasks plus the panel's own footprint"""
+
+    HEARTBEAT_MS = 250
+    FOOTPRINT_MS = 2000
+
+    def __init__(self, slow_threshold_ms=100, samples=240):
+        self.slow_threshold_ms = slow_threshold_ms
+        self._samples = samples
+        self._stats = {}  # (kind, name) -> [count, total ms, max ms, recent ms]
+        self._lock = threading.Lock()
+        self.slow_log = collections.deque(maxlen=50)
+        self.loop_lag = collections.deque(maxlen=samples)
+        self.footprint = collections.deque(maxlen=samples)  # (time, cpu %, rss, threads)
+        self._process = PANEL_PROCESS
+
+    def timed(self, kind, name, func):
+        """Wrap func so every call is timed under name"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(kind, name, (time.perf_counter() - start) * 1000)
+        return wrapper
+
+    def record(self, kind, name, ms):
+        with self._lock:
+            stat = self._stats.get((kind, name))
+            if stat is None:
+                stat = self._stats[(kind, name)] = [0, 0.0, 0.0, collections.deque(maxlen=self._samples)]
+            stat[0] += 1
+            stat[1] += ms
+            stat[2] = max(stat[2], ms)
+            stat[3].append(ms)
+        if ms > self.slow_threshold_ms:
+            self.slow_log.append((time.time(), kind, name, ms))
+            print(f"Slow {kind}: {name} took {ms:.1f} ms")
+
+    def wrap_getters(self, panel):
+        """Time every get_* and check_* method of a panel instance"""
+        for name in dir(type(panel)):
+            if not name.startswith(('get_', 'check_')) or name == 'get_cached_data':
+                continue
+            method = getattr(panel, name)
+            if callable(method):
+                setattr(panel, name, self.timed("getter", name, method))
+
+    def start(self, scheduler):
+        """Start the event loop heartbeat and footprint sampling.
+
+        The scheduler measures loop lag every time its pump fires, the
+        heartbeat job only guarantees it fires often enough.
+        """
+        self._process.cpu_percent(None)
+        scheduler.add('heartbeat', self.HEARTBEAT_MS, lambda: None, adaptive=False)
+        scheduler.add('footprint', self.FOOTPRINT_MS, self.sample_footprint, adaptive=False)
+
+    def record_lag(self, ms):
+        self.loop_lag.append(ms)
+
+    def sample_footprint(self):
+        try:
+            with self._process.oneshot():
+                self.footprint.append((time.time(),
+                                       self._process.cpu_percent(None),
+                                       self._process.memory_info().rss,
+                                       self._process.num_threads()))
+        except psutil.Error as e:
+            print(f"Error sampling panel footprint: {e}")
+
+    def panel_cpu(self):
+        """Latest CPU% of the panel process, None before the first sample"""
+        return self.footprint[-1][1] if self.footprint else None
+
+    def summary(self, limit=15):
+        """Slowest callbacks, getters and tasks by total time"""
+        with self._lock:
+            rows = [(kind, name, stat[0], stat[1], stat[2], percentile(stat[3], 95))
+                    for (kind, name), stat in self._stats.items()]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows[:limit]
+
+    def report(self):
+        lines = []
+        if self.footprint:
+            _, cpu, rss, threads = self.footprint[-1]
+            lines.append(f"Panel CPU: {cpu:.1f}%  RSS: {rss/1024/1024:.1f} MB  Threads: {threads}")
+        if self.loop_lag:
+            lines.append(f"Event loop lag: last {self.loop_lag[-1]:.1f} ms, "
+                         f"p95 {percentile(self.loop_lag, 95):.1f} ms, max {max(self.loop_lag):.1f} ms")
+        lines.append("")
+        lines.append(f"{'kind':<10}{'name':<48}{'calls':>7}{'total ms':>11}{'p95 ms':>9}{'max ms':>9}")
+        for kind, name, count, total, worst, p95 in self.summary():
+            lines.append(f"{kind:<10}{name[:47]:<48}{count:>7}{total:>11.1f}{p95:>9.1f}{worst:>9.1f}")
+        if self.slow_log:
+            lines.append("")
+            lines.append(f"Slow calls (> {self.slow_threshold_ms} ms):")
+            for when, kind, name, ms in list(self.slow_log)[-15:]:
+                stamp = datetime.datetime.fromtimestamp(when).strftime("%H:%M:%S")
+                lines.append(f"  {stamp} {kind} {name}: {ms:.1f} ms")
+        return "\n".join(lines)
+
+
+class RefreshScheduler:
+    """Owns every periodic job of the panel.
+
+    A single Tk timer fires when the next job is due. Intervals stretch while
+    the window is unfocused or the panel uses more CPU than its budget, and
+    only background jobs run while the window is unmapped. Jobs tied to a tab
+    are dropped when another tab is shown, since their widgets are gone.
+    """
+
+    UNFOCUSED_FACTOR = 3
+    MAX_STRETCH = 8.0
+
+    class Job:
+        __slots__ = ('name', 'interval_ms', 'func', 'tab', 'adaptive', 'background', 'next_run')
+
+        def __init__(self, name, interval_ms, func, tab, adaptive, background, next_run):
+            self.name = name
+            self.interval_ms = interval_ms
+            self.func = func
+            self.tab = tab
+            self.adaptive = adaptive
+            self.background = background
+            self.next_run = next_run
+
+    def __init__(self, root, instrumentation, cpu_budget=1.0):
+        self.root = root
+        self.instrumentation = instrumentation
+        self.cpu_budget = cpu_budget
+        self.stretch = 1.0
+        self._stretch_sample = None  # time of the footprint sample the stretch last used
+        self.visible = True
+        self.focused = True
+        self.current_tab = None
+        self._jobs = {}
+        self._after_id = None
+        self._due = None
+
+        root.bind("<Map>", self._on_map, add="+")
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<FocusIn>", self._on_focus_change, add="+")
+        root.bind("<FocusOut>", self._on_focus_change, add="+")
+
+    def add(self, name, interval_ms, func, tab=None, adaptive=True, background=False, run_now=False):
+        """Register or replace a periodic job, background jobs keep running while unmapped"""
+        delay = 0 if run_now else interval_ms / 1000
+        self._jobs[name] = self.Job(name, interval_ms, func, tab, adaptive, background, time.monotonic() + delay)
+        self._schedule()
+
+    def remove(self, name):
+        self._jobs.pop(name, None)
+
+    def set_interval(self, name, interval_ms):
+        """Change the base interval of a job, taking effect from its next run"""
+        job = self._jobs.get(name)
+        if job is not None:
+            job.interval_ms = interval_ms
+
+    def set_tab(self, index):
+        """Drop the jobs of tabs that are no longer shown"""
+        self.current_tab = index
+        for name, job in list(self._jobs.items()):
+            if job.tab is not None and job.tab != index:
+                del self._jobs[name]
+
+    def interval(self, job):
+        """Effective interval of a job in milliseconds"""
+        if not job.adaptive:
+            return job.interval_ms
+        factor = self.stretch
+        if not self.focused:
+            factor *= self.UNFOCUSED_FACTOR
+        return job.interval_ms * factor
+
+    def _on_map(self, event):
+        if event.widget is self.root and not self.visible:
+            self.visible = True
+            now = time.monotonic()
+            for job in self._jobs.values():
+                job.next_run = min(job.next_run, now)
+            self._schedule()
+
+    def _on_unmap(self, event):
+        if event.widget is self.root:
+            self.visible = False
+            self._schedule()
+
+    def _on_focus_change(self, event):
+        # Focus moves between child widgets too, ask Tk where it ended up
+        try:
+            self.focused = self.root.focus_displayof() is not None
+        except (KeyError, tk.TclError):
+            self.focused = False
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        self._cancel()
+        jobs = [job for job in self._jobs.values() if self.visible or job.background]
+        if not jobs:
+            return
+        self._due = min(job.next_run for job in jobs)
+        delay = max(0, int((self._due - time.monotonic()) * 1000))
+        self._after_id = self.root.after(delay, self._run_due)
+
+    def _run_due(self):
+        self._after_id = None
+        now = time.monotonic()
+        self.instrumentation.record_lag(max(0.0, (now - self._due) * 1000))
+        for job in list(self._jobs.values()):
+            if job.next_run > now or self._jobs.get(job.name) is not job:
+                continue
+            if not (self.visible or job.background):
+                continue
+            start = time.perf_counter()
+            try:
+                job.func()
+            except Exception as e:
+                print(f"Error in job {job.name}: {e}")
+            self.instrumentation.record("job", job.name, (time.perf_counter() - start) * 1000)
+            job.next_run = time.monotonic() + self.interval(job) / 1000
+        self._update_stretch()
+        self._schedule()
+
+    def _update_stretch(self):
+        """Back off while the panel is over its CPU budget, recover slowly below it.
+
+        The pump fires far more often than the footprint is sampled, so the
+        stretch moves once per new sample rather than once per pump.
+        """
+        footprint = self.instrumentation.footprint
+        if not footprint or footprint[-1][0] == self._stretch_sample:
+            return
+        self._stretch_sample, cpu = footprint[-1][0], footprint[-1][1]
+        if cpu > self.cpu_budget:
+            self.stretch = min(self.MAX_STRETCH, self.stretch * 1.5)
+        elif cpu < self.cpu_budget / 2:
+            self.stretch = max(1.0, self.stretch / 1.25)
+
+
+class UIDispatcher:
+    """Applies worker results on the Tk thread.
+
+    Workers post (key, func, args) on the update queue from any thread. A
+    single scheduler job drains it, keeps only the latest update per key and
+    applies as many as fit in the frame budget. The rest carry over to the
+    next frame so a burst of results cannot starve input handling.
+    """
+
+    FRAME_MS = 16
+    IDLE_MS = 100
+    BUDGET_MS = 8
+
+    def __init__(self, update_queue, scheduler, instrumentation):
+        self.queue = update_queue
+        self.scheduler = scheduler
+        self.instrumentation = instrumentation
+        self._pending = collections.OrderedDict()
+        self._unkeyed = 0
+        scheduler.add('ui_updates', self.IDLE_MS, self.pump, adaptive=False)
+
+    def post(self, key, func, *args):
+        """Queue func(*args) for the Tk thread, replacing any pending update with the same key"""
+        self.queue.put((key, func, args))
+
+    def pump(self):
+        while True:
+            try:
+                key, func, args = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                self._unkeyed += 1
+                key = ('unkeyed', self._unkeyed)
+            # the latest update wins but keeps its place in line
+            self._pending[key] = (func, args)
+
+        deadline = time.perf_counter() + self.BUDGET_MS / 1000
+        while self._pending and time.perf_counter() < deadline:
+            key, (func, args) = self._pending.popitem(last=False)
+            start = time.perf_counter()
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Error applying update {key}: {e}")
+            self.instrumentation.record("update", str(key), (time.perf_counter() - start) * 1000)
+
+        self.scheduler.set_interval('ui_updates', self.FRAME_MS if self._pending else self.IDLE_MS)
 
 
 class LinuxSystemPanel:
-    def __init__(self, root):
+    # Cached getters that depend on a watched file, invalidated when it changes
+    FILE_GETTERS = {
+        '/etc/resolv.conf': ('check_dns', 'get_dns_servers', 'get_network_info'),
+        '/etc/os-release': ('get_os_info', 'get_system_info'),
+        '/etc/systemd/resolved.conf': ('check_dns_over_tls',),
+        '/proc/net/route': ('get_default_gateway', 'get_network_info'),
+        '/sys/class/net': ('check_vpn', 'get_vpn_status', 'get_interface_status',
+                           'get_active_interface', 'get_network_info'),
+    }
+
+    # Fleet grid columns: (id, heading, width)
+    FLEET_COLUMNS = [
+        ('host', "Host", 180),
+        ('status', "Status", 110),
+        ('cpu', "CPU", 70),
+        ('ram', "RAM", 70),
+        ('disk', "Disk", 70),
+        ('vpn', "VPN", 70),
+        ('tor', "Tor", 70),
+    ]
+
+    # Process list columns: (id, heading, width)
+    PROCESS_COLUMNS = [
+        ('pid', "PID", 70),
+        ('name', "Process Name", 260),
+        ('cpu', "CPU %", 80),
+        ('memory', "Memory %", 80),
+        ('status', "Status", 90),
+    ]
+    
+    # Detail pane rows: (field, title)
+    PROCESS_DETAIL_FIELDS = [
+        ('cmdline', "Command Line"),
+        ('environment', "Environment"),
+        ('cgroup', "Cgroup"),
+        ('threads', "Threads"),
+        ('fds', "File Descriptors"),
+        ('memory', "Memory"),
+        ('io', "Disk IO"),
+    ]
+
+    # cgroup tree columns: (id, heading, width)
+    CGROUP_COLUMNS = [
+        ('kind', "Type", 80),
+        ('cpu', "CPU", 70),
+        ('memory', "Memory", 90),
+        ('pressure', "Mem PSI", 70),
+        ('io_read', "Read", 90),
+        ('io_write', "Write", 90),
+    ]
+
+    def __init__(self, root, source=None, slow_threshold_ms=100, cpu_budget=1.0, metrics_port=None,
+                 metrics_address='127.0.0.1', fleet=None):
         self.root = root
-        self.root.title("Secuonis Linux System Control Panel v1.8")
+        self.root.title(f"Secuonis Linux System Control Panel v{PANEL_VERSION}")
         self.root.geometry("1200x750")
         self.root.configure(bg="#000000")
         
-        # Cache for system information
-        self._cache = {}
-        self._cache_timeout = {}
+        self._init_state(source)
         
-        # Thread pool with limited workers
-        self.executor = ThreadPoolExecutor(max_workers=2)
-        self.update_queue = queue.Queue()
+        # Self instrumentation, shown on the hidden diagnostics tab (Ctrl+Shift+D)
+        self.instrumentation.slow_threshold_ms = slow_threshold_ms
+        self.instrumentation.wrap_getters(self)
         
-        # Update intervals (in milliseconds)
-        self.UPDATE_INTERVALS = {
-            'cpu_ram': 2000,    # CPU/RAM update every 2 seconds
-            'processes': 3000,   # Process list update every 3 seconds
-            'disk': 10000,      # Disk info update every 10 seconds
-            'network': 5000     # Network info update every 5 seconds
-        }
+        # Every periodic job runs on the scheduler
+        self.scheduler = RefreshScheduler(self.root, self.instrumentation, cpu_budget)
+        self.instrumentation.start(self.scheduler)
+        
+        # Worker results reach Tk widgets only through the dispatcher
+        self.dispatcher = UIDispatcher(self.update_queue, self.scheduler, self.instrumentation)
+        
+        # Alert rules run on every metric sample
+        self.alerts = AlertEngine(AlertEngine.load_rules(os.path.join(CONFIG_DIR, 'alerts.json')),
+                                  notify=desktop_notify,
+                                  log_path=os.path.join(STATE_DIR, 'alerts.log'))
+        self._sampling = False
+        
+        # Optional OpenMetrics endpoint serving the sampler snapshot
+        self.exporter = None
+        if metrics_port:
+            self.exporter = MetricsExporter(self.sampler, metrics_address, metrics_port)
+            self.exporter.start()
+        
+        # Fleet mode, remote collectors stream their snapshots to this panel
+        self.fleet = None
+        self.fleet_sort = ('host', False)
+        if fleet:
+            self.fleet = FleetClient(fleet)
+            self.fleet.start()
+        
+        # Config files are re-parsed on change, views update without waiting for a timer
+        self.files.start()
+        if not self.files.event_driven:
+            self.scheduler.add('file_poll', 2000, lambda: self.submit(self.files.poll))
+        self.root.bind_all("<Control-D>", lambda e: self.switch_tab(10))
         
         # Font settings
         self.title_font = font.Font(family="Ubuntu", size=12, weight="bold")
@@ -62,6 +4310,19 @@ class LinuxSystemPanel:
                                         {'expand': '1', 'sticky': 'nswe'})],
                             'sticky': 'ns'})])
         
+        self.style.configure("Treeview",
+                           background="#000000",
+                           fieldbackground="#000000",
+                           foreground="#00ff00",
+                           borderwidth=0)
+        self.style.configure("Treeview.Heading",
+                           background="#121212",
+                           foreground="#00ff00",
+                           relief="flat")
+        self.style.map("Treeview",
+                      background=[('selected', '#006400')],
+                      foreground=[('selected', '#ffffff')])
+        
         self.style.configure("Vertical.TScrollbar",
                            background="#006400",
                            darkcolor="#006400",
@@ -116,14 +4377,23 @@ class LinuxSystemPanel:
             ("Processes", 5),
             ("Services", 6),
             ("Power Info", 7),
+            ("Changes", 12),
             ("Securonis", 8),
             ("About", 9)
         ]
+        if self.fleet:
+            self.menu_items.append(("Fleet", 11))
 
         
         for text, index in self.menu_items:
             self.create_menu_button(text, index)
         
+        self.report_button = ttk.Button(self.sidebar,
+                                        text="Export Report",
+                                        style="Custom.TButton",
+                                        command=self.export_report)
+        self.report_button.pack(fill="x", pady=(20, 3))
+        
         # Create main scrollable area
         self.main_container = tk.Frame(root, bg="#000000")
         self.main_container.grid(row=0, column=1, sticky="nswe")
@@ -159,18 +4429,159 @@ class LinuxSystemPanel:
         # CPU ram graphs
         self.create_usage_graphs()
         
-        # show system info first 
-        self.show_system_info()
+        # show system info first, or the fleet grid in fleet mode
+        if self.fleet:
+            self.switch_tab(11)
+        else:
+            self.show_system_info()
         
         # updates
         self.start_periodic_updates()
         
         # signal
         signal.signal(signal.SIGINT, self.handle_signal)
+        self._diagnostics_requested = False
+        signal.signal(signal.SIGUSR1, self.request_diagnostics)
         
         # window
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def _init_state(self, source=None):
+        """State shared by the GUI and headless panels"""
+        self.source = source or DataSource()
+        self.files = FileWatcher(self.source)
+        self.files.add_listener(self._on_file_changed)
+        self.file_listeners = {}
+        self.instrumentation = PanelInstrumentation()
+        self.sampler = MetricSampler(self)
+        self.history = MetricHistory()
+        self.sampler.add_listener(lambda *args: self.history.on_sample(*args))
+        self.power = PowerMonitor(self.source)
+        self.sensors = SensorMonitor(self.source)
+        self.gpus = GpuMonitor(self.source)
+        self._vendor_sampling = False
+        self.cgroups = CgroupMonitor(self.source)
+        self.cgroup_sort = ('cpu', True)
+        self.inspector = ProcessInspector(self.source)
+        self.process_index = ProcessIndex(self.source)
+        self.process_filter = ""
+        self.disk_usage = DiskUsageScanner(self.source)
+        self.updates = PackageUpdates(self.source)
+        self.firewall = FirewallMonitor(self.source)
+        self.dns = DnsProbe(self.source, self.files)
+        self.hardening = HardeningAudit(self.source)
+        self.snapshots = collections.deque(maxlen=10)  # (label, snapshot), oldest first
+        self._dns_probing = False
+        self.selected_pid = None
+        self._detail_future = None
+        self._detail_generation = 0
+        
+        # Thread pool with limited workers
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        # Work that can take seconds (security checks, snapshots, probes, stale
+        # refreshes) gets its own pool so it never queues interactive loads
+        self.slow_executor = ThreadPoolExecutor(max_workers=4)
+        
+        # Cache every getter goes through
+        self.cache = TTLCache(maxsize=256, executor=self.slow_executor)
+        self.update_queue = queue.Queue()
+        
+        # Update intervals (in milliseconds)
+        self.UPDATE_INTERVALS = {
+            'cpu_ram': 2000,    # CPU/RAM update every 2 seconds
+            'processes': 3000,   # Process list update every 3 seconds
+            'disk': 10000,      # Disk info update every 10 seconds
+            'disk_usage': 500,  # Usage explorer refresh every half second while scanning
+            'network': 5000,    # Network info update every 5 seconds
+            'power': 5000,      # RAPL and battery sampling every 5 seconds
+            'sensors': 2000,    # Temperature, fan and frequency sampling every 2 seconds
+            'gpu': 2000,        # DRM sysfs sampling every 2 seconds
+            'gpu_vendor': 10000, # nvidia-smi every 10 seconds, NVIDIA only
+            'cgroups': 3000,    # cgroup tree rescan every 3 seconds
+            'firewall': 5000,   # ruleset counters every 5 seconds
+            'dns': 30000,       # resolver probes every 30 seconds
+            'security': 30000   # security checks every 30 seconds
+        }
+
+    def set_source(self, source):
+        """Switch the data source, dropping everything read from the old one"""
+        self.source = source
+        self.files = FileWatcher(source)
+        self.files.add_listener(self._on_file_changed)
+        self.power = PowerMonitor(source)
+        self.sensors.close()
+        self.sensors = SensorMonitor(source)
+        self.gpus.close()
+        self.gpus = GpuMonitor(source)
+        self.cgroups = CgroupMonitor(source)
+        self.inspector = ProcessInspector(source)
+        self.process_index = ProcessIndex(source)
+        self.disk_usage.cancel()
+        self.disk_usage = DiskUsageScanner(source)
+        self.updates = PackageUpdates(source)
+        self.firewall = FirewallMonitor(source)
+        self.dns = DnsProbe(source, self.files)
+        self.hardening = HardeningAudit(source)
+        self.history = MetricHistory()
+        self.cache.invalidate()
+
+    def _on_file_changed(self, path):
+        """Drop cached getters for a changed file and tell interested views"""
+        for name in self.FILE_GETTERS.get(path, ()):
+            self.cache.invalidate((name,))
+        for key, (paths, callback) in list(self.file_listeners.items()):
+            if path in paths:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in file listener {key}: {e}")
+
+    def on_file_change(self, key, paths, callback):
+        """Run callback off the Tk thread when one of paths changes, until the tab is left"""
+        self.file_listeners[key] = (set(paths), callback)
+
+    @classmethod
+    def headless(cls, source=None):
+        """Create a panel without a Tk root, for scripts and benchmarks"""
+        panel = cls.__new__(cls)
+        panel.root = None
+        panel._init_state(source)
+        return panel
+
+    def after(self, ms, func, *args):
+        """Schedule a timed Tk callback"""
+        return self.root.after(ms, self.instrumentation.timed("callback", _callable_name(func), func), *args)
+
+    def submit(self, func, *args):
+        """Run a timed task on the worker pool"""
+        return self.executor.submit(self.instrumentation.timed("task", _callable_name(func), func), *args)
+
+    def submit_slow(self, func, *args):
+        """Run a timed task that may take seconds on the slow pool"""
+        return self.slow_executor.submit(self.instrumentation.timed("task", _callable_name(func), func), *args)
+
+    def request_diagnostics(self, signum=None, frame=None):
+        """SIGUSR1 handler, only sets a flag.
+
+        The handler can interrupt the Tk thread inside the cache or
+        instrumentation locks the report needs, so the report is printed
+        by a scheduler job instead.
+        """
+        self._diagnostics_requested = True
+
+    def dump_diagnostics(self):
+        """Print the diagnostics report once SIGUSR1 asked for it"""
+        if self._diagnostics_requested:
+            self._diagnostics_requested = False
+            print(self.diagnostics_report(), file=sys.stderr)
+
+    def diagnostics_report(self):
+        stats = self.cache.stats()
+        return (self.instrumentation.report() + "\n\n"
+                + f"Cache: {stats['size']} entries, hit ratio {stats['hit_ratio']:.0%} "
+                + f"({stats['hits']} hits, {stats['stale_hits']} stale, {stats['misses']} misses, "
+                + f"{stats['shared_loads']} shared, {stats['evictions']} evicted)")
+
     def _bound_to_mousewheel(self, event, canvas=None):
         """Bind mousewheel when mouse enters the widget"""
         target_canvas = canvas if canvas else self.canvas
@@ -253,15 +4664,32 @@ class LinuxSystemPanel:
                                 bg="#121212",
                                 fg="#00ff00")
         self.ram_label.pack(anchor="w")
+        
+        # Alerts
+        alerts_frame = tk.Frame(self.bottom_bar, bg="#121212")
+        alerts_frame.pack(side="left", fill="both", expand=True, padx=10, pady=5)
+        
+        tk.Label(alerts_frame,
+                text="Alerts:",
+                bg="#121212",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w")
+        
+        self.alerts_label = tk.Label(alerts_frame,
+                                text="None",
+                                bg="#121212",
+                                fg="#00ff00",
+                                wraplength=300,
+                                justify="left")
+        self.alerts_label.pack(anchor="w", pady=2)
 
-    def update_usage_graphs(self):
+    def update_usage_graphs(self, snapshot):
         try:
             if not hasattr(self, 'cpu_canvas') or not self.cpu_canvas.winfo_exists():
                 return
 
-            # Get CPU and RAM usage together to reduce system calls
-            cpu_percent = psutil.cpu_percent(interval=None)  # Non-blocking call
-            mem = psutil.virtual_memory()
+            cpu_percent = snapshot['cpu.percent']
+            mem_percent = snapshot['mem.percent']
 
             # Update CPU graph
             width = self.cpu_canvas.winfo_width()
@@ -274,10 +4702,14 @@ class LinuxSystemPanel:
             width = self.ram_canvas.winfo_width()
             if width > 1:
                 self.ram_canvas.delete("all")
-                self.ram_canvas.create_rectangle(0, 0, (mem.percent/100)*width, 30, fill="#006400", outline="")
-                self.ram_label.config(text=f"{mem.percent:.1f}%")
+                self.ram_canvas.create_rectangle(0, 0, (mem_percent/100)*width, 30, fill="#006400", outline="")
+                self.ram_label.config(text=f"{mem_percent:.1f}%")
+
+            # Active alerts
+            active = sorted({name for name, _ in self.alerts.active})
+            self.alerts_label.config(text=", ".join(active) if active else "None",
+                                     fg="#ff0000" if active else "#00ff00")
 
-            self.root.after(self.UPDATE_INTERVALS['cpu_ram'], self.update_usage_graphs)
         except Exception as e:
             print(f"Error updating graphs: {e}")
 
@@ -343,76 +4775,42 @@ class LinuxSystemPanel:
                 bg="#000000",
                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
         
+        tk.Label(content,
+                text="Drag to pan, scroll to zoom, double-click to follow the newest sample",
+                bg="#000000",
+                fg="#00ff00").pack(anchor="w")
+
         # Graphs
         graph_frame = tk.Frame(content, bg="#000000")
         graph_frame.pack(fill="both", expand=True, pady=10)
-        
-        # CPU Grafiği
-        cpu_frame = tk.Frame(graph_frame, bg="#000000")
-        cpu_frame.pack(fill="x", pady=5)
-        tk.Label(cpu_frame, text="CPU Usage:", bg="#000000", fg="#00ff00", font=self.bold_font).pack(anchor="w")
-        self.monitor_cpu_canvas = tk.Canvas(cpu_frame, height=100, bg="#121212", highlightthickness=0)
-        self.monitor_cpu_canvas.pack(fill="x", pady=2)
-        self.monitor_cpu_label = tk.Label(cpu_frame, text="0%", bg="#000000", fg="#00ff00")
-        self.monitor_cpu_label.pack(anchor="w")
-        
-        # RAM Graph
-        ram_frame = tk.Frame(graph_frame, bg="#000000")
-        ram_frame.pack(fill="x", pady=5)
-        tk.Label(ram_frame, text="RAM Usage:", bg="#000000", fg="#00ff00", font=self.bold_font).pack(anchor="w")
-        self.monitor_ram_canvas = tk.Canvas(ram_frame, height=100, bg="#121212", highlightthickness=0)
-        self.monitor_ram_canvas.pack(fill="x", pady=2)
-        self.monitor_ram_label = tk.Label(ram_frame, text="0%", bg="#000000", fg="#00ff00")
-        self.monitor_ram_label.pack(anchor="w")
-        
-        # Disk Graph
-        disk_frame = tk.Frame(graph_frame, bg="#000000")
-        disk_frame.pack(fill="x", pady=5)
-        tk.Label(disk_frame, text="Disk Usage:", bg="#000000", fg="#00ff00", font=self.bold_font).pack(anchor="w")
-        self.monitor_disk_canvas = tk.Canvas(disk_frame, height=100, bg="#121212", highlightthickness=0)
-        self.monitor_disk_canvas.pack(fill="x", pady=2)
-        self.monitor_disk_label = tk.Label(disk_frame, text="0%", bg="#000000", fg="#00ff00")
-        self.monitor_disk_label.pack(anchor="w")
-        
+
+        charts = []
+        for title, metric in (("CPU Usage:", 'cpu.percent'), ("RAM Usage:", 'mem.percent'), ("Disk Usage:", 'disk./.percent')):
+            frame = tk.Frame(graph_frame, bg="#000000")
+            frame.pack(fill="x", pady=5)
+            tk.Label(frame, text=title, bg="#000000", fg="#00ff00", font=self.bold_font).pack(anchor="w")
+            chart = HistoryChart(frame, self.history, metric)
+            chart.pack(fill="x", pady=2)
+            label = tk.Label(frame, text="0%", bg="#000000", fg="#00ff00")
+            label.pack(anchor="w")
+            charts.append((chart, label))
+
         # update graphics
         def update_graphs():
             try:
                 if not content.winfo_exists():
+                    self.scheduler.remove('system_monitor')
                     return
-                    
-                # CPU usage
-                cpu_percent = psutil.cpu_percent(interval=0.5)
-                if hasattr(self, 'monitor_cpu_canvas') and self.monitor_cpu_canvas.winfo_exists():
-                    self.monitor_cpu_canvas.delete("all")
-                    width = self.monitor_cpu_canvas.winfo_width()
-                    if width > 1:
-                        self.monitor_cpu_canvas.create_rectangle(0, 0, (cpu_percent/100)*width, 100, fill="#006400", outline="")
-                        self.monitor_cpu_label.config(text=f"{cpu_percent:.1f}%")
-                
-                # RAM usage
-                mem = psutil.virtual_memory()
-                if hasattr(self, 'monitor_ram_canvas') and self.monitor_ram_canvas.winfo_exists():
-                    self.monitor_ram_canvas.delete("all")
-                    width = self.monitor_ram_canvas.winfo_width()
-                    if width > 1:
-                        self.monitor_ram_canvas.create_rectangle(0, 0, (mem.percent/100)*width, 100, fill="#006400", outline="")
-                        self.monitor_ram_label.config(text=f"{mem.percent:.1f}%")
-                
-                # Disk usage
-                disk = psutil.disk_usage('/')
-                if hasattr(self, 'monitor_disk_canvas') and self.monitor_disk_canvas.winfo_exists():
-                    self.monitor_disk_canvas.delete("all")
-                    width = self.monitor_disk_canvas.winfo_width()
-                    if width > 1:
-                        self.monitor_disk_canvas.create_rectangle(0, 0, (disk.percent/100)*width, 100, fill="#006400", outline="")
-                        self.monitor_disk_label.config(text=f"{disk.percent:.1f}%")
-                
-                # update after 1 sec
-                self.root.after(1000, update_graphs)
+
+                snapshot = self.sampler.snapshot
+                for chart, label in charts:
+                    chart.draw()
+                    if chart.metric in snapshot:
+                        label.config(text=f"{snapshot[chart.metric]:.1f}%")
             except Exception as e:
                 print(f"Error updating graphs: {e}")
-        
-        update_graphs()
+
+        self.scheduler.add('system_monitor', 1000, update_graphs, tab=5, run_now=True)
 
     def handle_signal(self, signum, frame):
         """get the signals"""
@@ -430,63 +4828,89 @@ class LinuxSystemPanel:
         """Clean sources"""
         try:
             self.executor.shutdown(wait=False)
+            self.slow_executor.shutdown(wait=False)
             print("Thread pool shutdown completed")
+            self.sensors.close()
+            self.gpus.close()
+            if self.fleet:
+                self.fleet.stop()
         except Exception as e:
             print(f"Error during cleanup: {e}")
 
     def start_periodic_updates(self):
         """periodic updates"""
-        def update():
+        # Sampling keeps going while minimized, alerts and the exporter read it
+        self.scheduler.add('metrics', self.UPDATE_INTERVALS['cpu_ram'], self.start_metric_sample,
+                           background=True, run_now=True)
+        # Energy attribution needs an unbroken series too
+        self.scheduler.add('power', self.UPDATE_INTERVALS['power'], lambda: self.submit(self.power.sample),
+                           background=True, run_now=True)
+        self.scheduler.add('sensors', self.UPDATE_INTERVALS['sensors'], lambda: self.submit(self.sensors.sample),
+                           run_now=True)
+        self.scheduler.add('gpu', self.UPDATE_INTERVALS['gpu'], lambda: self.submit(self.gpus.sample), run_now=True)
+        self.scheduler.add('gpu_vendor', self.UPDATE_INTERVALS['gpu_vendor'], self.start_vendor_gpu_sample)
+        self.scheduler.add('dns', self.UPDATE_INTERVALS['dns'], self.start_dns_probe, run_now=True)
+        self.scheduler.add('security', self.UPDATE_INTERVALS['security'],
+                           lambda: self.submit_slow(self.sampler.sample_security), background=True, run_now=True)
+        self.scheduler.add('sigusr1_dump', 250, self.dump_diagnostics, adaptive=False, background=True)
+        # baseline for the changes tab
+        self.submit_slow(self.take_snapshot, "startup")
+
+    def take_snapshot(self, label=None):
+        """Capture the system state and keep it in the snapshot history"""
+        snapshot = capture_snapshot(self)
+        self.snapshots.append((f"{label or 'snapshot'} {snapshot['taken']}", snapshot))
+        return snapshot
+
+    def start_dns_probe(self):
+        """Probe the resolvers on a worker, never more than one round at a time"""
+        if self._dns_probing:
+            return
+        self._dns_probing = True
+        
+        def probe():
             try:
-                # CPU usage
-                cpu_percent = psutil.cpu_percent(interval=0.5)
-                if hasattr(self, 'cpu_canvas') and self.cpu_canvas.winfo_exists():
-                    self.cpu_canvas.delete("all")
-                    width = self.cpu_canvas.winfo_width()
-                    if width > 1:
-                        self.cpu_canvas.create_rectangle(0, 0, (cpu_percent/100)*width, 30, fill="#006400", outline="")
-                        self.cpu_label.config(text=f"{cpu_percent:.1f}%")
-                
-                # RAM usage
-                mem = psutil.virtual_memory()
-                if hasattr(self, 'ram_canvas') and self.ram_canvas.winfo_exists():
-                    self.ram_canvas.delete("all")
-                    width = self.ram_canvas.winfo_width()
-                    if width > 1:
-                        self.ram_canvas.create_rectangle(0, 0, (mem.percent/100)*width, 30, fill="#006400", outline="")
-                        self.ram_label.config(text=f"{mem.percent:.1f}%")
-                
-                # update after 1sec
-                self.root.after(1000, update)
-            except Exception as e:
-                print(f"Error updating graphs: {e}")
+                self.dns.probe()
+                self.cache.invalidate(('check_dns',))
+            finally:
+                self._dns_probing = False
+        self.submit_slow(probe)
+
+    def start_vendor_gpu_sample(self):
+        """Query vendor GPU tools on a worker, never more than one at a time"""
+        if self._vendor_sampling or not self.gpus.has_nvidia():
+            return
+        self._vendor_sampling = True
         
-        update()
+        def sample():
+            try:
+                self.gpus.sample_vendor()
+            finally:
+                self._vendor_sampling = False
+        self.submit_slow(sample)
 
-    def update_status(self):
-        """update status"""
+    def start_metric_sample(self):
+        """Sample metrics in a worker unless the previous sample is still running"""
+        if not self._sampling:
+            self._sampling = True
+            self.submit(self.sample_metrics)
+
+    def sample_metrics(self):
         try:
-            cpu_percent = psutil.cpu_percent()
-            mem = psutil.virtual_memory()
-            uptime = self.get_uptime()
-            
-            self.cpu_label.config(text=f"{cpu_percent}%")
-            self.ram_label.config(text=f"{mem.percent}%")
-            
-            self.cpu_canvas.delete("all")
-            self.cpu_canvas.create_rectangle(0, 0, cpu_percent*2, 30, fill="#006400", outline="")
-            
-            self.ram_canvas.delete("all")
-            self.ram_canvas.create_rectangle(0, 0, mem.percent*2, 30, fill="#006400", outline="")
-            
-            self.root.after(1000, self.update_status)
+            snapshot, changed = self.sampler.sample()
+            self.alerts.evaluate(snapshot, changed)
+            if self.scheduler.visible:
+                self.dispatcher.post('usage_graphs', self.update_usage_graphs, snapshot)
         except Exception as e:
-            print(f"Error updating status: {e}")
+            print(f"Error sampling metrics: {e}")
+        finally:
+            self._sampling = False
 
+    @cached(ttl=1)
     def get_uptime(self) -> str:
         """System work time"""
         try:
-            uptime = time.time() - psutil.boot_time()
+            uptime = time.time() - self.source.boot_time()
             days = int(uptime // (24 * 3600))
             hours = int((uptime % (24 * 3600)) // 3600)
             minutes = int((uptime % 3600) // 60)
@@ -494,45 +4918,306 @@ class LinuxSystemPanel:
         except:
             return "N/A"
 
-    def create_menu_button(self, text: str, index: int):
-        """menu button"""
-        btn = ttk.Button(self.sidebar,
-                       text=text,
-                       style="Custom.TButton",
-                       command=lambda: self.switch_tab(index))
-        btn.pack(fill="x", pady=3)
+    def export_report(self):
+        """Write a support report to the home directory without blocking the window"""
+        self.report_button.config(state="disabled", text="Collecting...")
+        
+        def write_report():
+            try:
+                paths = SupportReport(self).write(os.path.expanduser('~'))
+                self.dispatcher.post('report', report_done, paths, None)
+            except Exception as e:
+                print(f"Error writing report: {e}")
+                self.dispatcher.post('report', report_done, None, e)
+        
+        def report_done(paths, error):
+            self.report_button.config(state="normal", text="Export Report")
+            if error is not None:
+                messagebox.showerror("Error", f"Failed to write report: {error}")
+            else:
+                messagebox.showinfo("Report", "Report written:\n" + "\n".join(paths))
+        
+        # its own thread, the collectors would otherwise queue behind the refresh workers
+        threading.Thread(target=write_report, name='report', daemon=True).start()
+
+    def create_menu_button(self, text: str, index: int):
+        """menu button"""
+        btn = ttk.Button(self.sidebar,
+                       text=text,
+                       style="Custom.TButton",
+                       command=lambda: self.switch_tab(index))
+        btn.pack(fill="x", pady=3)
+
+    def switch_tab(self, index: int):
+        """change tabs"""
+        try:
+            for widget in self.main_area.winfo_children():
+                widget.destroy()
+            self.scheduler.set_tab(index)
+            self.file_listeners.clear()
+            
+            if index == 0:
+                self.show_system_info()
+            elif index == 1:
+                self.show_hardware_info()
+            elif index == 2:
+                self.show_privacy_status()
+            elif index == 3:
+                self.show_network_info()
+            elif index == 4:
+                self.show_disk_info()
+            elif index == 5:
+                self.show_system_monitor()
+                self.show_processes()
+            elif index == 6:
+                self.show_services()
+            elif index == 7:
+                self.show_power_info()
+            elif index == 8:
+                self.show_securonis_info()
+            elif index == 9:
+                self.show_about()
+            elif index == 10:
+                self.show_diagnostics()
+            elif index == 11:
+                self.show_fleet()
+            elif index == 12:
+                self.show_changes()
+            else:
+                self.show_system_info()
+        except Exception as e:
+            print(f"Error switching tab: {e}")
+            messagebox.showerror("Error", f"Failed to switch tab: {str(e)}")
+
+    def show_diagnostics(self):
+        """Hidden tab with the panel's own timings and footprint"""
+        content = tk.Frame(self.main_area, bg="#000000")
+        content.pack(fill="both", expand=True, padx=25, pady=25)
+
+        tk.Label(content, 
+                 text="DIAGNOSTICS", 
+                 font=self.title_font,
+                 bg="#000000",
+                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
+
+        report = tk.Text(content,
+                         bg="#000000",
+                         fg="#00ff00",
+                         font=("Monospace", 9),
+                         height=40,
+                         relief="flat",
+                         highlightthickness=0)
+        report.pack(fill="both", expand=True)
+
+        def update_diagnostics():
+            if not report.winfo_exists():
+                self.scheduler.remove('diagnostics_view')
+                return
+            report.config(state="normal")
+            report.delete("1.0", "end")
+            report.insert("end", self.diagnostics_report())
+            report.config(state="disabled")
+
+        self.scheduler.add('diagnostics_view', 1000, update_diagnostics, tab=10, run_now=True)
+
+    def show_changes(self):
+        """Grouped differences between a baseline snapshot or report and now"""
+        content = tk.Frame(self.main_area, bg="#000000")
+        content.pack(fill="both", expand=True, padx=25, pady=25)
+
+        tk.Label(content, 
+                 text="SYSTEM CHANGES", 
+                 font=self.title_font,
+                 bg="#000000",
+                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
+
+        controls = tk.Frame(content, bg="#000000")
+        controls.pack(fill="x", pady=(0, 10))
+        tk.Label(controls, text="Baseline:", bg="#000000", fg="#00ff00", font=self.bold_font).pack(side="left")
+        baselines = {label: snapshot for label, snapshot in self.snapshots}
+        baseline_var = tk.StringVar(value=next(iter(baselines), ""))
+        baseline_box = ttk.Combobox(controls, textvariable=baseline_var, values=list(baselines),
+                                    state="readonly", width=40)
+        baseline_box.pack(side="left", padx=10)
+        status_label = tk.Label(controls, text="", bg="#000000", fg="#00ff00")
+
+        tree = ttk.Treeview(content, columns=("value",), show="tree headings", height=25)
+        tree.heading("#0", text="Change")
+        tree.column("#0", width=420, anchor="w")
+        tree.heading("value", text="Value")
+        tree.column("value", width=420, anchor="w")
+        tree.tag_configure("added", foreground="#00ff00")
+        tree.tag_configure("removed", foreground="#ff0000")
+        tree.tag_configure("changed", foreground="#ffff00")
+
+        def show_status(text):
+            if status_label.winfo_exists():
+                status_label.config(text=text)
+                baseline_box.config(values=list(baselines))
+
+        def render(changes, label):
+            if not tree.winfo_exists():
+                return
+            tree.delete(*tree.get_children())
+            count = 0
+            for section in sorted(changes):
+                group = changes[section]
+                total = len(group["added"]) + len(group["removed"]) + len(group["changed"])
+                count += total
+                parent = tree.insert("", "end", text=f"{section} ({total})", open=True)
+                for key, value in sorted(group["added"].items()):
+                    tree.insert(parent, "end", text=f"+ {key}", values=(str(value),), tags=("added",))
+                for key, value in sorted(group["removed"].items()):
+                    tree.insert(parent, "end", text=f"- {key}", values=(str(value),), tags=("removed",))
+                for key, (old, new) in sorted(group["changed"].items()):
+                    tree.insert(parent, "end", text=f"~ {key}", values=(f"{old} -> {new}",), tags=("changed",))
+            show_status(f"{count} changes since {label}" if count else f"No changes since {label}")
+
+        def compare():
+            label = baseline_var.get()
+            baseline = baselines.get(label)
+            if baseline is None:
+                status_label.config(text="No baseline yet, take a snapshot first")
+                return
+            status_label.config(text="Capturing...")
+
+            def capture():
+                try:
+                    current = self.take_snapshot("compare")
+                    baselines[self.snapshots[-1][0]] = current
+                    self.dispatcher.post('changes', render, diff_snapshots(baseline, current), label)
+                except Exception as e:
+                    print(f"Error comparing snapshots: {e}")
+            self.submit_slow(capture)
+
+        def snapshot():
+            status_label.config(text="Capturing...")
+
+            def capture():
+                try:
+                    self.take_snapshot("manual")
+                    label, taken = self.snapshots[-1]
+                    baselines[label] = taken
+                    self.dispatcher.post('changes', show_status, f"Took {label}")
+                except Exception as e:
+                    print(f"Error taking snapshot: {e}")
+            self.submit_slow(capture)
+
+        def load_report():
+            path = filedialog.askopenfilename(title="Baseline report",
+                                              filetypes=[("Support reports", "*.json.gz *.json"), ("All files", "*")])
+            if not path:
+                return
+            try:
+                baselines[os.path.basename(path)] = load_snapshot(path)
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Failed to load report: {e}")
+                return
+            baseline_box.config(values=list(baselines))
+            baseline_var.set(os.path.basename(path))
+
+        for text, command in (("Compare with now", compare), ("Take Snapshot", snapshot),
+                              ("Load Report...", load_report)):
+            tk.Button(controls,
+                     text=text,
+                     command=command,
+                     bg="#121212",
+                     fg="#00ff00",
+                     activebackground="#006400",
+                     relief="flat").pack(side="left", padx=(0, 5))
+        status_label.pack(side="left", padx=10)
+        tree.pack(fill="both", expand=True)
+
+    def show_fleet(self):
+        """Sortable grid of every collector in fleet mode"""
+        content = tk.Frame(self.main_area, bg="#000000")
+        content.pack(fill="both", expand=True, padx=25, pady=25)
+
+        tk.Label(content, 
+                 text="FLEET", 
+                 font=self.title_font,
+                 bg="#000000",
+                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
+
+        container = tk.Frame(content, bg="#000000")
+        container.pack(fill="both", expand=True)
+        columns = [column for column, _, _ in self.FLEET_COLUMNS]
+        tree = ttk.Treeview(container, columns=columns, show="headings", height=25)
+        for column, heading, width in self.FLEET_COLUMNS:
+            tree.heading(column, text=heading, command=lambda c=column: sort_by(c))
+            tree.column(column, width=width, anchor="w")
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=tree.yview, style="Vertical.TScrollbar")
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        rows = {}  # endpoint -> displayed values
+
+        def sort_rows():
+            column, reverse = self.fleet_sort
+            order = sorted(rows, key=lambda endpoint: self.fleet_sort_key(endpoint, column), reverse=reverse)
+            if list(tree.get_children()) != order:
+                for position, endpoint in enumerate(order):
+                    tree.move(endpoint, "", position)
+
+        def sort_by(column):
+            current, reverse = self.fleet_sort
+            self.fleet_sort = (column, not reverse if column == current else False)
+            sort_rows()
 
-    def switch_tab(self, index: int):
-        """change tabs"""
-        try:
-            for widget in self.main_area.winfo_children():
-                widget.destroy()
-            
-            if index == 0:
-                self.show_system_info()
-            elif index == 1:
-                self.show_hardware_info()
-            elif index == 2:
-                self.show_privacy_status()
-            elif index == 3:
-                self.show_network_info()
-            elif index == 4:
-                self.show_disk_info()
-            elif index == 5:
-                self.show_system_monitor()
-            elif index == 6:
-                self.show_services()
-            elif index == 7:
-                self.show_power_info()
-            elif index == 8:
-                self.show_securonis_info()
-            elif index == 9:
-                self.show_about()
-            else:
-                self.show_system_info()
-        except Exception as e:
-            print(f"Error switching tab: {e}")
-            messagebox.showerror("Error", f"Failed to switch tab: {str(e)}")
+        def update_fleet():
+            if not tree.winfo_exists():
+                self.scheduler.remove('fleet')
+                return
+            dirty = self.fleet.take_dirty()
+            changed = False
+            for endpoint in dirty:
+                values = self.fleet_row(endpoint)
+                if rows.get(endpoint) == values:
+                    continue
+                if endpoint in rows:
+                    tree.item(endpoint, values=values)
+                else:
+                    tree.insert("", "end", iid=endpoint, values=values)
+                rows[endpoint] = values
+                changed = True
+            if changed:
+                sort_rows()
+
+        # a new grid needs every row
+        with self.fleet._lock:
+            self.fleet._dirty.update(self.fleet.hosts)
+        self.scheduler.add('fleet', 1000, update_fleet, tab=11, run_now=True)
+
+    def fleet_values(self, endpoint):
+        """Raw sortable values of one fleet host"""
+        with self.fleet._lock:
+            host = self.fleet.hosts[endpoint]
+            metrics = dict(host.metrics)
+            name, status = host.name, host.status
+        disks = [value for metric, value in metrics.items() if metric.startswith('disk.') and metric.endswith('.percent')]
+        return {
+            'host': name,
+            'status': status,
+            'cpu': metrics.get('cpu.percent'),
+            'ram': metrics.get('mem.percent'),
+            'disk': max(disks) if disks else None,
+            'vpn': metrics.get('vpn.up'),
+            'tor': metrics.get('security.tor'),
+        }
+
+    def fleet_row(self, endpoint):
+        values = self.fleet_values(endpoint)
+        percent = lambda value: f"{value:.1f}%" if value is not None else "N/A"
+        state = lambda value, on, off: "N/A" if value is None else (on if value else off)
+        return (values['host'], values['status'], percent(values['cpu']), percent(values['ram']),
+                percent(values['disk']), state(values['vpn'], "Active", "Inactive"),
+                state(values['tor'], "Active", "Inactive"))
+
+    def fleet_sort_key(self, endpoint, column):
+        value = self.fleet_values(endpoint)[column]
+        # hosts without the value sort last
+        return (value is None, value if value is not None else 0)
 
     def show_about(self):
         """Show About tab with application information."""
@@ -551,7 +5236,7 @@ class LinuxSystemPanel:
 
         about_text = (
             "Secuonis Linux System Control Panel\n\n"
-            "Version: 1.8\n"
+            f"Version: {PANEL_VERSION}\n"
             "Developer: root0emir\n\n"
             "This control panel provides detailed system information, "
             "hardware monitoring, privacy and security status, and more.\n\n"
@@ -571,21 +5256,22 @@ class LinuxSystemPanel:
                  justify="left",
                  anchor="w").pack(anchor="w", pady=(10, 0))
 
+    @cached(ttl=2)
     def get_system_info(self):
-        mem = psutil.virtual_memory()
-        swap = psutil.swap_memory()
+        mem = self.source.virtual_memory()
+        swap = self.source.swap_memory()
         return { 
             "Hostname": socket.gethostname(),
             "OS": self.get_os_info(),
             "Kernel": platform.version(),
-            "Uptime": str(datetime.timedelta(seconds=int(time.time() - psutil.boot_time())))[:-7],
-            "CPU": f"{psutil.cpu_percent()}% ({psutil.cpu_count()} cores @ {psutil.cpu_freq().current:.0f}MHz)",
+            "Uptime": str(datetime.timedelta(seconds=int(time.time() - self.source.boot_time())))[:-7],
+            "CPU": f"{self.source.cpu_percent()}% ({self.source.cpu_count()} cores @ {self.source.cpu_freq().current:.0f}MHz)",
             "RAM": f"{mem.used/1024/1024:.1f}MB / {mem.total/1024/1024:.1f}MB ({mem.percent}%)",
             "Swap": f"{swap.used/1024/1024:.1f}MB / {swap.total/1024/1024:.1f}MB",
             "Temperature": self.get_cpu_temp(),
             "Load Avg": self.get_load_avg(),
             "Battery": self.get_battery_info(),
-            "Last Boot": datetime.datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S"),
+            "Last Boot": datetime.datetime.fromtimestamp(self.source.boot_time()).strftime("%Y-%m-%d %H:%M:%S"),
             "System Time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "Timezone": self.get_timezone(),
             "Desktop Environment": self.get_desktop_environment(),
@@ -594,68 +5280,73 @@ class LinuxSystemPanel:
             "System Language": self.get_system_language()
         }
 
+    @cached(ttl=3600)
     def get_os_info(self):
         try:
-            with open('/etc/os-release', 'r') as f:
-                lines = f.readlines()
-                os_info = {}
-                for line in lines:
-                    if '=' in line:
-                        key, value = line.strip().split('=', 1)
-                        os_info[key] = value.strip('"')
-                return f"{os_info.get('NAME', 'Unknown')} {os_info.get('VERSION', '')} ({os_info.get('ID', 'Unknown')})"
+            os_info = self.files.get('/etc/os-release', parse_os_release)
+            return f"{os_info.get('NAME', 'Unknown')} {os_info.get('VERSION', '')} ({os_info.get('ID', 'Unknown')})"
         except:
             return f"{platform.system()} {platform.release()}"
 
+    @cached(ttl=60)
     def get_timezone(self):
         try:
-            return subprocess.check_output(['timedatectl', 'show', '--property=Timezone']).decode().strip().split('=')[1]
+            return self.source.check_output(['timedatectl', 'show', '--property=Timezone']).decode().strip().split('=')[1]
         except:
             return "N/A"
 
+    @cached(ttl=3600)
     def get_desktop_environment(self):
         try:
             return os.environ.get('XDG_CURRENT_DESKTOP', 'N/A')
         except:
             return "N/A"
 
+    @cached(ttl=60)
     def get_display_manager(self):
         try:
-            return subprocess.check_output(['systemctl', 'list-units', '--type=service', '--state=running', 'display-manager.service']).decode()
+            return self.source.check_output(['systemctl', 'list-units', '--type=service', '--state=running', 'display-manager.service']).decode()
         except:
             return "N/A"
 
+    @cached(ttl=3600)
     def get_system_language(self):
         try:
             return os.environ.get('LANG', 'N/A')
         except:
             return "N/A"
 
+    @cached(ttl=2)
     def get_cpu_temp(self):
+        temp = self.get_cpu_temp_celsius()
+        return f"{temp}°C" if temp is not None else "N/A"
+
+    @cached(ttl=2)
+    def get_cpu_temp_celsius(self):
         try:
-            temps = psutil.sensors_temperatures()
-            if 'coretemp' in temps:
-                return f"{temps['coretemp'][0].current}°C"
-            elif 'k10temp' in temps:
-                return f"{temps['k10temp'][0].current}°C"
-            elif 'acpitz' in temps:
-                return f"{temps['acpitz'][0].current}°C"
-            with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                return f"{int(f.read()) / 1000}°C"
+            # hottest reading of the CPU chip, not just its first input
+            temps = self.source.sensors_temperatures()
+            for chip in SensorMonitor.CPU_CHIPS:
+                if temps.get(chip):
+                    return max(entry.current for entry in temps[chip])
+            with self.source.open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
+                return int(f.read()) / 1000
         except:
-            return "N/A"
+            return None
 
+    @cached(ttl=2)
     def get_load_avg(self):
         try:
-            with open("/proc/loadavg", "r") as f:
+            with self.source.open("/proc/loadavg", "r") as f:
                 load = f.read().split()[:3]
             return ", ".join(load)
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_battery_info(self):
         try:
-            bat = psutil.sensors_battery()
+            bat = self.source.sensors_battery()
             if bat:
                 return f"{bat.percent}% ({'Charging' if bat.power_plugged else 'Discharging'})"
             return "No Battery"
@@ -746,10 +5437,90 @@ class LinuxSystemPanel:
                     text=value,
                     bg="#000000",
                     fg="#00ff00").pack(side="left", padx=10)
+        
+        # Sensors
+        sensors_frame = tk.Frame(content, bg="#000000")
+        sensors_frame.pack(fill="x", pady=10)
+        
+        tk.Label(sensors_frame,
+                text="Sensors:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w")
+        
+        sensor_table = tk.Text(sensors_frame,
+                               bg="#000000",
+                               fg="#00ff00",
+                               font=("Monospace", 9),
+                               height=12,
+                               relief="flat",
+                               highlightthickness=0)
+        sensor_table.pack(fill="x", pady=2)
+        
+        tk.Label(sensors_frame,
+                text="CPU Temperature vs Frequency:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(10, 2))
+        
+        chart = tk.Canvas(sensors_frame, bg="#121212", height=160, highlightthickness=0)
+        chart.pack(fill="x")
+        chart_legend = tk.Label(sensors_frame, text="", bg="#000000", fg="#00ff00", justify="left")
+        chart_legend.pack(anchor="w", pady=(5, 0))
+        
+        def update_sensors_view():
+            if not chart.winfo_exists():
+                self.scheduler.remove('sensors_view')
+                return
+            sensor_table.config(state="normal")
+            sensor_table.delete("1.0", "end")
+            sensor_table.insert("end", f"{'Sensor':<34}{'Current':>10}{'Min':>10}{'Max':>10}{'High':>8}{'Crit':>8}\n")
+            for key, kind, current, low, high_seen, high, critical in self.sensors.summary():
+                unit = SensorMonitor.UNITS[kind]
+                limit = lambda value: f"{value:.0f}" if value else "-"
+                sensor_table.insert("end", f"{key[:33]:<34}{current:>8.1f}{unit:<2}{low:>10.1f}{high_seen:>10.1f}"
+                                           f"{limit(high):>8}{limit(critical):>8}\n")
+            sensor_table.config(state="disabled")
+            
+            chart.delete("all")
+            width = max(chart.winfo_width(), 1)
+            height = 160
+            cpu = self.sensors.cpu_sensor()
+            temps = list(self.sensors.history.get(cpu, ())) if cpu else []
+            freqs = list(self.sensors.freq)
+            times = [t for t, _ in temps + freqs]
+            if len(times) < 2:
+                chart_legend.config(text="Collecting samples...")
+                return
+            start, span = min(times), (max(times) - min(times)) or 1.0
+            x = lambda t: (t - start) / span * width
+            for t in self.sensors.throttle_events:
+                if t >= start:
+                    chart.create_line(x(t), 0, x(t), height, fill="#ff0000")
+            for series, color in ((temps, "#ff8000"), (freqs, "#00ffff")):
+                if len(series) < 2:
+                    continue
+                low = min(v for _, v in series)
+                top = max(v for _, v in series)
+                scale = (top - low) or 1.0
+                points = []
+                for t, value in series:
+                    points += [x(t), height - 5 - (value - low) / scale * (height - 10)]
+                chart.create_line(*points, fill=color)
+            legend = []
+            if temps:
+                legend.append(f"Temperature ({cpu}): {temps[-1][1]:.1f}°C")
+            if freqs:
+                legend.append(f"Frequency: {freqs[-1][1]:.0f}MHz")
+            legend.append(f"Throttle events: {len(self.sensors.throttle_events)}")
+            chart_legend.config(text="   ".join(legend))
+        
+        self.scheduler.add('sensors_view', self.UPDATE_INTERVALS['sensors'], update_sensors_view, tab=1, run_now=True)
 
+    @cached(ttl=2)
     def get_cpu_details(self):
         try:
-            with open('/proc/cpuinfo', 'r') as f:
+            with self.source.open('/proc/cpuinfo', 'r') as f:
                 cpu_info = {}
                 for line in f:
                     if ':' in line:
@@ -759,73 +5530,92 @@ class LinuxSystemPanel:
                 return {
                     "Model": cpu_info.get('model name', 'N/A'),
                     "Vendor": cpu_info.get('vendor_id', 'N/A'),
-                    "Cores": f"{psutil.cpu_count()} ({psutil.cpu_count(logical=False)} physical)",
-                    "Thread Count": str(psutil.cpu_count(logical=True)),
+                    "Cores": f"{self.source.cpu_count()} ({self.source.cpu_count(logical=False)} physical)",
+                    "Thread Count": str(self.source.cpu_count(logical=True)),
                     "Cache Sizes": self.get_cpu_cache_sizes(),
-                    "Max Speed": f"{psutil.cpu_freq().max:.0f}MHz",
-                    "Current Speed": f"{psutil.cpu_freq().current:.0f}MHz",
-                    "Min Speed": f"{psutil.cpu_freq().min:.0f}MHz"
+                    "Max Speed": f"{self.source.cpu_freq().max:.0f}MHz",
+                    "Current Speed": f"{self.source.cpu_freq().current:.0f}MHz",
+                    "Min Speed": f"{self.source.cpu_freq().min:.0f}MHz"
                 }
         except:
             return {"Error": "Could not fetch CPU details"}
 
+    @cached(ttl=3600)
     def get_cpu_cache_sizes(self):
         try:
-            with open('/sys/devices/system/cpu/cpu0/cache/index0/size', 'r') as f:
+            with self.source.open('/sys/devices/system/cpu/cpu0/cache/index0/size', 'r') as f:
                 l1 = f.read().strip()
-            with open('/sys/devices/system/cpu/cpu0/cache/index1/size', 'r') as f:
+            with self.source.open('/sys/devices/system/cpu/cpu0/cache/index1/size', 'r') as f:
                 l2 = f.read().strip()
-            with open('/sys/devices/system/cpu/cpu0/cache/index2/size', 'r') as f:
+            with self.source.open('/sys/devices/system/cpu/cpu0/cache/index2/size', 'r') as f:
                 l3 = f.read().strip()
             return f"L1: {l1}, L2: {l2}, L3: {l3}"
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_gpu_details(self):
         try:
-            # NVIDIA GPU
-            nvidia = subprocess.check_output(['nvidia-smi', '--query-gpu=gpu_name,memory.total,memory.used,memory.free', '--format=csv,noheader']).decode()
-            if nvidia:
-                name, total, used, free = nvidia.strip().split(',')
-                return {
-                    "GPU": name,
-                    "Total Memory": f"{total.strip()}",
-                    "Used Memory": f"{used.strip()}",
-                    "Free Memory": f"{free.strip()}"
-                }
+            # DRM sysfs, sampled in the background, read once here if the first sample has not run yet
+            if self.gpus.cards is None:
+                self.gpus.sample()
+            details = {}
+            for card, info in self.gpus.cards.items():
+                name = f"GPU {card[4:]}"
+                values = self.gpus.latest.get(card, {})
+                details[name] = f"{info['vendor']} {info['device_id'] or ''} ({info['driver']})"
+                if "freq_mhz" in values:
+                    details[f"{name} Frequency"] = f"{values['freq_mhz']}MHz / {values['max_freq_mhz'] or 'N/A'}MHz"
+                if "busy_percent" in values:
+                    details[f"{name} Busy"] = f"{values['busy_percent']}%"
+                if "temp_c" in values:
+                    details[f"{name} Temperature"] = f"{values['temp_c']:.0f}°C"
+                if "vram_used" in values:
+                    total = values.get("vram_total")
+                    details[f"{name} VRAM"] = (f"{values['vram_used']/1024/1024:.0f}MB / {total/1024/1024:.0f}MB"
+                                               if total else f"{values['vram_used']/1024/1024:.0f}MB")
             
-            # Intel/AMD GPU
-            with open('/sys/kernel/debug/dri/0/i915_frequency_info', 'r') as f:
-                gpu_info = f.read()
-                return {
-                    "GPU": "Intel/AMD Integrated Graphics",
-                    "Frequency Info": gpu_info
-                }
+            # NVIDIA extras from nvidia-smi, filled in by a background job
+            for index, values in self.gpus.vendor.items():
+                name = f"NVIDIA {index}"
+                details[name] = values['name']
+                details[f"{name} Frequency"] = f"{values['freq_mhz']}MHz / {values['max_freq_mhz']}MHz"
+                details[f"{name} Busy"] = f"{values['busy_percent']}%"
+                details[f"{name} VRAM"] = f"{values['vram_used_mib']}MB / {values['vram_total_mib']}MB"
+            return details or {"GPU": "N/A"}
         except:
             return {"GPU": "N/A"}
 
+    @cached(ttl=2)
+    def get_memory(self):
+        """Memory and swap figures, get_ram_details formats them"""
+        mem = self.source.virtual_memory()
+        swap = self.source.swap_memory()
+        
+        # RAM hızını kontrol et
+        ram_speed = None
+        try:
+            with self.source.open('/sys/devices/system/memory/memory0/device/speed', 'r') as f:
+                ram_speed = int(f.read().strip())
+        except:
+            pass
+        
+        return MemoryRecord(mem.total, mem.available, mem.used, mem.percent,
+                            swap.total, swap.used, swap.percent, ram_speed)
+
     def get_ram_details(self):
         try:
-            mem = psutil.virtual_memory()
-            swap = psutil.swap_memory()
-            
-            # RAM hızını kontrol et
-            ram_speed = "N/A"
-            try:
-                with open('/sys/devices/system/memory/memory0/device/speed', 'r') as f:
-                    ram_speed = f"{f.read().strip()} MHz"
-            except:
-                pass
-            
+            memory = self.get_memory()
+            gb = lambda value: f"{value/1024/1024/1024:.1f} GB"
             return {
-                "Total RAM": f"{mem.total/1024/1024/1024:.1f} GB",
-                "Available RAM": f"{mem.available/1024/1024/1024:.1f} GB",
-                "Used RAM": f"{mem.used/1024/1024/1024:.1f} GB",
-                "RAM Usage": f"{mem.percent}%",
-                "RAM Speed": ram_speed,
-                "Total Swap": f"{swap.total/1024/1024/1024:.1f} GB",
-                "Used Swap": f"{swap.used/1024/1024/1024:.1f} GB",
-                "Swap Usage": f"{swap.percent}%"
+                "Total RAM": gb(memory.total),
+                "Available RAM": gb(memory.available),
+                "Used RAM": gb(memory.used),
+                "RAM Usage": f"{memory.percent}%",
+                "RAM Speed": f"{memory.speed_mhz} MHz" if memory.speed_mhz is not None else "N/A",
+                "Total Swap": gb(memory.swap_total),
+                "Used Swap": gb(memory.swap_used),
+                "Swap Usage": f"{memory.swap_percent}%"
             }
         except:
             return {"Error": "Could not fetch RAM details"}
@@ -840,6 +5630,70 @@ class LinuxSystemPanel:
                 bg="#000000",
                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
         
+        # cgroup tree
+        tk.Label(content,
+                text="Control Groups:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w")
+        
+        columns = [column for column, _, _ in self.CGROUP_COLUMNS]
+        tree_frame = tk.Frame(content, bg="#000000")
+        tree_frame.pack(fill="x", pady=(5, 20))
+        tree = ttk.Treeview(tree_frame, columns=columns, show="tree headings", height=15)
+        tree.heading("#0", text="Cgroup", command=lambda: sort_by('name'))
+        tree.column("#0", width=320, anchor="w")
+        for column, heading, width in self.CGROUP_COLUMNS:
+            tree.heading(column, text=heading, command=lambda c=column: sort_by(c))
+            tree.column(column, width=width, anchor="e")
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview, style="Vertical.TScrollbar")
+        tree.configure(yscrollcommand=tree_scrollbar.set)
+        tree.pack(side="left", fill="x", expand=True)
+        tree_scrollbar.pack(side="right", fill="y")
+        
+        def sort_by(column):
+            current, reverse = self.cgroup_sort
+            self.cgroup_sort = (column, not reverse if column == current else column != 'name')
+            render(self.cgroups.stats)
+        
+        def render(stats):
+            if not tree.winfo_exists():
+                return
+            # drop cgroups that are gone, deepest first
+            shown = []
+            pending = list(tree.get_children(""))
+            while pending:
+                item = pending.pop()
+                shown.append(item)
+                pending.extend(tree.get_children(item))
+            for item in sorted(set(shown) - set(stats), key=len, reverse=True):
+                if tree.exists(item):
+                    tree.delete(item)
+            for rel in sorted(stats, key=lambda rel: rel.count('/')):
+                parent = rel.rsplit('/', 1)[0] if '/' in rel else ""
+                values = self.cgroup_row(stats[rel])
+                if tree.exists(rel):
+                    tree.item(rel, values=values)
+                else:
+                    tree.insert(parent if tree.exists(parent) else "", "end", iid=rel, text=stats[rel]["name"],
+                                values=values)
+            column, reverse = self.cgroup_sort
+            key = self.cgroup_sort_key(stats, column)
+            for parent in [""] + list(stats):
+                children = tree.get_children(parent)
+                if len(children) > 1:
+                    ordered = sorted(children, key=key, reverse=reverse)
+                    if list(children) != ordered:
+                        for position, item in enumerate(ordered):
+                            tree.move(item, parent, position)
+        
+        def sample_cgroups():
+            stats = self.cgroups.sample()
+            self.dispatcher.post('cgroups', render, stats)
+        
+        self.scheduler.add('cgroups', self.UPDATE_INTERVALS['cgroups'], lambda: self.submit(sample_cgroups),
+                           tab=6, run_now=True)
+        
         # service list
         services = self.get_system_services()
         
@@ -860,9 +5714,38 @@ class LinuxSystemPanel:
                     bg="#000000",
                     fg=color).pack(side="left", padx=10)
 
+    @staticmethod
+    def format_bytes(value):
+        for unit in ("B", "KB", "MB", "GB"):
+            if abs(value) < 1024:
+                return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+            value /= 1024
+        return f"{value:.1f}TB"
+
+    def cgroup_row(self, entry):
+        number = lambda value, fmt: fmt(value) if value is not None else "N/A"
+        return (entry["kind"],
+                number(entry["cpu_percent"], lambda v: f"{v:.1f}%"),
+                number(entry["memory"], self.format_bytes),
+                number(entry["memory_pressure"], lambda v: f"{v:.2f}"),
+                number(entry["io_read_rate"], lambda v: f"{self.format_bytes(v)}/s"),
+                number(entry["io_write_rate"], lambda v: f"{self.format_bytes(v)}/s"))
+
+    def cgroup_sort_key(self, stats, column):
+        field = {'name': 'name', 'kind': 'kind', 'cpu': 'cpu_percent', 'memory': 'memory',
+                 'pressure': 'memory_pressure', 'io_read': 'io_read_rate', 'io_write': 'io_write_rate'}[column]
+
+        def key(rel):
+            value = stats.get(rel, {}).get(field)
+            if isinstance(value, str):
+                return (1, value.lower())
+            return (1 if value is not None else 0, value or 0)
+        return key
+
+    @cached(ttl=10)
     def get_system_services(self):
         try:
-            output = subprocess.check_output(['systemctl', 'list-units', '--type=service', '--state=running']).decode()
+            output = self.source.check_output(['systemctl', 'list-units', '--type=service', '--state=running']).decode()
             services = []
             for line in output.split('\n'):
                 if 'running' in line:
@@ -889,12 +5772,9 @@ class LinuxSystemPanel:
                                fg="#00ff00")
         loading_label.pack(pady=20)
         
-        # update sec info
-        def update_security_info():
+        # collect sec info in a worker
+        def load_security_info():
             try:
-                if not content.winfo_exists():
-                    return
-                    
                 security_info = {
                 # sec
                 "VPN Status": self.check_vpn(),
@@ -903,12 +5783,39 @@ class LinuxSystemPanel:
                 "Public IP": self.get_public_ip(),
                 
                 # System Sec  
-                "AppArmor": self.check_apparmor()
+                "AppArmor": self.check_apparmor(),
+                "Kernel Hardening": self.check_kernel_hardening(),
+                "Updates": self.check_updates()
             }
+            except Exception as e:
+                print(f"Error in load_security_info: {e}")
+                security_info = None
+            self.dispatcher.post('privacy_status', update_security_info, security_info)
+        
+        value_labels = {}
+        
+        def refresh_watched_rows():
+            values = {"DNS Status": self.check_dns(), "VPN Status": self.check_vpn()}
+            self.dispatcher.post('privacy_status.watched', update_watched_rows, values)
+        
+        def update_watched_rows(values):
+            for key, value in values.items():
+                label = value_labels.get(key)
+                if label is not None and label.winfo_exists():
+                    label.config(text=value, fg=self.status_color(value))
+        
+        # show sec info, runs on the Tk thread
+        def update_security_info(security_info):
+            try:
+                if not content.winfo_exists():
+                    return
                 
                 if loading_label.winfo_exists():
                     loading_label.destroy()
                 
+                if security_info is None:
+                    raise RuntimeError("no security information")
+                
                 # sec info
                 for i, (key, value) in enumerate(security_info.items()):
                     if not content.winfo_exists():
@@ -925,11 +5832,41 @@ class LinuxSystemPanel:
                             width=20, 
                             anchor="w").pack(side="left")
                     
-                    color = "#00ff00" if value in ["Active", "Enabled", "Up to Date", "Protected", "Secure"] else "#ff0000" if value in ["Inactive", "Disabled", "Not Found", "Unprotected", "Insecure"] else "#ffff00"
-                    tk.Label(frame, 
+                    value_labels[key] = tk.Label(frame, 
                             text=value, 
                             bg="#000000",
-                            fg=color).pack(side="left", padx=10)
+                            fg=self.status_color(value))
+                    value_labels[key].pack(side="left", padx=10)
+                
+                upgradable = self.updates.upgradable
+                if upgradable:
+                    tk.Label(content,
+                            text="Upgradable Packages:",
+                            bg="#000000",
+                            fg="#00ff00",
+                            font=self.bold_font).pack(anchor="w", pady=(15, 5))
+                    tree = ttk.Treeview(content, columns=("installed", "candidate", "origin"), show="tree headings",
+                                        height=min(10, len(upgradable)))
+                    tree.heading("#0", text="Package")
+                    tree.column("#0", width=240, anchor="w")
+                    for column, heading in (("installed", "Installed"), ("candidate", "Candidate"), ("origin", "Origin")):
+                        tree.heading(column, text=heading)
+                        tree.column(column, width=180, anchor="w")
+                    tree.tag_configure("security", foreground="#ff0000")
+                    for package in upgradable:
+                        tree.insert("", "end", text=f"{package['name']}:{package['arch']}",
+                                    values=(package["installed"], package["candidate"],
+                                            "security" if package["security"] else "updates"),
+                                    tags=("security",) if package["security"] else ())
+                    tree.pack(fill="x")
+                
+                self.show_firewall_activity(content)
+                self.show_dns_health(content)
+                self.show_hardening_audit(content)
+                
+                # DNS and VPN rows follow resolv.conf, route and link changes
+                self.on_file_change('privacy_status', ('/etc/resolv.conf', '/proc/net/route', '/sys/class/net'),
+                                    refresh_watched_rows)
             except Exception as e:
                 print(f"Error in update_security_info: {e}")
                 if loading_label.winfo_exists():
@@ -941,26 +5878,140 @@ class LinuxSystemPanel:
                             fg="#ff0000").pack(pady=20)
         
         # Asencron
-        threading.Thread(target=update_security_info, daemon=True).start()
+        self.submit(load_security_info)
+
+    def show_hardening_audit(self, content):
+        """Failed baseline checks, the ones that changed since the last audit first"""
+        findings = self.hardening.findings
+        failed = [finding for finding in findings if finding["passed"] is False]
+        score = self.hardening.score
+        tk.Label(content,
+                text=f"Kernel Hardening Audit: {score:.0f}/100" if score is not None else "Kernel Hardening Audit: N/A",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(15, 5))
+        if not failed:
+            return
+        tree = ttk.Treeview(content, columns=("kind", "actual", "wanted"), show="tree headings",
+                            height=min(10, len(failed)))
+        tree.heading("#0", text="Check")
+        tree.column("#0", width=300, anchor="w")
+        for column, heading, width in (("kind", "Kind", 90), ("actual", "Current", 140), ("wanted", "Wanted", 200)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w")
+        tree.tag_configure("changed", foreground="#ffff00")
+        changed = set(self.hardening.changed)
+        for finding in sorted(failed, key=lambda finding: (finding["id"] not in changed, -finding["weight"])):
+            tree.insert("", "end", text=finding["id"], values=(finding["kind"], finding["actual"], finding["wanted"]),
+                        tags=("changed",) if finding["id"] in changed else ())
+        tree.pack(fill="x")
+
+    def show_dns_health(self, content):
+        """Latency and failures of every probed resolver"""
+        tk.Label(content,
+                text="DNS Resolvers:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(15, 5))
+        columns = (("role", "Role", 90), ("p50", "p50", 80), ("p95", "p95", 80), ("failures", "Failures", 80),
+                   ("interface", "Via", 90), ("status", "Status", 160))
+        tree = ttk.Treeview(content, columns=[column for column, _, _ in columns], show="tree headings", height=5)
+        tree.heading("#0", text="Server")
+        tree.column("#0", width=200, anchor="w")
+        for column, heading, width in columns:
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w")
+        tree.tag_configure("failing", foreground="#ff0000")
+        tree.tag_configure("leak", foreground="#ffff00")
+        tree.pack(fill="x")
+        
+        def update_dns_view():
+            if not tree.winfo_exists():
+                self.scheduler.remove('dns_view')
+                return
+            tree.delete(*tree.get_children())
+            number = lambda value: f"{value:.1f} ms" if value is not None else "N/A"
+            for result in self.dns.summary():
+                status = result["error"] or result["rcode"]
+                if result["leak"]:
+                    status = f"{status}, outside VPN"
+                tree.insert("", "end", text=result["address"],
+                            values=(result["role"], number(result["p50"]), number(result["p95"]),
+                                    f"{result['failure_rate']:.0%}" if result["failure_rate"] is not None else "N/A",
+                                    result["interface"] or "N/A", status),
+                            tags=("leak",) if result["leak"] else ("failing",) if result["error"] else ())
+        
+        self.scheduler.add('dns_view', 5000, update_dns_view, tab=2, run_now=True)
+
+    def show_firewall_activity(self, content):
+        """Hottest rules and default-accept chains, from the ruleset counters"""
+        tk.Label(content,
+                text="Firewall Activity:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(15, 5))
+        warning_label = tk.Label(content, text="", bg="#000000", fg="#ffff00", justify="left")
+        warning_label.pack(anchor="w")
+        tree = ttk.Treeview(content, columns=("chain", "rate", "packets", "verdict"), show="tree headings", height=8)
+        tree.heading("#0", text="Rule")
+        tree.column("#0", width=380, anchor="w")
+        for column, heading, width in (("chain", "Chain", 180), ("rate", "Packets/s", 90),
+                                       ("packets", "Packets", 100), ("verdict", "Verdict", 90)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="e" if column in ("rate", "packets") else "w")
+        tree.pack(fill="x")
+        
+        def render(rules, open_chains, backend):
+            if not tree.winfo_exists():
+                return
+            if backend is None:
+                warning_label.config(text="No nftables or iptables ruleset readable (needs root)", fg="#ff0000")
+            elif open_chains:
+                warning_label.config(text="Default accept: " + ", ".join(
+                    f"{chain['family']} {chain['table']} {chain['name']}" for chain in open_chains), fg="#ffff00")
+            else:
+                warning_label.config(text=f"No default-accept input or forward chains ({backend})", fg="#00ff00")
+            tree.delete(*tree.get_children())
+            for rule in rules:
+                tree.insert("", "end", text=rule["text"] or "(no match)",
+                            values=(f"{rule['family']} {rule['table']} {rule['chain']}", f"{rule['rate']:.1f}",
+                                    f"{rule['packets']:,}", rule["verdict"] or ""))
+        
+        def sample_firewall():
+            self.firewall.sample()
+            self.dispatcher.post('firewall', render, self.firewall.hottest(), self.firewall.default_accept(),
+                                 self.firewall.backend)
+        
+        self.scheduler.add('firewall', self.UPDATE_INTERVALS['firewall'], lambda: self.submit(sample_firewall),
+                           tab=2, run_now=True)
 
+    def status_color(self, value):
+        """Colour of a status value"""
+        if value in ["Active", "Enabled", "Up to Date", "Protected", "Secure"]:
+            return "#00ff00"
+        if value in ["Inactive", "Disabled", "Not Found", "Unprotected", "Insecure"]:
+            return "#ff0000"
+        return "#ffff00"
+
+    @cached(ttl=10)
     def check_firewall(self):
         try:
-            # UFW check
-            ufw_status = subprocess.check_output(['ufw', 'status'], stderr=subprocess.PIPE, timeout=1).decode()
-            if "Status: active" in ufw_status:
-                return "Active"
-            
-            iptables_status = subprocess.check_output(['iptables', '-L'], stderr=subprocess.PIPE, timeout=1).decode()
-            if "Chain INPUT" in iptables_status:
-                return "Active (iptables)"
-            
-            return "Inactive"
+            # nftables or iptables ruleset, ufw and firewalld both end up there
+            backend, chains, rules = self.firewall.ruleset()
+            if backend is None:
+                return "Not Found"
+            if not any(chain["hook"] in FirewallMonitor.FILTER_HOOKS for chain in chains):
+                return "Inactive"
+            if any(chain["hook"] == 'input' for chain in self.firewall.default_accept()):
+                return "Active (default accept)"
+            return "Active"
         except:
             return "Not Found"
 
+    @cached(ttl=2)
     def check_vpn(self):
         try:
-            interfaces = psutil.net_if_stats()
+            interfaces = self.source.net_if_stats()
             vpn_interfaces = ['tune0', 'tun0', 'tun1', 'wg0', 'ppp0', 'ppp1', 'ppp2']
             
             for interface in vpn_interfaces:
@@ -971,10 +6022,11 @@ class LinuxSystemPanel:
         except:
             return "Not Found"
 
+    @cached(ttl=30, stale=True)
     def check_tor(self):
         try:
  
-            tor_status = subprocess.check_output(['systemctl', 'is-active', 'tor'], stderr=subprocess.PIPE, timeout=1).decode()
+            tor_status = self.source.check_output(['systemctl', 'is-active', 'tor'], stderr=subprocess.PIPE, timeout=1).decode()
             if "active" in tor_status:
                
                 try:
@@ -997,10 +6049,10 @@ class LinuxSystemPanel:
         except:
             return "Not Found"
 
+    @cached(ttl=10)
     def check_dns(self):
         try:
-            with open('/etc/resolv.conf', 'r') as f:
-                dns_content = f.read()
+            nameservers = self.files.get('/etc/resolv.conf', parse_resolv_conf)["nameservers"]
             
             dns_providers = {
                 '1.1.1.1': 'Cloudflare',
@@ -1027,14 +6079,25 @@ class LinuxSystemPanel:
                 '8.20.247.20': 'Comodo Secure'
             }
             
-            for ip, provider in dns_providers.items():
-                if ip in dns_content:
-                    return f"Using {provider}"
+            # the probes say more than the provider name
+            results = self.dns.summary()
+            leaks = [result for result in results if result["leak"]]
+            if leaks:
+                return f"Leaking via {leaks[0]['interface']} ({leaks[0]['address']})"
+            if results and all(result["error"] for result in results):
+                return "Failing"
+            latencies = [result["p50"] for result in results if result["p50"] is not None]
+            latency = f", {min(latencies):.0f} ms" if latencies else ""
             
-            return "Using Default DNS"
+            for ip in nameservers:
+                if ip in dns_providers:
+                    return f"Using {dns_providers[ip]}{latency}"
+            
+            return f"Using Default DNS{latency}"
         except:
             return "Unknown"
 
+    @cached(ttl=60, stale=True)
     def get_public_ip(self):
         try:
             response = requests.get('https://api.ipify.org?format=json', timeout=2)
@@ -1059,10 +6122,14 @@ class LinuxSystemPanel:
                                fg="#00ff00")
         loading_label.pack(pady=20)
         
-        # get net info
-        def update_network_info():
-            # get netw info
-            net_info = self.get_network_info()
+        # get net info in a worker
+        def load_network_info():
+            self.dispatcher.post('network_info', update_network_info, self.get_network_info())
+        
+        # show net info, runs on the Tk thread
+        def update_network_info(net_info):
+            if not content.winfo_exists():
+                return
             
             loading_label.destroy()
             
@@ -1098,22 +6165,42 @@ class LinuxSystemPanel:
                                 width=20, 
                                 anchor="w").pack(side="left")
                         
-                        tk.Label(frame, 
+                        value_labels[item] = tk.Label(frame, 
                                 text=net_info[item], 
                                 bg="#000000",
-                                fg="#00ff00").pack(side="left", padx=10)
+                                fg="#00ff00")
+                        value_labels[item].pack(side="left", padx=10)
             
         
             self.create_network_graph(content)
+            
+            # DNS, gateway and VPN rows follow resolv.conf, route and link changes
+            self.on_file_change('network_info', ('/etc/resolv.conf', '/proc/net/route', '/sys/class/net'),
+                                refresh_watched_rows)
+        
+        value_labels = {}
+        
+        def refresh_watched_rows():
+            values = {"DNS Servers": self.get_dns_servers(),
+                      "Default Gateway": self.get_default_gateway(),
+                      "VPN Status": self.get_vpn_status()}
+            self.dispatcher.post('network_info.watched', update_watched_rows, values)
+        
+        def update_watched_rows(values):
+            for item, value in values.items():
+                label = value_labels.get(item)
+                if label is not None and label.winfo_exists():
+                    label.config(text=value)
         
       
-        threading.Thread(target=update_network_info, daemon=True).start()
+        self.submit(load_network_info)
 
+    @cached(ttl=5)
     def get_network_info(self):
         try:
-            net = psutil.net_io_counters()
-            addrs = psutil.net_if_addrs()
-            stats = psutil.net_if_stats()
+            net = self.source.net_io_counters()
+            addrs = self.source.net_if_addrs()
+            stats = self.source.net_if_stats()
             
            
             info = {
@@ -1151,69 +6238,75 @@ class LinuxSystemPanel:
             print(f"Error getting network info: {e}")
             return {"Error": "Could not fetch network information"}
 
+    @cached(ttl=300)
     def get_domain_name(self):
         try:
             return socket.getfqdn()
         except:
             return "N/A"
 
+    @cached(ttl=5)
     def get_active_interface(self):
         try:
-            for interface, stats in psutil.net_if_stats().items():
+            for interface, stats in self.source.net_if_stats().items():
                 if stats.isup:
                     return interface
             return "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_interface_speed(self):
         try:
             active_interface = self.get_active_interface()
             if active_interface != "N/A":
-                with open(f'/sys/class/net/{active_interface}/speed', 'r') as f:
+                with self.source.open(f'/sys/class/net/{active_interface}/speed', 'r') as f:
                     return f"{f.read().strip()} Mbps"
             return "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_mtu_size(self):
         try:
             active_interface = self.get_active_interface()
             if active_interface != "N/A":
-                with open(f'/sys/class/net/{active_interface}/mtu', 'r') as f:
+                with self.source.open(f'/sys/class/net/{active_interface}/mtu', 'r') as f:
                     return f"{f.read().strip()} bytes"
             return "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_dns_servers(self):
         try:
-            with open('/etc/resolv.conf', 'r') as f:
-                dns_servers = []
-                for line in f:
-                    if line.startswith('nameserver'):
-                        dns_servers.append(line.split()[1])
-                return ", ".join(dns_servers) if dns_servers else "N/A"
+            dns_servers = self.files.get('/etc/resolv.conf', parse_resolv_conf)["nameservers"]
+            return ", ".join(dns_servers) if dns_servers else "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=5)
     def get_default_gateway(self):
         try:
-            with open('/proc/net/route', 'r') as f:
-                for line in f:
-                    if line.split()[0] == 'default':
-                        return line.split()[2]
+            RTF_GATEWAY = 0x2
+            routes = self.files.get('/proc/net/route', parse_route_table)
+            defaults = [r for r in routes if r["destination"] == "0.0.0.0" and r["flags"] & RTF_GATEWAY]
+            if defaults:
+                route = min(defaults, key=lambda r: r["metric"])
+                return f"{route['gateway']} ({route['iface']})"
             return "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=30)
     def get_dhcp_status(self):
         try:
-            dhcp_status = subprocess.check_output(['systemctl', 'is-active', 'dhcpcd'], stderr=subprocess.PIPE, timeout=1).decode()
+            dhcp_status = self.source.check_output(['systemctl', 'is-active', 'dhcpcd'], stderr=subprocess.PIPE, timeout=1).decode()
             return "Active" if "active" in dhcp_status else "Inactive"
         except:
             return "N/A"
 
+    @cached(ttl=60)
     def get_proxy_status(self):
         try:
             proxy_env = os.environ.get('http_proxy') or os.environ.get('https_proxy')
@@ -1223,23 +6316,28 @@ class LinuxSystemPanel:
         except:
             return "N/A"
 
+    @cached(ttl=10)
     def get_firewall_rules(self):
         try:
-            rules = subprocess.check_output(['iptables', '-L', '--line-numbers'], stderr=subprocess.PIPE, timeout=1).decode()
-            return f"{len(rules.splitlines())} rules"
+            backend, chains, rules = self.firewall.ruleset()
+            if backend is None:
+                return "N/A"
+            return f"{len(rules)} rules in {len(chains)} chains ({backend})"
         except:
             return "N/A"
 
+    @cached(ttl=3600)
     def get_network_encryption_status(self):
         try:
-            ssl_status = subprocess.check_output(['openssl', 'version'], stderr=subprocess.PIPE, timeout=1).decode()
+            ssl_status = self.source.check_output(['openssl', 'version'], stderr=subprocess.PIPE, timeout=1).decode()
             return "Enabled" if ssl_status else "Disabled"
         except:
             return "N/A"
 
+    @cached(ttl=2)
     def get_vpn_status(self):
         try:
-            interfaces = psutil.net_if_stats()
+            interfaces = self.source.net_if_stats()
             vpn_interfaces = ['tun0', 'tun1', 'wg0', 'ppp0']
             for interface in vpn_interfaces:
                 if interface in interfaces and interfaces[interface].isup:
@@ -1261,7 +6359,7 @@ class LinuxSystemPanel:
         canvas = tk.Canvas(frame, height=100, bg="#121212", highlightthickness=0)
         canvas.pack(fill="x", pady=5)
         
-        net = psutil.net_io_counters()
+        net = self.source.net_io_counters()
         total_bytes = net.bytes_sent + net.bytes_recv
         
         canvas.create_rectangle(0, 0, 200, 100, fill="#121212", outline="")
@@ -1305,8 +6403,8 @@ class LinuxSystemPanel:
                     anchor="w").pack(side="left")
             
             try:
-                if os.path.exists(log_path):
-                    with open(log_path, 'r') as f:
+                if self.source.exists(log_path):
+                    with self.source.open(log_path, 'r') as f:
                         lines = f.readlines()[-5:]
                         status = "Last 5 lines available"
                 else:
@@ -1348,10 +6446,73 @@ class LinuxSystemPanel:
                     text=value,
                     bg="#000000",
                     fg="#00ff00").pack(side="left", padx=10)
+        
+        # Power history
+        tk.Label(content,
+                text="Power History (W):",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(20, 5))
+        
+        history_canvas = tk.Canvas(content, bg="#121212", height=150, highlightthickness=0)
+        history_canvas.pack(fill="x")
+        legend = tk.Label(content, text="", bg="#000000", fg="#00ff00", justify="left")
+        legend.pack(anchor="w", pady=(5, 0))
+        
+        # Energy per process
+        tk.Label(content,
+                text="Top Energy Consumers (since panel start):",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w", pady=(20, 5))
+        
+        consumers = tk.Text(content,
+                            bg="#000000",
+                            fg="#00ff00",
+                            font=("Monospace", 9),
+                            height=11,
+                            relief="flat",
+                            highlightthickness=0)
+        consumers.pack(fill="x")
+        
+        colors = ["#00ff00", "#ffff00", "#00ffff", "#ff00ff", "#ff8000"]
+        
+        def update_power_view():
+            if not history_canvas.winfo_exists():
+                self.scheduler.remove('power_view')
+                return
+            history = list(self.power.history)
+            history_canvas.delete("all")
+            names = sorted({name for _, values in history for name in values})
+            peak = max((w for _, values in history for w in values.values()), default=0) or 1.0
+            width = max(history_canvas.winfo_width(), 1)
+            height = 150
+            if len(history) > 1:
+                start, end = history[0][0], history[-1][0]
+                span = (end - start) or 1.0
+                for name, color in zip(names, colors):
+                    points = []
+                    for t, values in history:
+                        if name in values:
+                            points += [(t - start) / span * width, height - values[name] / peak * (height - 10)]
+                    if len(points) >= 4:
+                        history_canvas.create_line(*points, fill=color)
+            legend.config(text="   ".join(f"{name}: {self.power.watts(name):.1f}W" for name in names)
+                          or (self.power.rapl_error or "No RAPL or battery power readings"))
+            
+            consumers.config(state="normal")
+            consumers.delete("1.0", "end")
+            consumers.insert("end", f"{'Process':<24}{'Energy (J)':>12}{'CPU (s)':>10}\n")
+            for name, joules, seconds in self.power.top_consumers():
+                consumers.insert("end", f"{name[:23]:<24}{joules:>12.1f}{seconds:>10.1f}\n")
+            consumers.config(state="disabled")
+        
+        self.scheduler.add('power_view', self.UPDATE_INTERVALS['power'], update_power_view, tab=7, run_now=True)
 
+    @cached(ttl=5)
     def get_power_info(self):
         try:
-            battery = psutil.sensors_battery()
+            battery = self.source.sensors_battery()
             power_info = {}
             
             if battery:
@@ -1360,108 +6521,121 @@ class LinuxSystemPanel:
                 power_info["Time Left"] = f"{battery.secsleft/60:.1f} minutes" if battery.secsleft != -2 else "Calculating..."
             
             # CPU frekans info
-            cpu_freq = psutil.cpu_freq()
+            cpu_freq = self.source.cpu_freq()
             power_info["CPU Frequency"] = f"{cpu_freq.current:.0f}MHz"
             power_info["CPU Min Frequency"] = f"{cpu_freq.min:.0f}MHz"
             power_info["CPU Max Frequency"] = f"{cpu_freq.max:.0f}MHz"
             
             # Power status
-            try:
-                with open('/sys/class/power_supply/BAT0/power_now', 'r') as f:
-                    power_now = int(f.read()) / 1000000  # Convert to watts
-                    power_info["Current Power Usage"] = f"{power_now:.1f}W"
-            except:
-                power_info["Current Power Usage"] = "N/A"
+            power_info["Current Power Usage"] = "N/A"
+            for device, supply in self.power.latest["supplies"].items():
+                if supply["type"] == "Battery" and "watts" in supply:
+                    power_info["Current Power Usage"] = f"{supply['watts']:.1f}W"
+                if "energy_wh" in supply:
+                    power_info[f"{device} Energy"] = f"{supply['energy_wh']:.1f}Wh / {supply['energy_full_wh']:.1f}Wh"
+            for domain, watts in self.power.latest["rapl"].items():
+                power_info[f"RAPL {domain}"] = f"{watts:.1f}W"
+            if not self.power.latest["rapl"] and self.power.rapl_error:
+                power_info["RAPL"] = self.power.rapl_error
             
             return power_info
         except:
             return {"Error": "Could not fetch power information"}
 
+    @cached(ttl=60)
     def check_kernel_hardening(self):
         try:
-            # Kernel hardening check
-            with open('/proc/sys/kernel/randomize_va_space', 'r') as f:
-                aslr = f.read().strip()
-            with open('/proc/sys/fs/protected_hardlinks', 'r') as f:
-                hardlinks = f.read().strip()
-            with open('/proc/sys/fs/protected_symlinks', 'r') as f:
-                symlinks = f.read().strip()
-            
-            if aslr == "2" and hardlinks == "1" and symlinks == "1":
+            # sysctl, boot flag and module baseline
+            self.hardening.audit()
+            score = self.hardening.score
+            if score is None:
+                return "Not Found"
+            if score >= 100:
                 return "Enabled"
-            return "Partially Enabled"
+            return f"Partially Enabled ({score:.0f}%)"
         except:
             return "Not Found"
 
+    @cached(ttl=30)
     def check_usb_protection(self):
         try:
             # USB sec settings
-            usb_status = subprocess.check_output(['lsusb'], stderr=subprocess.PIPE, timeout=1).decode()
+            usb_status = self.source.check_output(['lsusb'], stderr=subprocess.PIPE, timeout=1).decode()
             if "USB" in usb_status:
                 return "Active"
             return "Inactive"
         except:
             return "Not Found"
 
+    @cached(ttl=10)
     def check_ssh_status(self):
         try:
-            ssh_status = subprocess.check_output(['systemctl', 'is-active', 'ssh'], stderr=subprocess.PIPE, timeout=1).decode()
+            ssh_status = self.source.check_output(['systemctl', 'is-active', 'ssh'], stderr=subprocess.PIPE, timeout=1).decode()
             if "active" in ssh_status:
                 return "Active"
             return "Inactive"
         except:
             return "Not Found"
 
+    @cached(ttl=3600)
     def check_network_encryption(self):
         try:
             # SSL/TLS checking
-            ssl_status = subprocess.check_output(['openssl', 'version'], stderr=subprocess.PIPE, timeout=1).decode()
+            ssl_status = self.source.check_output(['openssl', 'version'], stderr=subprocess.PIPE, timeout=1).decode()
             if ssl_status:
                 return "Enabled"
             return "Disabled"
         except:
             return "Not Found"
 
+    @cached(ttl=30)
     def check_dns_over_tls(self):
         try:
             # DNS-over-TLS cechking
-            with open('/etc/systemd/resolved.conf', 'r') as f:
-                if 'DNSOverTLS=yes' in f.read():
-                    return "Enabled"
+            settings = self.files.get('/etc/systemd/resolved.conf', parse_resolved_conf)
+            if settings.get('DNSOverTLS') == 'yes':
+                return "Enabled"
             return "Disabled"
         except:
             return "Not Found"
 
+    @cached(ttl=60, stale=True)
     def check_updates(self):
         try:
-            # APT check
-            apt_status = subprocess.check_output(['apt', 'list', '--upgradable'], stderr=subprocess.PIPE, timeout=1).decode()
-            if "Listing..." in apt_status and "upgradable" in apt_status:
-                return "Updates Available"
-            return "Up to Date"
+            # dpkg status against apt's lists, rebuilt only when they change
+            upgradable = self.updates.check()
+            if upgradable is None:
+                return "Unknown"
+            if not upgradable:
+                return "Up to Date"
+            security = sum(1 for package in upgradable if package["security"])
+            return f"{len(upgradable)} Updates ({security} security)"
         except:
             return "Unknown"
 
+    @cached(ttl=30)
     def check_antivirus(self):
         try:
             # ClamAV kontrolü
-            clamav_status = subprocess.check_output(['systemctl', 'is-active', 'clamav-daemon'], stderr=subprocess.PIPE, timeout=1).decode()
+            clamav_status = self.source.check_output(['systemctl', 'is-active', 'clamav-daemon'], stderr=subprocess.PIPE, timeout=1).decode()
             if "active" in clamav_status:
                 return "Active (ClamAV)"
             return "Not Found"
         except:
             return "Not Found"
 
+    @cached(ttl=60)
     def check_selinux(self):
         try:
-            selinux_status = subprocess.check_output(['getenforce'], stderr=subprocess.PIPE, timeout=1).decode().strip()
+            selinux_status = self.source.check_output(['getenforce'], stderr=subprocess.PIPE, timeout=1).decode().strip()
             return selinux_status
         except:
             return "Not Found"
 
+    @cached(ttl=30)
     def check_apparmor(self):
         try:
-            apparmor_status = subprocess.check_output(['systemctl', 'status', 'apparmor'], stderr=subprocess.PIPE, timeout=1).decode()
+            apparmor_status = self.source.check_output(['systemctl', 'status', 'apparmor'], stderr=subprocess.PIPE, timeout=1).decode()
             if "active (exited)" in apparmor_status or "active (running)" in apparmor_status:
                 return "Active"
             elif "inactive" in apparmor_status or "failed" in apparmor_status:
@@ -1480,6 +6654,8 @@ class LinuxSystemPanel:
                 bg="#000000",
                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
         
+        self.show_disk_usage_explorer(content)
+        
         # Create container frame
         container = tk.Frame(content, bg="#000000")
         container.pack(fill="both", expand=True)
@@ -1517,10 +6693,11 @@ class LinuxSystemPanel:
         def update_disk_info():
             try:
                 if not scrollable_frame.winfo_exists():
+                    self.scheduler.remove('disk_info')
                     return
                 
                 # Get disk info using cache
-                disks = self.get_cached_data('disk_info', self.get_disk_info, timeout=10)
+                disks = self.get_disk_usage()
                 
                 if loading_label.winfo_exists():
                     loading_label.destroy()
@@ -1535,7 +6712,7 @@ class LinuxSystemPanel:
                     frame.pack(fill="x", pady=10, padx=5)
                     
                     tk.Label(frame, 
-                            text=f"{disk['Mount']}:", 
+                            text=f"{disk.mount}:", 
                             bg="#000000", 
                             fg="#00ff00",
                             font=self.bold_font, 
@@ -1547,12 +6724,11 @@ class LinuxSystemPanel:
                                          bg="#121212", highlightthickness=0)
                     disk_canvas.pack(side="left", padx=10)
                     
-                    percent = float(disk['Used'].replace('%', ''))
-                    bar_width = (percent / 100.0) * canvas_width
+                    bar_width = (disk.percent / 100.0) * canvas_width
                     disk_canvas.create_rectangle(0, 0, bar_width, 20, fill="#006400", outline="")
                     
                     tk.Label(frame, 
-                            text=f"{disk['Used']} of {disk['Size']} (Free: {disk['Free']})", 
+                            text=f"{disk.percent}% of {disk.total/1024/1024/1024:.1f} GB (Free: {disk.free/1024/1024/1024:.1f} GB)", 
                             bg="#000000",
                             fg="#00ff00").pack(side="left", padx=10)
                 
@@ -1571,31 +6747,154 @@ class LinuxSystemPanel:
                             bg="#000000", 
                             fg="#ff0000").pack(pady=20)
         
-        # Initial update
-        update_disk_info()
+        # Initial update, then periodic updates
+        self.scheduler.add('disk_info', self.UPDATE_INTERVALS['disk'], update_disk_info, tab=4, run_now=True)
+
+    def show_disk_usage_explorer(self, content):
+        """Drill-down tree of directory sizes on one mount"""
+        tk.Label(content,
+                text="Disk Usage Explorer:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(anchor="w")
+        
+        controls = tk.Frame(content, bg="#000000")
+        controls.pack(fill="x", pady=5)
+        mounts = [disk.mount for disk in self.get_disk_usage()] or ["/"]
+        scanner = self.disk_usage
+        mount_var = tk.StringVar(value=scanner.mount if scanner.mount in mounts else mounts[0])
+        ttk.Combobox(controls, textvariable=mount_var, values=mounts, state="readonly", width=30).pack(side="left")
+        full_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(controls,
+                      text="Full rescan",
+                      variable=full_var,
+                      bg="#000000",
+                      fg="#00ff00",
+                      selectcolor="#121212",
+                      activebackground="#000000",
+                      activeforeground="#00ff00").pack(side="left", padx=10)
+        
+        def scan():
+            if scanner.scanning:
+                scanner.cancel()
+                return
+            for item in tree.get_children(""):
+                tree.delete(item)
+            scanner.start(mount_var.get(), full_var.get())
+            refresh()
+        
+        scan_button = tk.Button(controls,
+                               text="Scan",
+                               command=scan,
+                               bg="#121212",
+                               fg="#00ff00",
+                               activebackground="#006400",
+                               relief="flat")
+        scan_button.pack(side="left")
+        status_label = tk.Label(controls, text="", bg="#000000", fg="#00ff00")
+        status_label.pack(side="left", padx=10)
+        
+        tree_frame = tk.Frame(content, bg="#000000")
+        tree_frame.pack(fill="x", pady=(5, 20))
+        tree = ttk.Treeview(tree_frame, columns=("size", "share", "files"), show="tree headings", height=10)
+        tree.heading("#0", text="Directory")
+        tree.column("#0", width=360, anchor="w")
+        for column, heading, width in (("size", "Size", 100), ("share", "Share", 80), ("files", "Files", 100)):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="e")
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview, style="Vertical.TScrollbar")
+        tree.configure(yscrollcommand=tree_scrollbar.set)
+        tree.pack(side="left", fill="x", expand=True)
+        tree_scrollbar.pack(side="right", fill="y")
         
-        # Schedule periodic updates
-        self.root.after(self.UPDATE_INTERVALS['disk'], update_disk_info)
+        # items are "du:" plus the path relative to the mount; a "//" child marks an unloaded directory
+        def row(size, files, parent_size):
+            share = f"{size / parent_size * 100:.1f}%" if parent_size else "N/A"
+            return (self.format_bytes(size), share, f"{files:,}")
+        
+        def fill(item, rel):
+            """Sync the children of an open item with the scanner"""
+            parent_size = scanner.total(rel)[0]
+            rows = scanner.children(rel)
+            wanted = [f"du:{child}" for _, child, _, _, _ in rows]
+            for existing in tree.get_children(item):
+                if existing not in wanted:
+                    tree.delete(existing)
+            for position, (name, child, size, files, has_subdirs) in enumerate(rows):
+                child_item = f"du:{child}"
+                if tree.exists(child_item):
+                    tree.item(child_item, values=row(size, files, parent_size))
+                    tree.move(child_item, item, position)
+                else:
+                    tree.insert(item, position, iid=child_item, text=name, values=row(size, files, parent_size))
+                    if has_subdirs:
+                        tree.insert(child_item, "end", iid=f"{child_item}//", text="...")
+                if tree.item(child_item, "open"):
+                    fill(child_item, child)
+                elif has_subdirs and not tree.get_children(child_item):
+                    tree.insert(child_item, "end", iid=f"{child_item}//", text="...")
+        
+        rendered = [None]
+        
+        def refresh():
+            if not tree.winfo_exists():
+                self.scheduler.remove('disk_usage')
+                return
+            progress = scanner.progress()
+            if progress['mount'] is None:
+                status_label.config(text="Not scanned")
+                return
+            # a finished scan only needs drawing once, opening items fills them after that
+            finished = None if progress['scanning'] else (progress['mount'], progress['elapsed'])
+            if finished is not None and finished == rendered[0] and tree.exists("du:"):
+                return
+            rendered[0] = finished
+            size, files = progress['bytes'], progress['files']
+            if not tree.exists("du:"):
+                tree.insert("", "end", iid="du:", text=progress['mount'], open=True)
+            tree.item("du:", values=(self.format_bytes(size), "100.0%", f"{files:,}"))
+            fill("du:", "")
+            state = "Scanning" if progress['scanning'] else "Scanned"
+            status_label.config(text=f"{state} {progress['listed'] + progress['reused']:,} directories "
+                                     f"({progress['reused']:,} unchanged) in {progress['elapsed']:.1f}s")
+            scan_button.config(text="Stop" if progress['scanning'] else "Scan")
+        
+        def on_open(event):
+            item = tree.focus()
+            if item.startswith("du:") and not item.endswith("//"):
+                placeholder = f"{item}//"
+                if tree.exists(placeholder):
+                    tree.delete(placeholder)
+                fill(item, item[3:])
+        
+        tree.bind("<<TreeviewOpen>>", on_open)
+        self.scheduler.add('disk_usage', self.UPDATE_INTERVALS['disk_usage'], refresh, tab=4, run_now=True)
 
     def get_disk_info(self):
+        return [{
+            "Mount": disk.mount,
+            "Used": f"{disk.percent}%",
+            "Size": f"{disk.total/1024/1024/1024:.1f} GB",
+            "Free": f"{disk.free/1024/1024/1024:.1f} GB",
+            "Type": disk.fstype
+        } for disk in self.get_disk_usage()]
+
+    @cached(ttl=10)
+    def get_disk_usage(self):
         try:
             partitions = []
-            for part in psutil.disk_partitions():
+            for part in self.source.disk_partitions():
                 try:
-                    usage = psutil.disk_usage(part.mountpoint)
-                    partitions.append({
-                        "Mount": part.mountpoint,
-                        "Used": f"{usage.percent}%",
-                        "Size": f"{usage.total/1024/1024/1024:.1f} GB",
-                        "Free": f"{usage.free/1024/1024/1024:.1f} GB",
-                        "Type": part.fstype
-                    })
+                    usage = self.source.disk_usage(part.mountpoint)
+                    partitions.append(DiskRecord(part.mountpoint, part.fstype, usage.total,
+                                                 usage.used, usage.free, usage.percent))
                 except:
                     continue
             return partitions
         except:
             return []
 
+    @cached(ttl=10)
     def get_ip_address(self):
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -1604,16 +6903,18 @@ class LinuxSystemPanel:
         except:
             return "N/A"
 
+    @cached(ttl=60)
     def get_mac_address(self):
         try:
-            mac = psutil.net_if_addrs()[list(psutil.net_if_addrs().keys())[0]][0].address
+            mac = self.source.net_if_addrs()[list(self.source.net_if_addrs().keys())[0]][0].address
             return mac if mac.count(':') == 5 else "N/A"
         except:
             return "N/A"
 
+    @cached(ttl=5)
     def get_interface_status(self):
         try:
-            stats = psutil.net_if_stats()
+            stats = self.source.net_if_stats()
             return "\n".join([f"{k}: {'Up' if v.isup else 'Down'}" for k, v in stats.items()])
         except:
             return "N/A"
@@ -1628,125 +6929,231 @@ class LinuxSystemPanel:
                 bg="#000000",
                 fg="#00ff00").pack(anchor="w", pady=(0, 20))
         
-        # Create scrollable frame for processes
+        # Filter box
+        filter_frame = tk.Frame(content, bg="#000000")
+        filter_frame.pack(fill="x", pady=(0, 10))
+        tk.Label(filter_frame,
+                text="Filter:",
+                bg="#000000",
+                fg="#00ff00",
+                font=self.bold_font).pack(side="left")
+        filter_var = tk.StringVar(value=self.process_filter)
+        filter_entry = tk.Entry(filter_frame,
+                                textvariable=filter_var,
+                                bg="#121212",
+                                fg="#00ff00",
+                                insertbackground="#00ff00",
+                                relief="flat",
+                                width=60)
+        filter_entry.pack(side="left", padx=10)
+        filter_status = tk.Label(filter_frame, text="", bg="#000000", fg="#00ff00")
+        filter_status.pack(side="left")
+        tk.Label(content,
+                text="e.g. ssh   /ssh.*d$/   user:root   cmd:python   cgroup:docker   cpu>5   mem>=1",
+                bg="#000000",
+                fg="#006400").pack(anchor="w", pady=(0, 10))
+        
+        # Process list
         process_container = tk.Frame(content, bg="#000000")
-        process_container.pack(fill="both", expand=True)
+        process_container.pack(fill="x")
         
-        process_canvas = tk.Canvas(process_container, bg="#000000", highlightthickness=0)
+        columns = [column for column, _, _ in self.PROCESS_COLUMNS]
+        tree = ttk.Treeview(process_container, columns=columns, show="headings", height=12, selectmode="browse")
+        for column, heading, width in self.PROCESS_COLUMNS:
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor="w" if column == 'name' else "center")
         process_scrollbar = ttk.Scrollbar(process_container, orient="vertical", 
-                                        command=process_canvas.yview, 
+                                        command=tree.yview, 
                                         style="Vertical.TScrollbar")
-        scrollable_frame = tk.Frame(process_canvas, bg="#000000")
+        tree.configure(yscrollcommand=process_scrollbar.set)
+        tree.pack(side="left", fill="x", expand=True)
+        process_scrollbar.pack(side="right", fill="y")
         
-        scrollable_frame.bind("<Configure>", 
-            lambda e: process_canvas.configure(scrollregion=process_canvas.bbox("all")))
+        # Detail pane, filled for the selected process only
+        detail_frame = tk.Frame(content, bg="#000000")
+        detail_frame.pack(fill="x", pady=(15, 0))
         
-        process_canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        process_canvas.configure(yscrollcommand=process_scrollbar.set)
+        detail_title = tk.Label(detail_frame,
+                               text="Select a process for details",
+                               bg="#000000",
+                               fg="#00ff00",
+                               font=self.bold_font)
+        detail_title.pack(anchor="w")
         
-        # Configure mouse wheel scrolling
-        scrollable_frame.bind("<Enter>", lambda e: self._bound_to_mousewheel(e, process_canvas))
-        scrollable_frame.bind("<Leave>", lambda e: self._unbound_to_mousewheel(e, process_canvas))
+        detail_labels = {}
+        for field, title in self.PROCESS_DETAIL_FIELDS:
+            frame = tk.Frame(detail_frame, bg="#000000")
+            frame.pack(fill="x", pady=2)
+            tk.Label(frame,
+                    text=f"{title}:",
+                    bg="#000000",
+                    fg="#00ff00",
+                    width=20,
+                    anchor="w").pack(side="left")
+            detail_labels[field] = tk.Label(frame,
+                                           text="",
+                                           bg="#000000",
+                                           fg="#00ff00",
+                                           wraplength=700,
+                                           justify="left",
+                                           anchor="w")
+            detail_labels[field].pack(side="left", padx=10)
         
-        # Headers frame
-        headers_frame = tk.Frame(scrollable_frame, bg="#000000")
-        headers_frame.pack(fill="x", pady=(0, 5))
+        # The lists are only read while they are shown
+        list_options = {field: tk.BooleanVar(value=False) for field in ProcessInspector.LIST_FIELDS}
+        options_frame = tk.Frame(detail_frame, bg="#000000")
+        options_frame.pack(fill="x", pady=(10, 2))
+        list_text = tk.Text(detail_frame,
+                            bg="#000000",
+                            fg="#00ff00",
+                            font=("Monospace", 9),
+                            height=10,
+                            relief="flat",
+                            highlightthickness=0)
+        for field, title in (('open_files', "Show open files"), ('sockets', "Show sockets")):
+            tk.Checkbutton(options_frame,
+                           text=title,
+                           variable=list_options[field],
+                           command=lambda: self.load_process_details(render_details, visible_fields(), full=True),
+                           bg="#000000",
+                           fg="#00ff00",
+                           selectcolor="#121212",
+                           activebackground="#000000",
+                           activeforeground="#00ff00").pack(side="left", padx=(0, 15))
         
-        tk.Label(headers_frame,
-                text="Process Name",
-                bg="#000000",
-                fg="#00ff00",
-                font=self.bold_font,
-                width=40,
-                anchor="w").pack(side="left")
+        def visible_fields():
+            return [field for field, var in list_options.items() if var.get()]
         
-        tk.Label(headers_frame,
-                text="CPU %",
-                bg="#000000",
-                fg="#00ff00",
-                font=self.bold_font,
-                width=10).pack(side="left", padx=10)
+        def render_details(pid, details):
+            if not detail_title.winfo_exists() or pid != self.selected_pid:
+                return
+            for field, value in details.items():
+                if field in detail_labels:
+                    if detail_labels[field].cget("text") != value:
+                        detail_labels[field].config(text=value)
+            lists = [(field, details[field]) for field in ProcessInspector.LIST_FIELDS if field in details]
+            if lists:
+                list_text.pack(fill="x", pady=2)
+                list_text.config(state="normal")
+                list_text.delete("1.0", "end")
+                for field, entries in lists:
+                    entries = entries if isinstance(entries, list) else [entries]
+                    list_text.insert("end", f"{field.replace('_', ' ').title()} ({len(entries)}):\n")
+                    for entry in entries:
+                        list_text.insert("end", f"  {entry}\n")
+                list_text.config(state="disabled")
+            elif not visible_fields():
+                list_text.pack_forget()
         
-        tk.Label(headers_frame,
-                text="Memory %",
-                bg="#000000",
-                fg="#00ff00",
-                font=self.bold_font,
-                width=10).pack(side="left", padx=10)
+        def on_select(event):
+            selection = tree.selection()
+            if not selection:
+                return
+            pid = int(selection[0])
+            if pid == self.selected_pid:
+                return
+            self.selected_pid = pid
+            detail_title.config(text=f"Process {pid} ({tree.set(selection[0], 'name')})")
+            for label in detail_labels.values():
+                label.config(text="Loading...")
+            self.load_process_details(render_details, visible_fields(), full=True)
         
-        tk.Label(headers_frame,
-                text="Status",
-                bg="#000000",
-                fg="#00ff00",
-                font=self.bold_font,
-                width=10).pack(side="left", padx=10)
+        tree.bind("<<TreeviewSelect>>", on_select)
         
-        def update_processes():
+        def render_processes():
             try:
-                if not scrollable_frame.winfo_exists():
+                if not tree.winfo_exists():
                     return
-
-                # Clear existing process frames except headers
-                for widget in scrollable_frame.winfo_children():
-                    if widget != headers_frame:
-                        widget.destroy()
-
-                # Get process info more efficiently
-                processes = []
-                for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
-                    try:
-                        info = proc.info
-                        if info['cpu_percent'] > 0.1:  # Only show processes using CPU
-                            processes.append(info)
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
-
-                # Sort and limit to top 5 CPU using processes
-                processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-                top_processes = processes[:5]
-
+                
+                query = self.process_filter.strip()
+                if query:
+                    start = time.perf_counter()
+                    pids = self.process_index.query(query)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    top_processes = self.process_index.top(pids, 200)
+                    filter_status.config(text=f"{len(pids)} matches ({elapsed:.2f} ms)")
+                else:
+                    top_processes = [proc for proc in self.process_index.top(self.process_index.dynamic, 25)
+                                     if proc['cpu_percent'] > 0.1]
+                    filter_status.config(text="")
+                shown = set(tree.get_children())
+                iids = []
                 for proc in top_processes:
-                    if not scrollable_frame.winfo_exists():
-                        return
-
-                    frame = tk.Frame(scrollable_frame, bg="#000000")
-                    frame.pack(fill="x", pady=2)
-
-                    # Create all labels at once
-                    labels = [
-                        (proc['name'], 40, "w"),
-                        (f"{proc['cpu_percent']:.1f}%", 10, "center"),
-                        (f"{proc['memory_percent']:.1f}%", 10, "center"),
-                        (proc['status'], 10, "center")
-                    ]
-
-                    for text, width, anchor in labels:
-                        tk.Label(frame,
-                                text=text,
-                                bg="#000000",
-                                fg="#00ff00",
-                                width=width,
-                                anchor=anchor).pack(side="left", padx=10)
-
-                # Pack scrollbar and canvas
-                process_canvas.pack(side="left", fill="both", expand=True)
-                process_scrollbar.pack(side="right", fill="y")
-
-                # Update after interval
-                self.root.after(self.UPDATE_INTERVALS['processes'], update_processes)
-
+                    iid = str(proc['pid'])
+                    values = (proc['pid'], proc['name'], f"{proc['cpu_percent']:.1f}%",
+                              f"{proc['memory_percent']:.1f}%", proc['status'])
+                    if iid in shown:
+                        tree.item(iid, values=values)
+                    else:
+                        tree.insert("", "end", iid=iid, values=values)
+                    iids.append(iid)
+                # keep the selected process listed while it is inspected
+                selected = str(self.selected_pid)
+                for iid in shown - set(iids):
+                    if iid != selected:
+                        tree.delete(iid)
+                for position, iid in enumerate(iids):
+                    tree.move(iid, "", position)
             except Exception as e:
                 print(f"Error updating processes: {e}")
+        
+        def on_filter_change(*args):
+            # the index answers from memory, so every keystroke can query it
+            self.process_filter = filter_var.get()
+            render_processes()
+        
+        filter_var.trace_add("write", on_filter_change)
+        
+        def sample_processes():
+            self.process_index.update(ProcessTable.sample(self.source))
+            self.dispatcher.post('processes', render_processes)
+        
+        def update_processes():
+            if not tree.winfo_exists():
+                self.scheduler.remove('processes')
+                return
+            self.submit(sample_processes)
+        
+        def refresh_details():
+            if not detail_title.winfo_exists():
+                self.scheduler.remove('process_detail')
+                return
+            if self.selected_pid is not None:
+                self.load_process_details(render_details, visible_fields())
+        
+        self.selected_pid = None
+        self.scheduler.add('processes', self.UPDATE_INTERVALS['processes'], update_processes, tab=5, run_now=True)
+        self.scheduler.add('process_detail', 2000, refresh_details, tab=5)
+
+    def load_process_details(self, callback, list_fields=(), full=False):
+        """Load the selected process' details in a worker, superseding any load still in flight.
+
+        A full load reads every field, a refresh only the ones that change
+        while a process runs plus the lists that are shown.
+        """
+        pid = self.selected_pid
+        if pid is None:
+            return
+        if self._detail_future is not None:
+            self._detail_future.cancel()
+        self._detail_generation += 1
+        generation = self._detail_generation
+        fields = (ProcessInspector.STATIC_FIELDS if full else ()) + ProcessInspector.DYNAMIC_FIELDS + tuple(list_fields)
+        
+        def load():
+            details = self.inspector.load(pid, fields, cancelled=lambda: generation != self._detail_generation)
+            if details is not None and generation == self._detail_generation:
+                self.dispatcher.post('process_detail', callback, pid, details)
+        self._detail_future = self.submit(load)
 
-        update_processes()
+    @cached(ttl=3)
+    def get_top_processes(self, limit=5):
+        """Top CPU using processes"""
+        return ProcessTable.sample(self.source).top(limit)
 
     def get_cached_data(self, key, fetch_func, timeout=5):
         """Get cached data or fetch new data if cache expired"""
-        current_time = time.time()
-        if key not in self._cache or current_time - self._cache_timeout.get(key, 0) > timeout:
-            self._cache[key] = fetch_func()
-            self._cache_timeout[key] = current_time
-        return self._cache[key]
+        return self.cache.get(key, fetch_func, timeout)
 
     def show_securonis_info(self):
         content = tk.Frame(self.main_area, bg="#000000")
@@ -1793,7 +7200,93 @@ class LinuxSystemPanel:
                     fg="#00ff00",
                     anchor="w").pack(side="left", padx=10)
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Securonis Linux System Control Panel")
+    parser.add_argument("--root", default="/", help="read procfs, sysfs and /etc below this directory")
+    parser.add_argument("--record", metavar="FILE", help="record every read to a capture file")
+    parser.add_argument("--replay", metavar="FILE", help="replay a capture file instead of the live system")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--cpu-budget", type=float, default=1.0,
+                        help="CPU%% of one core the panel may use before refreshes slow down")
+    parser.add_argument("--slow-ms", type=float, default=100, help="log callbacks and getters slower than this")
+    parser.add_argument("--metrics-port", type=int, help="serve OpenMetrics on this port (disabled by default)")
+    parser.add_argument("--metrics-address", default="127.0.0.1", help="address the metrics endpoint binds to")
+    parser.add_argument("--collector", type=int, metavar="PORT",
+                        help="run without a window and stream snapshots to fleet panels on this port")
+    parser.add_argument("--collector-address", default="127.0.0.1", help="address the collector binds to")
+    parser.add_argument("--fleet", metavar="HOST:PORT[,...]|@FILE",
+                        help="show a fleet grid of these collectors, @FILE reads one endpoint per line")
+    parser.add_argument("--report", nargs="?", const=".", metavar="DIR",
+                        help="write a JSON and HTML support report to DIR (default: current directory) and exit")
+    parser.add_argument("--diff", nargs="+", metavar="REPORT",
+                        help="print what changed between two support reports, or between one and now, and exit")
+    parser.add_argument("--audit", action="store_true",
+                        help="print the kernel hardening audit as diffable text and exit")
+    return parser.parse_args(argv)
+
+
+def parse_fleet(value):
+    if not value:
+        return None
+    if value.startswith('@'):
+        with open(value[1:], 'r') as f:
+            return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return [endpoint.strip() for endpoint in value.split(',') if endpoint.strip()]
+
+
+def run_collector(args):
+    """Sample without a window and stream the snapshots to fleet panels"""
+    panel = LinuxSystemPanel.headless(make_source(args))
+    streamer = SnapshotStreamer(panel.sampler, args.collector_address, args.collector)
+    if not streamer.start():
+        sys.exit(1)
+    print(f"Collector streaming on {args.collector_address}:{args.collector}")
+    interval = panel.UPDATE_INTERVALS['cpu_ram'] / 1000
+    security_every = panel.UPDATE_INTERVALS['security'] // panel.UPDATE_INTERVALS['cpu_ram']
+    try:
+        while True:
+            if panel.sampler.seq % security_every == 0:
+                panel.submit_slow(panel.sampler.sample_security)
+            panel.sampler.sample()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        streamer.stop()
+
+
+def make_source(args):
+    if args.replay:
+        return ReplaySource(args.replay, speed=args.speed)
+    if args.record:
+        return RecordingSource(args.record, root=args.root)
+    return DataSource(args.root)
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.report:
+        panel = LinuxSystemPanel.headless(make_source(args))
+        for path in SupportReport(panel).write(args.report):
+            print(path)
+        sys.stdout.flush()
+        os._exit(0)  # timed out collectors may still be running
+    if args.diff:
+        old = load_snapshot(args.diff[0])
+        if len(args.diff) > 1:
+            new = load_snapshot(args.diff[1])
+        else:
+            new = capture_snapshot(LinuxSystemPanel.headless(make_source(args)))
+        sys.stdout.write(format_snapshot_diff(diff_snapshots(old, new)))
+        sys.exit(0)
+    if args.audit:
+        audit = HardeningAudit(make_source(args))
+        audit.audit()
+        sys.stdout.write(audit.report())
+        sys.exit(0)
+    if args.collector:
+        run_collector(args)
+        sys.exit(0)
     root = tk.Tk()
-    app = LinuxSystemPanel(root)
+    app = LinuxSystemPanel(root, source=make_source(args), slow_threshold_ms=args.slow_ms,
+                           cpu_budget=args.cpu_budget, metrics_port=args.metrics_port,
+                           metrics_address=args.metrics_address, fleet=parse_fleet(args.fleet))
     root.mainloop()
@@ -0,0 +1,150 @@
+"""DnsProbe against stub resolvers on loopback"""
+import asyncio
+import os
+import socket
+import struct
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from controlpanelgui import DataSource, DnsProbe, FileWatcher
+
+# loopback address -> what the stub resolver there does with a query
+BEHAVIOUR = {'127.0.0.1': 'answer', '127.0.0.2': 'drop', '127.0.0.3': 'servfail'}
+
+
+class StubResolver(asyncio.DatagramProtocol):
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.queries = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.queries += 1
+        if self.behaviour == 'drop':
+            return
+        query_id, = struct.unpack_from(">H", data)
+        rcode = 2 if self.behaviour == 'servfail' else 0
+        # response, recursion desired and available, the question echoed back
+        self.transport.sendto(struct.pack(">HHHHHH", query_id, 0x8180 | rcode, 1, 0, 0, 0) + data[12:], addr)
+
+
+@pytest.fixture
+def resolvers():
+    """Stub resolvers on one port of 127.0.0.1-3, served from a loop in a thread"""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def serve():
+        stubs, port = {}, 0
+        for address, behaviour in BEHAVIOUR.items():
+            stub = StubResolver(behaviour)
+            transport, _ = await loop.create_datagram_endpoint(lambda: stub, local_addr=(address, port))
+            port = transport.get_extra_info('sockname')[1]
+            stubs[address] = stub
+        return stubs, port
+
+    stubs, port = asyncio.run_coroutine_threadsafe(serve(), loop).result(5)
+    yield stubs, port
+    for stub in stubs.values():
+        loop.call_soon_threadsafe(stub.transport.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
+    loop.close()
+
+
+class Host(DataSource):
+    """A fixture root with made up interfaces"""
+
+    def __init__(self, root, addresses, up):
+        super().__init__(root)
+        self.addresses = addresses  # interface -> address
+        self.up = up
+
+    def net_if_addrs(self):
+        return {name: [SimpleNamespace(family=socket.AF_INET, address=address)]
+                for name, address in self.addresses.items()}
+
+    def net_if_stats(self):
+        return {name: SimpleNamespace(isup=name in self.up) for name in self.addresses}
+
+
+def make_probe(root, port, addresses=None, up=(), nameservers=BEHAVIOUR):
+    os.makedirs(os.path.join(str(root), 'etc'), exist_ok=True)
+    with open(os.path.join(str(root), 'etc/resolv.conf'), 'w') as f:
+        f.write("".join(f"nameserver {address}\n" for address in nameservers))
+    source = Host(str(root), addresses or {'lo': '127.0.0.1'}, up)
+    return DnsProbe(source, FileWatcher(source), port=port, timeout=0.3)
+
+
+def test_answer_timeout_and_servfail(tmp_path, resolvers):
+    stubs, port = resolvers
+    probe = make_probe(tmp_path, port)
+    for _ in range(2):
+        results = {result["address"]: result for result in probe.probe()}
+    assert set(results) == set(BEHAVIOUR)
+    assert all(stub.queries == 2 for stub in stubs.values())
+    assert probe.probed is not None
+
+    answered = results['127.0.0.1']
+    assert answered["role"] == 'configured'
+    assert answered["rcode"] == "NOERROR" and answered["error"] is None
+    assert 0 < answered["latency"] < 300
+    assert answered["p50"] is not None and answered["p95"] >= answered["p50"]
+    assert answered["failure_rate"] == 0.0
+    assert answered["interface"] == 'lo'
+
+    # the dropped query times out without raising
+    dropped = results['127.0.0.2']
+    assert dropped["error"] == "timeout"
+    assert dropped["latency"] is None and dropped["rcode"] is None
+    assert dropped["p50"] is None and dropped["failure_rate"] == 1.0
+
+    failed = results['127.0.0.3']
+    assert failed["rcode"] == "SERVFAIL" and failed["error"] == "SERVFAIL"
+    assert failed["latency"] is None and failed["failure_rate"] == 1.0
+
+    assert not any(result["leak"] for result in results.values())
+    assert probe.summary() == list(probe.results.values())
+
+
+def test_failure_rate_over_rounds(tmp_path, resolvers):
+    stubs, port = resolvers
+    probe = make_probe(tmp_path, port, nameservers=['127.0.0.1'])
+    probe.probe()
+    stubs['127.0.0.1'].behaviour = 'servfail'
+    result, = probe.probe()
+    assert result["failure_rate"] == 0.5
+    assert result["p50"] is not None
+
+
+def test_loopback_is_not_a_leak(tmp_path, resolvers):
+    _, port = resolvers
+    probe = make_probe(tmp_path, port, addresses={'lo': '127.0.0.1', 'tun0': '10.8.0.2'}, up={'lo', 'tun0'},
+                       nameservers=['127.0.0.1'])
+    result, = probe.probe()
+    assert result["interface"] == 'lo' and not result["leak"]
+
+
+def test_leak_classification(tmp_path, monkeypatch):
+    # remote resolvers cannot be stood up on loopback, so the queries report the source they left from
+    routes = {'192.0.2.53': '192.168.1.20', '198.51.100.53': '10.8.0.2'}
+
+    async def query(self, address, role):
+        return {"address": address, "role": role, "latency": 12.0, "rcode": "NOERROR", "error": None,
+                "interface": None, "source": routes[address]}
+
+    monkeypatch.setattr(DnsProbe, '_query', query)
+    addresses = {'eth0': '192.168.1.20', 'tun0': '10.8.0.2'}
+    probe = make_probe(tmp_path, 53, addresses=addresses, up={'eth0', 'tun0'}, nameservers=routes)
+    results = {result["address"]: result for result in probe.probe()}
+    assert results['192.0.2.53']["interface"] == 'eth0' and results['192.0.2.53']["leak"]
+    assert results['198.51.100.53']["interface"] == 'tun0' and not results['198.51.100.53']["leak"]
+
+    # with the VPN down nothing leaks
+    probe = make_probe(tmp_path, 53, addresses=addresses, up={'eth0'}, nameservers=routes)
+    assert not any(result["leak"] for result in probe.probe())
@@ -0,0 +1,124 @@
+"""Fleet mode against stand-in collectors on loopback"""
+import socket
+import time
+
+from controlpanelgui import FleetClient, SnapshotStreamer
+
+
+class StandInSampler:
+    """Just enough of MetricSampler for a SnapshotStreamer"""
+
+    def __init__(self, snapshot):
+        self.snapshot = dict(snapshot)
+        self.seq = 1
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def publish(self, **changes):
+        """Apply changes, None removes a metric, and notify like a real sample"""
+        snapshot = dict(self.snapshot)
+        for name, value in changes.items():
+            name = name.replace('_', '.')
+            if value is None:
+                snapshot.pop(name, None)
+            else:
+                snapshot[name] = value
+        self.snapshot = snapshot
+        self.seq += 1
+        for callback in self._listeners:
+            callback(snapshot, {name.replace('_', '.') for name in changes}, self.seq)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def host_state(client, endpoint):
+    with client._lock:
+        host = client.hosts[endpoint]
+        return host.status, host.seq, dict(host.metrics), host.name
+
+
+def start_collector(sampler, port=0):
+    streamer = SnapshotStreamer(sampler, port=port)
+    assert streamer.start()
+    return streamer, streamer.server.server_address[1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_full_then_delta_then_reconnect():
+    sampler = StandInSampler({'cpu.percent': 10.0, 'mem.percent': 40.0, 'disk./.percent': 70.0})
+    streamer, port = start_collector(sampler)
+    endpoint = f"127.0.0.1:{port}"
+    client = FleetClient([endpoint])
+    client.start()
+    try:
+        # full snapshot on connect
+        assert wait_for(lambda: host_state(client, endpoint)[1] == 1)
+        status, seq, metrics, name = host_state(client, endpoint)
+        assert status == "Connected"
+        assert name == socket.gethostname()
+        assert metrics == {'cpu.percent': 10.0, 'mem.percent': 40.0, 'disk./.percent': 70.0}
+        assert endpoint in client.take_dirty()
+
+        # a delta carries only the changes
+        sampler.publish(cpu_percent=55.0, **{'disk./.percent': None})
+        assert wait_for(lambda: host_state(client, endpoint)[1] == 2)
+        assert host_state(client, endpoint)[2] == {'cpu.percent': 55.0, 'mem.percent': 40.0}
+        assert client.take_dirty() == {endpoint}
+
+        # the collector goes away, the last metrics stay as they were
+        streamer.stop()
+        assert wait_for(lambda: host_state(client, endpoint)[0] == "Disconnected")
+        assert host_state(client, endpoint)[2] == {'cpu.percent': 55.0, 'mem.percent': 40.0}
+
+        # and comes back on the same port, the client resyncs from a full snapshot
+        sampler.publish(mem_percent=41.0)
+        streamer, _ = start_collector(sampler, port)
+        assert wait_for(lambda: host_state(client, endpoint)[0] == "Connected"
+                        and host_state(client, endpoint)[1] == sampler.seq)
+        assert host_state(client, endpoint)[2] == {'cpu.percent': 55.0, 'mem.percent': 41.0}
+    finally:
+        client.stop()
+        streamer.stop()
+
+
+def test_silent_collector_times_out():
+    sampler = StandInSampler({'cpu.percent': 1.0})
+    streamer, port = start_collector(sampler)
+    streamer.PING_SECONDS = 60
+    endpoint = f"127.0.0.1:{port}"
+    client = FleetClient([endpoint])
+    client.TIMEOUT = 0.5
+    client.start()
+    try:
+        assert wait_for(lambda: host_state(client, endpoint)[1] == 1)
+        assert wait_for(lambda: host_state(client, endpoint)[0] == "Timed out")
+        assert host_state(client, endpoint)[2] == {'cpu.percent': 1.0}
+    finally:
+        client.stop()
+        streamer.stop()
+
+
+def test_offline_collector():
+    endpoint = f"127.0.0.1:{free_port()}"
+    client = FleetClient([endpoint, "not a host:port"])
+    client.start()
+    try:
+        assert wait_for(lambda: host_state(client, endpoint)[0].startswith("Error"))
+        assert host_state(client, endpoint)[2] == {}
+        assert host_state(client, "not a host:port")[0].startswith("Error")
+    finally:
+        client.stop()
@@ -0,0 +1,80 @@
+"""GpuMonitor against a fixture sysfs tree"""
+import os
+
+from controlpanelgui import DataSource, GpuMonitor
+
+
+def write(root, path, text):
+    path = os.path.join(str(root), path.lstrip('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def card(root, name, vendor, driver, files):
+    device = f"/sys/class/drm/{name}/device"
+    write(root, f"{device}/vendor", f"{vendor}\n")
+    write(root, f"{device}/device", "0x1234\n")
+    write(root, f"{device}/uevent", f"DRIVER={driver}\nPCI_SLOT_NAME=0000:03:00.0\n")
+    for path, text in files.items():
+        write(root, f"/sys/class/drm/{name}/{path}", text)
+
+
+def sample(root):
+    gpus = GpuMonitor(DataSource(str(root)))
+    try:
+        return gpus, gpus.sample()
+    finally:
+        gpus.close()
+
+
+def test_amdgpu(tmp_path):
+    card(tmp_path, "card1", "0x1002", "amdgpu", {
+        "device/pp_dpm_sclk": "0: 500Mhz\n1: 1500Mhz *\n2: 2500Mhz\n",
+        "device/gpu_busy_percent": "37\n",
+        "device/mem_info_vram_used": f"{2 * 1024 ** 3}\n",
+        "device/mem_info_vram_total": f"{16 * 1024 ** 3}\n",
+        "device/hwmon/hwmon4/temp1_input": "54000\n",
+    })
+    gpus, latest = sample(tmp_path)
+    assert gpus.cards["card1"]["vendor"] == "AMD"
+    assert gpus.cards["card1"]["driver"] == "amdgpu"
+    assert latest["card1"] == {"freq_mhz": 1500, "max_freq_mhz": 2500, "busy_percent": 37,
+                               "vram_used": 2 * 1024 ** 3, "vram_total": 16 * 1024 ** 3, "temp_c": 54.0}
+
+
+def test_i915_prefers_actual_frequency(tmp_path):
+    card(tmp_path, "card0", "0x8086", "i915", {
+        "gt_cur_freq_mhz": "400\n",
+        "gt_act_freq_mhz": "350\n",
+        "gt_max_freq_mhz": "1300\n",
+    })
+    gpus, latest = sample(tmp_path)
+    assert gpus.cards["card0"]["vendor"] == "Intel"
+    assert latest["card0"] == {"freq_mhz": 350, "max_freq_mhz": 1300}
+
+
+def test_i915_falls_back_to_requested_frequency(tmp_path):
+    card(tmp_path, "card0", "0x8086", "i915", {"gt_cur_freq_mhz": "400\n", "gt_max_freq_mhz": "1300\n"})
+    _, latest = sample(tmp_path)
+    assert latest["card0"] == {"freq_mhz": 400, "max_freq_mhz": 1300}
+
+
+def test_card_without_readable_counters(tmp_path):
+    card(tmp_path, "card2", "0x1af4", "virtio-pci", {
+        "device/gpu_busy_percent": "busy\n",
+        "device/pp_dpm_sclk": "",
+    })
+    # connectors are listed next to cards and must be skipped
+    write(tmp_path, "/sys/class/drm/card2-Virtual-1/status", "connected\n")
+    gpus, latest = sample(tmp_path)
+    assert list(gpus.cards) == ["card2"]
+    assert gpus.cards["card2"]["vendor"] == "0x1af4"
+    assert latest == {"card2": {}}
+
+
+def test_no_drm(tmp_path):
+    gpus, latest = sample(tmp_path)
+    assert gpus.cards == {}
+    assert latest == {}
+    assert not gpus.has_nvidia()
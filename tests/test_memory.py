@@ -0,0 +1,30 @@
+"""Heap growth of the panel's periodic work on a fixture root"""
+import benchmark
+from controlpanelgui import DataSource
+
+BUDGET_KIB = 256
+
+
+def soak(tmp_path, ticks=200, warmup=50):
+    benchmark.make_fixture(str(tmp_path), processes=200, mounts=20, interfaces=4)
+    return benchmark.run_soak(DataSource(str(tmp_path)), ticks, warmup, BUDGET_KIB)
+
+
+def test_periodic_work_stays_within_budget(tmp_path):
+    result = soak(tmp_path)
+    assert result["heap_growth_kib"] < BUDGET_KIB, result
+    assert not result["over_budget"]
+
+
+def test_growth_over_budget_is_reported(tmp_path, monkeypatch):
+    kept = []
+    tick = benchmark.soak_tick
+
+    def leaking_tick(panel):
+        tick(panel)
+        kept.append(bytearray(16 * 1024))
+
+    monkeypatch.setattr(benchmark, 'soak_tick', leaking_tick)
+    result = soak(tmp_path, ticks=40, warmup=2)
+    assert result["over_budget"]
+    assert result["heap_growth_kib"] >= 40 * 16